@@ -0,0 +1,77 @@
+import asyncio
+from typing import (Any, AsyncIterator, Awaitable, Callable, Iterable,
+                    List, TypeVar)
+
+R = TypeVar('R')
+
+# Calls kept in flight when no limit is given
+DEFAULT_CONCURRENCY = 16
+
+# Elements yielded by async iteration between returns to the event loop
+YIELD_EVERY = 1024
+
+
+async def run(func: Callable[[Any], Awaitable[R]], items: Iterable[Any],
+              length: int, concurrency: int) -> List[R]:
+    """Await func over items with bounded concurrency, keeping order.
+    A fixed set of workers pulls items from one shared iterator, so at
+    most concurrency calls are in flight and no task is created per
+    element. If a call raises, the other workers are cancelled and the
+    exception propagates.
+    Args:
+        func: Coroutine function applied to each item
+        items: Items, iterated once
+        length: Number of items
+        concurrency: Maximum number of calls in flight
+    Returns:
+        Results in item order
+    Raises:
+        ValueError: If concurrency is not positive
+    """
+    if concurrency <= 0:
+        raise ValueError("Concurrency must be positive")
+    results: List[Any] = [None] * length
+    pending = enumerate(items)
+
+    async def worker() -> None:
+        for index, item in pending:
+            results[index] = await func(item)
+
+    tasks = [asyncio.ensure_future(worker())
+             for _ in range(min(concurrency, length))]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    return results
+
+
+async def reduce_chunk(func: Callable[[Any, Any], Awaitable[Any]],
+                       identity: Any, chunk: Iterable[Any]) -> Any:
+    """Reduce one chunk in order starting from the identity.
+    Args:
+        func: Associative coroutine reduction function
+        identity: Identity element of func
+        chunk: Elements
+    Returns:
+        Partial result
+    """
+    result = identity
+    for item in chunk:
+        result = await func(result, item)
+    return result
+
+
+async def iterate(items: Iterable[Any]) -> AsyncIterator[Any]:
+    """Yield items, returning to the event loop every YIELD_EVERY items.
+    Args:
+        items: Items
+    Returns:
+        Async iterator over items
+    """
+    for count, item in enumerate(items, 1):
+        yield item
+        if count % YIELD_EVERY == 0:
+            await asyncio.sleep(0)
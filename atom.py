@@ -0,0 +1,210 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+
+from dynamic_array import DynamicArray
+
+Update = Callable[[DynamicArray], DynamicArray]
+
+
+class ArrayRef:
+    """Thread-safe reference to a current DynamicArray.
+
+    Arrays are immutable, so readers never lock: get() returns the
+    current value and keeps seeing that value whatever happens next.
+    Writers publish a new array with compare_and_set(), which only
+    succeeds if the reference still holds the array they started from.
+    swap(fn) retries fn on the newest value until its result is
+    published, so fn must have no side effects and may run more than
+    once under contention.
+
+    With batch_interval, submit(fn) queues fn instead. A background
+    thread wakes every batch_interval seconds and applies all queued
+    functions, in submission order, to one snapshot, publishing a
+    single new version for the whole batch. Writers then never retry
+    each other; the price is up to batch_interval of latency.
+
+    Attributes:
+        batch_interval: Seconds between batches, None disables submit
+        published: Number of values published after the initial one
+        retries: Number of failed compare-and-set attempts
+        _value: Current array
+        _lock: Guards _value and the counters
+        _queue: Queued functions with their futures
+        _queue_lock: Guards _queue, _thread and _closed
+        _flush_lock: Keeps batches in submission order
+        _stop: Set by close() to stop the batch thread
+        _thread: Batch thread, started by the first submit
+        _closed: Whether close() was called
+    """
+    def __init__(self, value: Optional[DynamicArray] = None,
+                 batch_interval: Optional[float] = None):
+        """Initialize reference.
+        Args:
+            value: Initial array, empty by default
+            batch_interval: Seconds between batches of submitted
+                updates, None to disable batching
+        Raises:
+            ValueError: If batch_interval is not positive
+        """
+        if batch_interval is not None and batch_interval <= 0:
+            raise ValueError("batch_interval must be positive")
+        self.batch_interval = batch_interval
+        self.published = 0
+        self.retries = 0
+        self._value = DynamicArray.empty() if value is None else value
+        self._lock = threading.Lock()
+        self._queue: List[Tuple[Update, 'Future[DynamicArray]']] = []
+        self._queue_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def __enter__(self) -> 'ArrayRef':
+        """Use the reference as a context manager.
+        Returns:
+            The reference itself
+        """
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Apply pending updates and stop the batch thread."""
+        self.close()
+
+    def __repr__(self) -> str:
+        """Get string representation.
+        Returns:
+            ArrayRef with the current value
+        """
+        return 'ArrayRef({})'.format(self._value)
+
+    def get(self) -> DynamicArray:
+        """Get the current array without locking.
+        Returns:
+            Current array
+        """
+        return self._value
+
+    def reset(self, value: DynamicArray) -> DynamicArray:
+        """Publish a value unconditionally.
+        Args:
+            value: New array
+        Returns:
+            The new array
+        """
+        with self._lock:
+            self._value = value
+            self.published += 1
+        return value
+
+    def compare_and_set(self, expected: DynamicArray,
+                        value: DynamicArray) -> bool:
+        """Publish a value if the current one is still expected.
+        Values are compared by identity, not equality, so an equal
+        array published in between still counts as a conflict.
+        Args:
+            expected: Array the update was computed from
+            value: New array
+        Returns:
+            True if value was published
+        """
+        with self._lock:
+            if self._value is not expected:
+                self.retries += 1
+                return False
+            self._value = value
+            self.published += 1
+            return True
+
+    def swap(self, fn: Callable[..., DynamicArray],
+             *args: Any) -> DynamicArray:
+        """Replace the current array with fn(current, *args).
+        fn runs outside the lock and is retried on the newest value
+        whenever another writer published first.
+        Args:
+            fn: Side-effect free update function
+            *args: Further arguments of fn
+        Returns:
+            The published array
+        """
+        while True:
+            current = self._value
+            value = fn(current, *args)
+            if self.compare_and_set(current, value):
+                return value
+
+    def submit(self, fn: Update) -> 'Future[DynamicArray]':
+        """Queue an update for the next batch.
+        Args:
+            fn: Side-effect free update function
+        Returns:
+            Future resolving to the array published by the batch that
+            applied fn, or to the exception fn raised
+        Raises:
+            RuntimeError: If batching is disabled or the reference
+                was closed
+        """
+        if self.batch_interval is None:
+            raise RuntimeError("Batching is disabled")
+        future: 'Future[DynamicArray]' = Future()
+        with self._queue_lock:
+            if self._closed:
+                raise RuntimeError("Update submitted after close")
+            self._queue.append((fn, future))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='ArrayRef-batch', daemon=True)
+                self._thread.start()
+        return future
+
+    def flush(self) -> Optional[DynamicArray]:
+        """Apply queued updates now as one batch.
+        A function that raises fails only its own future; the batch
+        goes on from the value before it. The batch is applied again
+        if another writer published while it ran.
+        Returns:
+            Published array, or None if nothing was pending
+        """
+        with self._flush_lock:
+            with self._queue_lock:
+                pending, self._queue = self._queue, []
+            pending = [(fn, future) for fn, future in pending
+                       if future.set_running_or_notify_cancel()]
+            if not pending:
+                return None
+            while True:
+                current = self._value
+                value = current
+                errors: List[Optional[BaseException]] = []
+                for fn, _ in pending:
+                    try:
+                        value = fn(value)
+                    except Exception as exc:
+                        errors.append(exc)
+                    else:
+                        errors.append(None)
+                if self.compare_and_set(current, value):
+                    break
+            for (_, future), error in zip(pending, errors):
+                if error is None:
+                    future.set_result(value)
+                else:
+                    future.set_exception(error)
+            return value
+
+    def close(self) -> None:
+        """Refuse new updates, apply pending ones and stop the thread."""
+        with self._queue_lock:
+            self._closed = True
+            thread = self._thread
+        self._stop.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self.flush()
+
+    def _run(self) -> None:
+        """Apply a batch every batch_interval seconds until closed."""
+        assert self.batch_interval is not None
+        while not self._stop.wait(self.batch_interval):
+            self.flush()
@@ -0,0 +1,425 @@
+import asyncio
+import atexit
+import bisect
+import collections
+import functools
+import operator
+import os
+import tempfile
+from typing import (Any, Callable, Dict, Iterable, List, NamedTuple,
+                    Optional, Tuple)
+
+from dynamic_array import (PATCH_DELETE, PATCH_INSERT, PATCH_SET,
+                           DynamicArray)
+from typed_kernels import add, gt
+
+DYNAMIC_ARRAY = 'dynamic_array'
+LIST = 'list'
+TUPLE = 'tuple'
+TARGETS = (DYNAMIC_ARRAY, LIST, TUPLE)
+
+# Largest size for cases that are quadratic by design
+QUADRATIC_LIMIT = 100000
+
+
+class Case(NamedTuple):
+    """One benchmarked operation.
+
+    Attributes:
+        target: 'dynamic_array', 'list' or 'tuple'
+        method: Operation name, shared by equivalent cases of
+            different targets
+        setup: Builds the untimed input for a size
+        run: Timed operation applied to the input
+        max_size: Largest size worth timing, None for no limit
+    """
+    target: str
+    method: str
+    setup: Callable[[int], Any]
+    run: Callable[[Any], Any]
+    max_size: Optional[int] = None
+
+    @property
+    def name(self) -> str:
+        """Get unique case name such as 'list.map'."""
+        return '{}.{}'.format(self.target, self.method)
+
+
+def _increment(value: int) -> int:
+    """Map function used by map cases."""
+    return value + 1
+
+
+def _is_even(value: int) -> bool:
+    """Predicate used by filter cases."""
+    return value % 2 == 0
+
+
+def _consume(items: Any) -> None:
+    """Exhaust an iterable without storing it."""
+    collections.deque(items, maxlen=0)
+
+
+def _array(size: int) -> DynamicArray:
+    """Create array of consecutive integers."""
+    return DynamicArray.from_list(list(range(size)))
+
+
+def _array_pair(size: int) -> Tuple[DynamicArray, DynamicArray]:
+    """Create two arrays overlapping in half of their elements."""
+    return _array(size), DynamicArray.from_list(
+        list(range(size // 2, size + size // 2)))
+
+
+def _sorted_pair(size: int) -> Tuple[DynamicArray, DynamicArray]:
+    """Create two sorted arrays overlapping in half of their elements."""
+    first, second = _array_pair(size)
+    return first.sort(), second.sort()
+
+
+def _array_updates(size: int) -> Tuple[DynamicArray, Dict[int, int]]:
+    """Create an array and updates to every tenth element."""
+    return _array(size), {index: -1 for index in range(0, size, 10)}
+
+
+def _array_patch(size: int
+                 ) -> Tuple[DynamicArray, List[Tuple[str, int, Any]]]:
+    """Create an array and a patch with a set, insert and delete."""
+    return _array(size), [(PATCH_SET, 0, -1),
+                          (PATCH_INSERT, size // 2, range(10)),
+                          (PATCH_DELETE, size // 2, size // 2 + size // 4)]
+
+
+def _typed(size: int) -> DynamicArray:
+    """Create float64 typed array."""
+    return DynamicArray.from_list([float(i) for i in range(size)],
+                                  dtype='f8')
+
+
+def _cons_all(size: int) -> DynamicArray:
+    """Build an array by prepending size elements."""
+    result = DynamicArray.empty()
+    for i in range(size):
+        result = result.cons(i)
+    return result
+
+
+def _build(size: int) -> DynamicArray:
+    """Build an array through a builder."""
+    builder = DynamicArray.builder()
+    for i in range(size):
+        builder.append(i)
+    return builder.freeze()
+
+
+def _list_cons_all(size: int) -> List[int]:
+    """Build a list by appending size elements."""
+    result: List[int] = []
+    for i in range(size):
+        result.append(i)
+    return result
+
+
+def _tuple_cons_all(size: int) -> Tuple[int, ...]:
+    """Build a tuple by prepending size elements."""
+    result: Tuple[int, ...] = ()
+    for i in range(size):
+        result = (i,) + result
+    return result
+
+
+def _tuple_set(items: Tuple[int, ...]) -> Tuple[int, ...]:
+    """Replace the middle element of a tuple by copying."""
+    middle = len(items) // 2
+    return items[:middle] + (-1,) + items[middle + 1:]
+
+
+def _list_set(items: List[int]) -> None:
+    """Replace the middle element of a list in place."""
+    items[len(items) // 2] = -1
+
+
+def _list_remove(items: List[int]) -> None:
+    """Remove the last element by value, then restore it."""
+    value = items[-1]
+    items.remove(value)
+    items.append(value)
+
+
+def _tuple_remove(items: Tuple[int, ...]) -> Tuple[int, ...]:
+    """Remove the last element by value by copying."""
+    index = items.index(items[-1])
+    return items[:index] + items[index + 1:]
+
+
+_THREADS = {'executor': 'thread', 'threshold': 0}
+
+# Directory holding the files of file cases, removed at exit
+_scratch: List[tempfile.TemporaryDirectory] = []  # type: ignore[type-arg]
+
+
+def _scratch_path(name: str) -> str:
+    """Get a path in the scratch directory, creating it on first use."""
+    if not _scratch:
+        directory = tempfile.TemporaryDirectory()
+        atexit.register(directory.cleanup)
+        _scratch.append(directory)
+    return os.path.join(_scratch[0].name, name)
+
+
+def _saved(size: int) -> str:
+    """Save a float64 array in the binary format."""
+    path = _scratch_path('saved{}.bin'.format(size))
+    _typed(size).save(path)
+    return path
+
+
+def _written(size: int) -> str:
+    """Write an array as a text file, one element per line."""
+    path = _scratch_path('written{}.txt'.format(size))
+    _array(size).to_file(path)
+    return path
+
+
+def _attach_reduce(arr: DynamicArray) -> Any:
+    """Share an array and reduce it through attach.
+    The block is shared inside the case, so it is unlinked again.
+    """
+    with arr.to_shared() as handle:
+        return DynamicArray.attach(handle).reduce(operator.add, 0.0)
+
+
+async def _async_increment(value: int) -> int:
+    """Coroutine map function used by async cases."""
+    return value + 1
+
+
+async def _async_is_even(value: int) -> bool:
+    """Coroutine predicate used by async cases."""
+    return value % 2 == 0
+
+
+async def _async_add(total: int, value: int) -> int:
+    """Coroutine reduction used by async cases."""
+    return total + value
+
+
+def _cons_each(pair: Tuple[DynamicArray, List[Any]]) -> DynamicArray:
+    """Prepend every item to an empty array."""
+    result, items = pair
+    for item in items:
+        result = result.cons(item)
+    return result
+
+
+def _storage_cases(prefix: str,
+                   make: Callable[[Iterable[Any]], DynamicArray],
+                   convert: Callable[[int], Any]) -> List[Case]:
+    """Create core cases for one storage backend.
+    Args:
+        prefix: Method name prefix, e.g. 'trie_'
+        make: Builds an array of that backend from elements
+        convert: Turns an integer into an element the backend stores
+    Returns:
+        Cases named prefix + method
+    """
+    def items(size: int) -> List[Any]:
+        return [convert(i) for i in range(size)]
+
+    def array_of(size: int) -> DynamicArray:
+        return make(items(size))
+
+    def case(method: str, run: Callable[[Any], Any],
+             setup: Callable[[int], Any] = array_of) -> Case:
+        return Case(DYNAMIC_ARRAY, prefix + method, setup, run)
+
+    marker = convert(-1)
+    return [
+        case('from_iterable', make, items),
+        case('cons', _cons_each, lambda size: (make(()), items(size))),
+        case('get', lambda arr: arr.get(arr.length() // 2)),
+        case('set', lambda arr: arr.set(arr.length() // 2, marker)),
+        case('remove', lambda arr: arr.remove(arr.get(-1))),
+        case('set_many', lambda arr: arr.set_many(
+            {index: marker for index in range(0, arr.length(), 10)})),
+        case('remove_all', lambda arr: arr.remove_all(convert(0))),
+        case('insert_at', lambda arr: arr.insert_at(
+            arr.length() // 2, [marker] * 10)),
+        case('delete_range',
+             lambda arr: arr.delete_range(arr.length() // 4,
+                                          arr.length() // 2)),
+        case('member', lambda arr: arr.member(marker)),
+        case('iterator', lambda arr: _consume(arr.iterator())),
+        case('map', lambda arr: arr.map(_increment)),
+        case('filter', lambda arr: arr.filter(_is_even)),
+        case('reduce', lambda arr: arr.reduce(operator.add, convert(0))),
+        case('concat', lambda arr: arr.concat(arr)),
+        case('drop', lambda arr: arr.drop(1).to_list()),
+        case('sort', DynamicArray.sort, lambda size: array_of(size).reverse()),
+        case('eq', lambda pair: pair[0] == pair[1],
+             lambda size: (array_of(size), array_of(size))),
+    ]
+
+
+def _dynamic_array_cases() -> List[Case]:
+    """Create cases covering every public DynamicArray method."""
+    def case(method: str, run: Callable[[Any], Any],
+             setup: Callable[[int], Any] = _array,
+             max_size: Optional[int] = None) -> Case:
+        return Case(DYNAMIC_ARRAY, method, setup, run, max_size)
+
+    return [
+        case('from_list', DynamicArray.from_list,
+             lambda size: list(range(size))),
+        case('from_iterable', DynamicArray.from_iterable, range),
+        case('cons', _cons_all, setup=lambda size: size),
+        case('builder', _build, setup=lambda size: size),
+        case('transient', lambda arr: arr.transient().freeze()),
+        case('get', lambda arr: arr.get(arr.length() // 2)),
+        case('set', lambda arr: arr.set(arr.length() // 2, -1)),
+        case('remove', lambda arr: arr.remove(arr.get(-1))),
+        case('set_many', lambda pair: pair[0].set_many(pair[1]),
+             _array_updates),
+        case('remove_all', lambda arr: arr.remove_all(0)),
+        case('insert_at',
+             lambda arr: arr.insert_at(arr.length() // 2, range(10))),
+        case('delete_range',
+             lambda arr: arr.delete_range(arr.length() // 4,
+                                          arr.length() // 2)),
+        case('apply_patch', lambda pair: pair[0].apply_patch(pair[1]),
+             _array_patch),
+        case('length', DynamicArray.length),
+        case('member', lambda arr: arr.member(-1)),
+        case('count', lambda arr: arr.count(0)),
+        case('index_of', lambda arr: arr.index_of(arr.get(-1))),
+        case('indexed', lambda arr: arr.indexed().member(-1)),
+        case('reverse', DynamicArray.reverse),
+        case('to_list', DynamicArray.to_list),
+        case('iterator', lambda arr: _consume(arr.iterator())),
+        case('filter', lambda arr: arr.filter(_is_even)),
+        case('map', lambda arr: arr.map(_increment)),
+        case('reduce', lambda arr: arr.reduce(operator.add, 0)),
+        case('lazy', lambda arr: arr.lazy().map(_increment)
+             .filter(_is_even).reduce(operator.add, 0)),
+        case('pmap', lambda arr: arr.pmap(_increment, **_THREADS)),
+        case('pfilter', lambda arr: arr.pfilter(_is_even, **_THREADS)),
+        case('preduce',
+             lambda arr: arr.preduce(operator.add, 0, **_THREADS)),
+        case('typed_map', lambda arr: arr.map(add(1.0)), _typed),
+        case('typed_filter', lambda arr: arr.filter(gt(0.5)), _typed),
+        case('typed_reduce', lambda arr: arr.reduce(operator.add, 0.0),
+             _typed),
+        case('intersection', lambda pair: pair[0].intersection(pair[1]),
+             _array_pair),
+        case('difference', lambda pair: pair[0].difference(pair[1]),
+             _array_pair),
+        case('union', lambda pair: pair[0].union(pair[1]), _array_pair),
+        case('sort', DynamicArray.sort, lambda size: _array(size).reverse()),
+        case('bisect', lambda arr: arr.bisect(arr.length() // 2),
+             lambda size: _array(size).sort()),
+        case('contains_sorted', lambda arr: arr.contains_sorted(-1),
+             lambda size: _array(size).sort()),
+        case('sorted_intersection',
+             lambda pair: pair[0].intersection(pair[1]), _sorted_pair),
+        case('concat', lambda arr: arr.concat(arr)),
+        case('slice', lambda arr: arr[1:-1]),
+        case('take', lambda arr: arr.take(arr.length() // 2)),
+        case('drop', lambda arr: arr.drop(arr.length() // 2)),
+        case('split_at', lambda arr: arr.split_at(arr.length() // 2)),
+        case('iter_chunks', lambda arr: _consume(arr.iter_chunks(1000))),
+        case('compact', lambda arr: arr.slice(1, None, 2).compact()),
+        case('eq', lambda pair: pair[0] == pair[1],
+             lambda size: (_array(size), _array(size))),
+        case('str', str, max_size=1000000),
+        case('hash', lambda arr: hash(arr[1:])),
+        case('intern', lambda arr: arr[1:].intern()),
+        case('to_file', lambda arr: arr.to_file(_scratch_path('out.txt'))),
+        case('from_file', lambda path: DynamicArray.from_file(path, int),
+             _written),
+        case('save', lambda arr: arr.save(_scratch_path('out.bin')),
+             _typed),
+        case('open_mmap', DynamicArray.open_mmap, _saved),
+        case('mmap_reduce', lambda path: DynamicArray.open_mmap(path)
+             .reduce(operator.add, 0.0), _saved),
+        case('to_shared', lambda arr: arr.to_shared().unlink(), _typed),
+        case('attach', _attach_reduce, _typed),
+        case('amap', lambda arr: asyncio.run(arr.amap(_async_increment))),
+        case('afilter',
+             lambda arr: asyncio.run(arr.afilter(_async_is_even))),
+        case('areduce',
+             lambda arr: asyncio.run(arr.areduce(_async_add, 0))),
+    ] + _storage_cases(
+        'trie_', functools.partial(DynamicArray.from_iterable,
+                                   backend='trie'), int) + _storage_cases(
+        'f8_', functools.partial(DynamicArray.from_iterable, dtype='f8'),
+        float)
+
+
+def _list_cases() -> List[Case]:
+    """Create cases timing the mutable list equivalents."""
+    def case(method: str, run: Callable[[Any], Any],
+             setup: Callable[[int], Any] = lambda size: list(range(size)),
+             max_size: Optional[int] = None) -> Case:
+        return Case(LIST, method, setup, run, max_size)
+
+    return [
+        case('from_list', list, lambda size: list(range(size))),
+        case('cons', _list_cons_all, setup=lambda size: size),
+        case('get', lambda items: items[len(items) // 2]),
+        case('set', _list_set),
+        case('remove', _list_remove),
+        case('length', len),
+        case('member', lambda items: -1 in items),
+        case('count', lambda items: items.count(0)),
+        case('index_of', lambda items: items.index(items[-1])),
+        case('reverse', lambda items: items[::-1]),
+        case('to_list', list),
+        case('iterator', _consume),
+        case('filter', lambda items: [x for x in items if _is_even(x)]),
+        case('map', lambda items: list(map(_increment, items))),
+        case('reduce',
+             lambda items: functools.reduce(operator.add, items, 0)),
+        case('concat', lambda items: items + items),
+        case('slice', lambda items: items[1:-1]),
+        case('sort', sorted, lambda size: list(range(size, 0, -1))),
+        case('bisect',
+             lambda items: bisect.bisect_left(items, len(items) // 2)),
+        case('eq', lambda pair: pair[0] == pair[1],
+             lambda size: (list(range(size)), list(range(size)))),
+    ]
+
+
+def _tuple_cases() -> List[Case]:
+    """Create cases timing the immutable tuple equivalents."""
+    def case(method: str, run: Callable[[Any], Any],
+             setup: Callable[[int], Any] = lambda size: tuple(range(size)),
+             max_size: Optional[int] = None) -> Case:
+        return Case(TUPLE, method, setup, run, max_size)
+
+    return [
+        case('from_list', tuple, lambda size: list(range(size))),
+        case('cons', _tuple_cons_all, setup=lambda size: size,
+             max_size=QUADRATIC_LIMIT),
+        case('get', lambda items: items[len(items) // 2]),
+        case('set', _tuple_set),
+        case('remove', _tuple_remove),
+        case('length', len),
+        case('member', lambda items: -1 in items),
+        case('count', lambda items: items.count(0)),
+        case('index_of', lambda items: items.index(items[-1])),
+        case('reverse', lambda items: items[::-1]),
+        case('to_list', list),
+        case('iterator', _consume),
+        case('filter',
+             lambda items: tuple(x for x in items if _is_even(x))),
+        case('map', lambda items: tuple(map(_increment, items))),
+        case('reduce',
+             lambda items: functools.reduce(operator.add, items, 0)),
+        case('concat', lambda items: items + items),
+        case('slice', lambda items: items[1:-1]),
+        case('eq', lambda pair: pair[0] == pair[1],
+             lambda size: (tuple(range(size)), tuple(range(size)))),
+    ]
+
+
+CASES: List[Case] = _dynamic_array_cases() + _list_cases() + _tuple_cases()
@@ -0,0 +1,93 @@
+import threading
+import time
+from concurrent.futures import Future, wait
+from typing import Callable, List, Tuple
+
+from atom import ArrayRef
+from dynamic_array import TRIE_BACKEND, DynamicArray
+
+THREAD_COUNTS = (1, 2, 4, 8)
+# Updates made by all threads together, per run
+UPDATES = 20000
+ARRAY_SIZE = 10000
+BATCH_INTERVAL = 0.001
+
+
+def increment(arr: DynamicArray) -> DynamicArray:
+    """Add one to the first element."""
+    return arr.set(0, arr.get(0) + 1)
+
+
+def contend(threads: int, work: Callable[[int], None]) -> float:
+    """Run work in several threads at once.
+    Args:
+        threads: Number of threads
+        work: Function called in each thread with its update count
+    Returns:
+        Elapsed seconds
+    """
+    workers = [threading.Thread(target=work, args=(UPDATES // threads,))
+               for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - start
+
+
+def swapped(threads: int, backend: str) -> Tuple[float, ArrayRef]:
+    """Update a reference with swap from several threads.
+    Args:
+        threads: Number of threads
+        backend: Storage backend of the array
+    Returns:
+        Elapsed seconds and the updated reference
+    """
+    ref = ArrayRef(DynamicArray.from_iterable(range(ARRAY_SIZE),
+                                              backend=backend))
+
+    def work(count: int) -> None:
+        for _ in range(count):
+            ref.swap(increment)
+
+    return contend(threads, work), ref
+
+
+def batched(threads: int, backend: str) -> Tuple[float, ArrayRef]:
+    """Update a reference with batched submits from several threads.
+    Args:
+        threads: Number of threads
+        backend: Storage backend of the array
+    Returns:
+        Elapsed seconds, until every update is published, and the
+        updated reference
+    """
+    ref = ArrayRef(DynamicArray.from_iterable(range(ARRAY_SIZE),
+                                              backend=backend),
+                   BATCH_INTERVAL)
+
+    def work(count: int) -> None:
+        futures: List['Future[DynamicArray]'] = [
+            ref.submit(increment) for _ in range(count)]
+        wait(futures)
+
+    elapsed = contend(threads, work)
+    ref.close()
+    return elapsed, ref
+
+
+def main() -> None:
+    """Print update throughput as the number of threads grows."""
+    for backend in ('tuple', TRIE_BACKEND):
+        for name, run in (('swap', swapped), ('batched', batched)):
+            for threads in THREAD_COUNTS:
+                elapsed, ref = run(threads, backend)
+                print('{:<5} {:<7} {} threads: {:>9.0f} updates/s, '
+                      '{} versions, {} retries'.format(
+                          backend, name, threads, UPDATES / elapsed,
+                          ref.published, ref.retries))
+
+
+if __name__ == '__main__':
+    main()
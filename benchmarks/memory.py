@@ -0,0 +1,99 @@
+import functools
+import os
+import tempfile
+import tracemalloc
+from typing import Callable, List, Tuple
+
+from dynamic_array import DynamicArray
+
+FILTER_SOURCE_SIZE = 1000000
+FILTER_RUNS = 20
+SMALL_ARRAYS = 100000
+INGEST_SIZE = 1000000
+
+
+def measure(build: Callable[[], object]) -> Tuple[int, int]:
+    """Measure memory allocated while building and keeping a result.
+    Args:
+        build: Function creating the objects to measure
+    Returns:
+        Retained and peak traced bytes
+    """
+    tracemalloc.start()
+    try:
+        result = build()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return retained, peak
+
+
+def filter_heavy(source: DynamicArray) -> List[DynamicArray]:
+    """Filter a large array down to ten elements several times.
+    Args:
+        source: Array of FILTER_SOURCE_SIZE consecutive integers
+    Returns:
+        Filtered arrays, kept alive for measurement
+    """
+    step = FILTER_SOURCE_SIZE // 10
+    return [source.filter(functools.partial(_has_remainder, step, k))
+            for k in range(FILTER_RUNS)]
+
+
+def _has_remainder(step: int, remainder: int, value: int) -> bool:
+    """Check value modulo step."""
+    return value % step == remainder
+
+
+def many_small() -> List[DynamicArray]:
+    """Create many one-element arrays.
+    Returns:
+        Created arrays, kept alive for measurement
+    """
+    return [DynamicArray.from_list([i]) for i in range(SMALL_ARRAYS)]
+
+
+def ingest_listed(path: str) -> DynamicArray:
+    """Load a file of integers through an intermediate list.
+    Args:
+        path: File with one integer per line
+    Returns:
+        Loaded array
+    """
+    with open(path) as source:
+        return DynamicArray.from_list([int(line) for line in source])
+
+
+def ingest_streamed(path: str) -> DynamicArray:
+    """Load a file of integers in a single streaming pass.
+    Args:
+        path: File with one integer per line
+    Returns:
+        Loaded array
+    """
+    return DynamicArray.from_file(path, int)
+
+
+def main() -> None:
+    """Print tracemalloc figures for the memory workloads."""
+    source = DynamicArray.from_list(list(range(FILTER_SOURCE_SIZE)))
+    retained, peak = measure(lambda: filter_heavy(source))
+    print('{} filters of {} -> 10 items: retained {:.1f} MB, '
+          'peak {:.1f} MB'.format(FILTER_RUNS, FILTER_SOURCE_SIZE,
+                                  retained / 1e6, peak / 1e6))
+    retained, _ = measure(many_small)
+    print('{} one-element arrays: retained {:.1f} MB'.format(
+        SMALL_ARRAYS, retained / 1e6))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'ints.txt')
+        DynamicArray.from_iterable(range(INGEST_SIZE)).to_file(path)
+        for name, load in (('listed', ingest_listed),
+                           ('streamed', ingest_streamed)):
+            retained, peak = measure(functools.partial(load, path))
+            print('ingest {} lines {}: retained {:.1f} MB, peak {:.1f} MB'
+                  .format(INGEST_SIZE, name, retained / 1e6, peak / 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,336 @@
+import argparse
+import fnmatch
+import json
+import math
+import platform
+import sys
+import time
+from typing import (Any, Callable, Dict, Iterable, List, NamedTuple,
+                    Optional, Sequence)
+
+from benchmarks import contention, memory
+from benchmarks.cases import CASES, Case
+
+DEFAULT_SIZES = (10, 100, 1000, 10000, 100000, 1000000, 10000000)
+
+# Minimum total time of one timing run, in seconds
+MIN_TIME = 0.05
+# Timing runs per size, the fastest one is kept
+REPEATS = 3
+# Larger sizes are skipped once one call takes longer than this
+BUDGET = 1.0
+# Default slowdown ratio counted as a regression
+THRESHOLD = 1.5
+# Per-call times below this are too noisy to compare
+NOISE_FLOOR = 1e-6
+# Sizes below this are left out of the exponent fit if possible
+FIT_MIN_SIZE = 1000
+
+Timings = Dict[int, float]
+Results = Dict[str, Timings]
+
+
+class Regression(NamedTuple):
+    """Case that got slower than the baseline allows.
+
+    Attributes:
+        case: Case name
+        size: Input size
+        baseline: Baseline seconds per call
+        current: Current seconds per call
+    """
+    case: str
+    size: int
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        """Get slowdown factor."""
+        return self.current / self.baseline
+
+
+def time_call(func: Callable[[], Any], min_time: float = MIN_TIME,
+              repeats: int = REPEATS) -> float:
+    """Time a call, looping until each run lasts at least min_time.
+    Args:
+        func: Function to time
+        min_time: Minimum total seconds of one run
+        repeats: Number of runs, the fastest one is kept
+    Returns:
+        Seconds per call
+    """
+    number = 1
+    while True:
+        elapsed = _run(func, number)
+        if elapsed >= min_time:
+            break
+        number *= 10
+    for _ in range(repeats - 1):
+        elapsed = min(elapsed, _run(func, number))
+    return elapsed / number
+
+
+def _run(func: Callable[[], Any], number: int) -> float:
+    """Call a function repeatedly.
+    Args:
+        func: Function to call
+        number: Number of calls
+    Returns:
+        Total seconds
+    """
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return time.perf_counter() - start
+
+
+def bench_case(case: Case, sizes: Iterable[int],
+               min_time: float = MIN_TIME,
+               budget: float = BUDGET) -> Timings:
+    """Time one case across sizes.
+    Args:
+        case: Case to time
+        sizes: Input sizes in increasing order
+        min_time: Minimum total seconds of one timing run
+        budget: Seconds per call after which larger sizes are skipped
+    Returns:
+        Seconds per call by size
+    """
+    timings: Timings = {}
+    for size in sizes:
+        if case.max_size is not None and size > case.max_size:
+            break
+        state = case.setup(size)
+        timings[size] = time_call(lambda: case.run(state), min_time)
+        if timings[size] > budget:
+            break
+    return timings
+
+
+def fit_exponent(timings: Timings) -> Optional[float]:
+    """Fit time ~ size ** k by least squares on a log-log scale.
+    Sizes below FIT_MIN_SIZE are ignored when at least two larger
+    ones were timed, as fixed overheads dominate them.
+    Args:
+        timings: Seconds per call by size
+    Returns:
+        Exponent k, or None with fewer than two sizes
+    """
+    points = [(size, seconds) for size, seconds in sorted(timings.items())
+              if seconds > 0]
+    large = [point for point in points if point[0] >= FIT_MIN_SIZE]
+    if len(large) >= 2:
+        points = large
+    if len(points) < 2:
+        return None
+    xs = [math.log(size) for size, _ in points]
+    ys = [math.log(seconds) for _, seconds in points]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    spread = sum((x - mean_x) ** 2 for x in xs)
+    return sum((x - mean_x) * (y - mean_y)
+               for x, y in zip(xs, ys)) / spread
+
+
+def select(patterns: Optional[Sequence[str]]) -> List[Case]:
+    """Select cases whose name matches any glob pattern.
+    Args:
+        patterns: Patterns such as 'dynamic_array.*' or '*.cons',
+            None selects every case
+    Returns:
+        Matching cases in definition order
+    """
+    if not patterns:
+        return list(CASES)
+    return [case for case in CASES
+            if any(fnmatch.fnmatchcase(case.name, pattern)
+                   for pattern in patterns)]
+
+
+def run(cases: Iterable[Case], sizes: Sequence[int],
+        min_time: float = MIN_TIME, budget: float = BUDGET,
+        progress: Optional[Callable[[str], None]] = None) -> Results:
+    """Time every case across sizes.
+    Args:
+        cases: Cases to time
+        sizes: Input sizes
+        min_time: Minimum total seconds of one timing run
+        budget: Seconds per call after which larger sizes are skipped
+        progress: Optional callback receiving one line per case
+    Returns:
+        Seconds per call by size, keyed by case name
+    """
+    results: Results = {}
+    for case in cases:
+        results[case.name] = bench_case(case, sorted(sizes), min_time,
+                                        budget)
+        if progress is not None:
+            progress(format_row(case.name, results[case.name]))
+    return results
+
+
+def format_row(name: str, timings: Timings) -> str:
+    """Format one case as a report line.
+    Args:
+        name: Case name
+        timings: Seconds per call by size
+    Returns:
+        Line with the exponent and the time at the largest size
+    """
+    exponent = fit_exponent(timings)
+    size = max(timings)
+    return '{:<34} k={:>5}  {:>10.3e} s @ {}'.format(
+        name, '-' if exponent is None else '{:.2f}'.format(exponent),
+        timings[size], size)
+
+
+def to_json(results: Results) -> Dict[str, Any]:
+    """Convert results to a JSON document.
+    Args:
+        results: Seconds per call by size, keyed by case name
+    Returns:
+        Document with environment metadata, timings and exponents
+    """
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cases': {
+            name: {
+                'seconds': {str(size): seconds
+                            for size, seconds in timings.items()},
+                'exponent': fit_exponent(timings),
+            }
+            for name, timings in results.items()
+        },
+    }
+
+
+def from_json(document: Dict[str, Any]) -> Results:
+    """Read results back from a JSON document.
+    Args:
+        document: Document created by to_json
+    Returns:
+        Seconds per call by size, keyed by case name
+    """
+    return {name: {int(size): seconds
+                   for size, seconds in case['seconds'].items()}
+            for name, case in document['cases'].items()}
+
+
+def find_regressions(results: Results, baseline: Results,
+                     threshold: float = THRESHOLD) -> List[Regression]:
+    """Compare results with a baseline.
+    Only sizes timed in both are compared, and times under
+    NOISE_FLOOR are ignored.
+    Args:
+        results: Current seconds per call
+        baseline: Baseline seconds per call
+        threshold: Slowdown ratio counted as a regression
+    Returns:
+        Regressions sorted by case name and size
+    """
+    regressions = []
+    for name in sorted(results.keys() & baseline.keys()):
+        timings = results[name]
+        for size in sorted(timings.keys() & baseline[name].keys()):
+            before = baseline[name][size]
+            if (max(before, timings[size]) >= NOISE_FLOOR and
+                    timings[size] > before * threshold):
+                regressions.append(Regression(name, size, before,
+                                              timings[size]))
+    return regressions
+
+
+def parse_args(argv: Optional[Sequence[str]]) -> argparse.Namespace:
+    """Parse command line options.
+    Args:
+        argv: Arguments without the program name
+    Returns:
+        Parsed options
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description='Time DynamicArray methods against list and tuple.')
+    parser.add_argument('cases', nargs='*', metavar='PATTERN',
+                        help="case name globs, e.g. 'dynamic_array.*'")
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=list(DEFAULT_SIZES))
+    parser.add_argument('--max-size', type=int,
+                        help='skip sizes above this')
+    parser.add_argument('--min-time', type=float, default=MIN_TIME,
+                        help='minimum seconds of one timing run')
+    parser.add_argument('--budget', type=float, default=BUDGET,
+                        help='seconds per call before larger sizes '
+                             'are skipped')
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--baseline',
+                        help='compare with results in this JSON file')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help='slowdown ratio counted as a regression')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='write results to the baseline file')
+    parser.add_argument('--memory', action='store_true',
+                        help='run the tracemalloc benchmark instead')
+    parser.add_argument('--contention', action='store_true',
+                        help='run the ArrayRef thread contention benchmark '
+                             'instead')
+    parser.add_argument('--list', action='store_true',
+                        help='list case names and exit')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run benchmarks from the command line.
+    Args:
+        argv: Arguments without the program name, defaults to sys.argv
+    Returns:
+        Exit status, 1 if any case regressed against the baseline
+    """
+    options = parse_args(argv)
+    if options.memory:
+        memory.main()
+        return 0
+    if options.contention:
+        contention.main()
+        return 0
+    cases = select(options.cases)
+    if options.list:
+        for case in cases:
+            print(case.name)
+        return 0
+    sizes = [size for size in options.sizes
+             if options.max_size is None or size <= options.max_size]
+    results = run(cases, sizes, options.min_time, options.budget, print)
+    if options.output:
+        _write(options.output, results)
+    if options.baseline and options.update_baseline:
+        _write(options.baseline, results)
+    elif options.baseline:
+        with open(options.baseline) as source:
+            baseline = from_json(json.load(source))
+        regressions = find_regressions(results, baseline,
+                                       options.threshold)
+        for regression in regressions:
+            print('REGRESSION {} @ {}: {:.3e} s -> {:.3e} s ({:.2f}x)'
+                  .format(regression.case, regression.size,
+                          regression.baseline, regression.current,
+                          regression.ratio))
+        if regressions:
+            return 1
+    return 0
+
+
+def _write(path: str, results: Results) -> None:
+    """Write results as JSON.
+    Args:
+        path: Output file
+        results: Seconds per call by size, keyed by case name
+    """
+    with open(path, 'w') as target:
+        json.dump(to_json(results), target, indent=2, sort_keys=True)
+        target.write('\n')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
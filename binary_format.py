@@ -0,0 +1,294 @@
+import mmap
+import pickle
+import struct
+import sys
+from array import array
+from itertools import islice
+from typing import Any, Iterable, Iterator, List, Optional, Tuple, Union
+
+MAGIC = b'DYNA'
+VERSION = 1
+
+# Payload kinds
+TYPED = 0
+RECORDS = 1
+
+# magic, version, kind, typecode, byte order, item size, count and
+# index offset; 32 bytes so typed payloads start 8-byte aligned
+HEADER = struct.Struct('<4sBBccB7xQQ')
+LENGTH = struct.Struct('<Q')
+
+_BYTE_ORDER = b'<' if sys.byteorder == 'little' else b'>'
+
+# Elements packed per write when streaming a typed payload
+_CHUNK = 65536
+
+
+def write(path: str, items: Iterable[Any],
+          typecode: Optional[str] = None) -> int:
+    """Write elements in the binary format.
+    Typed files hold a header and the raw values. Record files hold a
+    header, one length-prefixed pickle per element and an index of
+    record offsets for O(1) access.
+    Args:
+        path: File to write
+        items: Elements, streamed once
+        typecode: array module typecode for a typed payload, None
+            writes pickle records
+    Returns:
+        Number of elements written
+    """
+    with open(path, 'wb') as target:
+        target.write(header(RECORDS, None, 0, 0))
+        if typecode is not None:
+            count = 0
+            iterator = iter(items)
+            while True:
+                chunk = array(typecode, islice(iterator, _CHUNK))
+                if not chunk:
+                    break
+                chunk.tofile(target)
+                count += len(chunk)
+            first = header(TYPED, typecode, count, 0)
+        else:
+            offsets = array('Q')
+            for item in items:
+                offsets.append(target.tell())
+                target.write(_frame(item))
+            count = len(offsets)
+            index = target.tell()
+            offsets.tofile(target)
+            first = header(RECORDS, None, count, index)
+        target.seek(0)
+        target.write(first)
+    return count
+
+
+def encode(items: Iterable[Any],
+           typecode: Optional[str] = None) -> List[Any]:
+    """Encode elements in the binary format in memory.
+    Args:
+        items: Elements, iterated once
+        typecode: array module typecode for a typed payload, None
+            encodes pickle records
+    Returns:
+        Buffers whose concatenated bytes are the file write() would
+        produce
+    """
+    if typecode is not None:
+        values = (items if isinstance(items, array) and
+                  items.typecode == typecode else array(typecode, items))
+        return [header(TYPED, typecode, len(values), 0), values]
+    pieces: List[Any] = [b'']
+    offsets = array('Q')
+    position = HEADER.size
+    for item in items:
+        record = _frame(item)
+        offsets.append(position)
+        pieces.append(record)
+        position += len(record)
+    pieces[0] = header(RECORDS, None, len(offsets), position)
+    pieces.append(offsets)
+    return pieces
+
+
+def header(kind: int, typecode: Optional[str], count: int,
+           index: int) -> bytes:
+    """Pack a header for this platform's byte order.
+    Args:
+        kind: TYPED or RECORDS
+        typecode: array module typecode of typed payloads
+        count: Number of elements
+        index: Offset of the record index, 0 for typed payloads
+    Returns:
+        HEADER.size bytes
+    """
+    if typecode is None:
+        return HEADER.pack(MAGIC, VERSION, kind, b'\0', _BYTE_ORDER, 0,
+                           count, index)
+    return HEADER.pack(MAGIC, VERSION, kind, typecode.encode('ascii'),
+                       _BYTE_ORDER, array(typecode).itemsize, count, index)
+
+
+class BinaryArray:
+    """Read-only sequence over a buffer holding the binary format.
+
+    Typed elements are read straight from the buffer; records are
+    unpickled on access.
+
+    Attributes:
+        typecode: array module typecode of typed payloads, None for
+            records
+    """
+    __slots__ = ('typecode', '_buffer', '_values', '_offsets', '_count')
+
+    def __init__(self, buffer: Any):
+        """View a buffer written by write() or encode().
+        Args:
+            buffer: mmap or memoryview over the encoded bytes
+        Raises:
+            ValueError: If the buffer is not in the binary format or
+                was written with another byte order or item size
+        """
+        values, offsets, count, typecode = _parse(buffer)
+        self.typecode = typecode
+        self._buffer = buffer
+        self._values = values
+        self._offsets = offsets
+        self._count = count
+
+    def __len__(self) -> int:
+        """Get number of elements.
+        Returns:
+            Element count from the header
+        """
+        return self._count
+
+    def __getitem__(self, key: Union[int, slice]) -> Any:
+        """Get one element, or copy a range into memory.
+        Args:
+            key: Non-negative index, or slice
+        Returns:
+            Element, or typed array / tuple holding the range
+        Raises:
+            IndexError: If index out of bounds
+        """
+        if isinstance(key, slice):
+            if self._values is not None:
+                values = self._values[key]
+                result: Any = array(self._values.format)
+                result.frombytes(values.cast('B') if values.contiguous
+                                 else values.tobytes())
+                return result
+            return tuple(map(self._record, range(self._count)[key]))
+        if key < 0 or key >= self._count:
+            raise IndexError("Index out of range")
+        if self._values is not None:
+            return self._values[key]
+        return self._record(key)
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate elements in order without materialising them.
+        The iterator keeps the sequence alive, so shared arrays are
+        not released while it runs.
+        Returns:
+            Iterator over elements
+        """
+        if self._values is not None:
+            yield from self._values
+        else:
+            yield from map(self._record, range(self._count))
+
+    def values(self) -> Optional[memoryview]:
+        """Get the typed values without copying them.
+        Returns:
+            Memoryview over the typed payload, None for records
+        """
+        return self._values
+
+    def _release(self) -> None:
+        """Release the views into the buffer."""
+        if self._values is not None:
+            self._values.release()
+        if self._offsets is not None:
+            self._offsets.release()
+
+    def _record(self, index: int) -> Any:
+        """Unpickle one record.
+        Args:
+            index: Index in range [0, len)
+        Returns:
+            Element
+        """
+        assert self._offsets is not None
+        start = self._offsets[index]
+        size, = LENGTH.unpack_from(self._buffer, start)
+        start += LENGTH.size
+        return pickle.loads(self._buffer[start:start + size])
+
+
+class MappedArray(BinaryArray):
+    """Read-only sequence backed by a memory-mapped binary file.
+
+    Opening is O(1): nothing is read until elements are accessed, and
+    processes mapping the same file share the page cache. Pickling a
+    MappedArray reopens the file by path instead of copying it.
+
+    Attributes:
+        path: Mapped file
+    """
+    __slots__ = ('path',)
+
+    def __init__(self, path: str):
+        """Map a file written by write().
+        Args:
+            path: File to map
+        Raises:
+            ValueError: If the file is not in the binary format or was
+                written with another byte order or item size
+        """
+        with open(path, 'rb') as source:
+            mapped = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            super().__init__(mapped)
+        except ValueError:
+            mapped.close()
+            raise
+        self.path = path
+
+    def __reduce__(self) -> Tuple[Any, Tuple[str]]:
+        """Pickle as the path, so other processes map the same file."""
+        return MappedArray, (self.path,)
+
+    def close(self) -> None:
+        """Unmap the file. Elements can no longer be read."""
+        self._release()
+        self._buffer.close()
+
+
+def _frame(item: Any) -> bytes:
+    """Pickle one element as a length-prefixed record.
+    Args:
+        item: Element
+    Returns:
+        Record bytes
+    """
+    record = pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+    return LENGTH.pack(len(record)) + record
+
+
+def _parse(buffer: Any) -> Tuple[Optional[memoryview],
+                                 Optional[memoryview], int,
+                                 Optional[str]]:
+    """Validate the header and view the payload.
+    Args:
+        buffer: Encoded bytes
+    Returns:
+        Typed values, record offsets, element count and typecode
+    Raises:
+        ValueError: If the header is invalid or incompatible
+    """
+    if len(buffer) < HEADER.size:
+        raise ValueError("Buffer too short for a header")
+    (magic, version, kind, code, order, itemsize, count,
+     index) = HEADER.unpack_from(buffer)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a DynamicArray binary file")
+    if order != _BYTE_ORDER:
+        raise ValueError("File was written with another byte order")
+    if kind == TYPED:
+        typecode = code.decode('ascii')
+        if array(typecode).itemsize != itemsize:
+            raise ValueError("Item size differs on this platform")
+        end = HEADER.size + count * itemsize
+        if end > len(buffer):
+            raise ValueError("Buffer too short for {} values".format(count))
+        values = memoryview(buffer)[HEADER.size:end].cast(typecode)
+        return values, None, count, typecode
+    if kind == RECORDS:
+        end = index + count * LENGTH.size
+        if index < HEADER.size or end > len(buffer):
+            raise ValueError("Buffer too short for {} records".format(count))
+        offsets = memoryview(buffer)[index:end].cast('Q')
+        return None, offsets, count, None
+    raise ValueError("Unknown payload kind: {}".format(kind))
@@ -1,60 +1,641 @@
-from typing import Any, Callable, Generator, List, Tuple, TypeVar
+import builtins
+import functools
+import operator
+import threading
+import weakref
+from array import array
+from concurrent.futures import Executor
+from itertools import chain, compress, islice, repeat
+from typing import (Any, AsyncIterable, AsyncIterator, Awaitable, Callable,
+                    Dict, Generator, Iterable, Iterator, List, Mapping,
+                    NamedTuple, Optional, SupportsIndex, Tuple, TypeVar,
+                    Union, overload)
+
+import asynchronous
+import binary_format
+import instrumentation
+import parallel
+import shared
+import streaming
+from binary_format import BinaryArray, MappedArray
+from lazy_array import LazyArray
+from persistent_vector import WIDTH, PersistentVector
+from typed_kernels import (DTYPES, UNHANDLED, ScalarOp, filter_kernel,
+                           map_kernel, python_type, reduce_kernel, to_typed)
 
 T = TypeVar('T')
 U = TypeVar('U')
 
+Storage = Union[Tuple[Any, ...], List[Any], PersistentVector,
+                'array[Any]', BinaryArray]
+
+TUPLE_BACKEND = 'tuple'
+TRIE_BACKEND = 'trie'
+TYPED_BACKEND = 'typed'
+MMAP_BACKEND = 'mmap'
+SHARED_BACKEND = 'shared'
+BACKENDS = (TUPLE_BACKEND, TRIE_BACKEND)
+
+# Operations accepted by apply_patch
+PATCH_SET = 'set'
+PATCH_INSERT = 'insert'
+PATCH_DELETE = 'delete'
+
+# Elements copied at a time when reading a view of flat storage
+_READ_CHUNK = 1024
+
+# Returned by next() once an iterator is exhausted, and default of
+# optional arguments that may be None
+_MISSING = object()
+
+
+class _SortOrder(NamedTuple):
+    """Ordering an array is known to follow.
+
+    Attributes:
+        key: Key function passed to sort, None for natural order
+        reverse: Whether keys are in descending order
+    """
+    key: Optional[Callable[[Any], Any]]
+    reverse: bool
+
+    def flipped(self) -> '_SortOrder':
+        """Get the order of the reversed elements."""
+        return _SortOrder(self.key, not self.reverse)
+
 
 class DynamicArray:
     """Immutable dynamic array implementation supporting
     functional programming style operations.
 
+    Two storage backends are available. The default 'tuple' backend
+    keeps elements in a flat tuple, so every update copies it. The
+    'trie' backend keeps them in a PersistentVector that shares
+    unchanged nodes between versions, making get/set O(log32 n) and
+    concat O(m log32 n) in the appended length. Arrays frozen from an
+    ArrayBuilder may hold the builder's list, which is never mutated
+    again.
+
+    Passing a dtype such as 'f8' or 'i4' selects the 'typed' backend,
+    which packs numbers into a stdlib array buffer. Its map, filter and
+    reduce run ScalarOp functions from typed_kernels, operator.add,
+    min and max as batch kernels (using NumPy for float64 data when it
+    is installed). Any other callable takes the generic path, and
+    results that no longer fit the dtype fall back to a tuple.
+
+    Slicing (arr[a:b], slice, take, drop, split_at) returns views that
+    read the parent's storage through an offset and stride instead of
+    copying it. Operations that rebuild storage copy the view first;
+    compact() does so explicitly to release a large parent.
+
     Attributes:
-        _data: Tuple storing the elements
+        _data: Tuple, list, PersistentVector or typed array storing
+            the elements
         _length: Number of actual elements in the array
-        _capacity: Capacity of the array
+        _capacity: Logical capacity; storage holds no padding, so
+            this only drives when the growth factor is applied
         _growth_factor: Growth factor for expansion, default 2.0
+        _offset: Storage position of the first element
+        _stride: Storage distance between consecutive elements
+        _indexed: Whether lookups use a cached hash index
+        _index: Lazily built hash index, None until first lookup
+        _hash: Cached hash of the elements, None until first hashed
+        _sorted: Order the elements are known to be sorted in, or None
     """
-    def __init__(self, data: Tuple[Any, ...], length: int, capacity: int,
-                 growth_factor: float = 2.0):
+    __slots__ = ('_data', '_length', '_capacity', '_growth_factor',
+                 '_offset', '_stride', '_indexed', '_index', '_hash',
+                 '_sorted', '__weakref__')
+
+    def __init__(self, data: Storage, length: int, capacity: int,
+                 growth_factor: float = 2.0, offset: int = 0,
+                 stride: int = 1):
         """Initialize dynamic array.
         Args:
-            data: Tuple containing elements
+            data: Tuple, list, PersistentVector or typed array
+                containing elements
             length: Number of elements in the array
             capacity: Array capacity
             growth_factor: Growth factor for expansion, default 2.0
+            offset: Storage position of the first element, default 0
+            stride: Storage distance between elements, default 1
         """
         self._data = data
         self._length = length
         self._capacity = capacity
         self._growth_factor = growth_factor
+        self._offset = offset
+        self._stride = stride
+        self._indexed = False
+        self._index: Optional[_HashIndex] = None
+        self._hash: Optional[int] = None
+        self._sorted: Optional[_SortOrder] = None
 
     @staticmethod
-    def empty(growth_factor: float = 2.0) -> 'DynamicArray':
+    def empty(growth_factor: float = 2.0, backend: str = TUPLE_BACKEND,
+              dtype: Optional[str] = None) -> 'DynamicArray':
         """Create an empty dynamic array.
         Args:
             growth_factor: Growth factor for expansion, default 2.0
+            backend: Storage backend, 'tuple' or 'trie'
+            dtype: Element type code for the typed backend, e.g. 'f8'
         Returns:
             New empty dynamic array
         """
-        return DynamicArray((), 0, 0, growth_factor)
+        return DynamicArray(_make_storage(backend, (), dtype), 0, 0,
+                            growth_factor)
 
     @staticmethod
-    def from_list(py_list: List[T], growth_factor: float =
-                 2.0) -> 'DynamicArray':
+    def from_list(py_list: List[T], growth_factor: float = 2.0,
+                  backend: str = TUPLE_BACKEND,
+                  dtype: Optional[str] = None) -> 'DynamicArray':
         """Create dynamic array from Python list.
         Args:
             py_list: Python list
             growth_factor: Growth factor for expansion, default 2.0
+            backend: Storage backend, 'tuple' or 'trie'
+            dtype: Element type code for the typed backend, e.g. 'f8'
         Returns:
             Dynamic array containing list elements
         """
         length = len(py_list)
         capacity = length
-        data = tuple(py_list)
+        data = _make_storage(backend, py_list, dtype)
+        instrumentation.allocated(length)
         return DynamicArray(data, length, capacity, growth_factor)
 
+    @staticmethod
+    def from_iterable(items: Iterable[Any],
+                      size_hint: Optional[int] = None,
+                      growth_factor: float = 2.0,
+                      backend: str = TUPLE_BACKEND,
+                      dtype: Optional[str] = None) -> 'DynamicArray':
+        """Create dynamic array from any iterable in a single pass.
+        No intermediate list is built, so peak memory stays close to
+        the size of the result.
+        Args:
+            items: Elements in order, consumed once
+            size_hint: Expected number of elements, reserved as
+                capacity so later growth starts from it
+            growth_factor: Growth factor for expansion, default 2.0
+            backend: Storage backend, 'tuple' or 'trie'
+            dtype: Element type code for the typed backend, e.g. 'f8'
+        Returns:
+            Dynamic array containing the elements
+        """
+        data = _make_storage(backend, items, dtype)
+        length = len(data)
+        instrumentation.allocated(length)
+        return DynamicArray(data, length, max(length, size_hint or 0),
+                            growth_factor)
+
+    @staticmethod
+    async def afrom_async_iterable(items: AsyncIterable[Any],
+                                   size_hint: Optional[int] = None,
+                                   growth_factor: float = 2.0,
+                                   backend: str = TUPLE_BACKEND,
+                                   dtype: Optional[str] = None
+                                   ) -> 'DynamicArray':
+        """Create dynamic array from an async iterable.
+        Args:
+            items: Elements in order, consumed once
+            size_hint: Expected number of elements, reserved as
+                capacity so later growth starts from it
+            growth_factor: Growth factor for expansion, default 2.0
+            backend: Storage backend, 'tuple' or 'trie'
+            dtype: Element type code for the typed backend, e.g. 'f8'
+        Returns:
+            Dynamic array containing the elements
+        """
+        # The builder's list becomes the storage, so no second copy
+        # of the elements is held while ingesting
+        builder = ArrayBuilder(growth_factor, backend, dtype)
+        append = builder.append
+        async for item in items:
+            append(item)
+        built = builder.freeze()
+        return DynamicArray(built._data, built._length,
+                            max(built._length, size_hint or 0),
+                            growth_factor)
+
+    @staticmethod
+    def from_file(path: str,
+                  parse: Optional[Callable[[str], Any]] = None,
+                  records: bool = False,
+                  size_hint: Optional[int] = None,
+                  growth_factor: float = 2.0,
+                  backend: str = TUPLE_BACKEND,
+                  dtype: Optional[str] = None,
+                  encoding: str = 'utf-8') -> 'DynamicArray':
+        """Stream a file into a dynamic array.
+        Text files hold one element per line; record files hold
+        consecutive pickles as written by to_file(records=True) and
+        must come from a trusted source.
+        Args:
+            path: File to read
+            parse: Function converting a line without its newline into
+                an element, default keeps the string
+            records: Read pickle records instead of lines
+            size_hint: Expected number of elements
+            growth_factor: Growth factor for expansion, default 2.0
+            backend: Storage backend, 'tuple' or 'trie'
+            dtype: Element type code for the typed backend, e.g. 'f8'
+            encoding: Text encoding of line files
+        Returns:
+            Dynamic array containing the file's elements
+        """
+        if records:
+            items = streaming.read_records(path)
+        else:
+            items = streaming.read_lines(path, parse, encoding)
+        return DynamicArray.from_iterable(items, size_hint, growth_factor,
+                                          backend, dtype)
+
+    @staticmethod
+    def open_mmap(path: str, growth_factor: float = 2.0) -> 'DynamicArray':
+        """Open a file written by save() as a read-only mapped array.
+        Opening is O(1) and reads nothing; get, iteration and slicing
+        read straight from the mapping, and processes opening the
+        same file share its pages. Operations that build new arrays
+        copy the elements into memory as usual. Record files are
+        unpickled on access, so only open trusted files.
+        Args:
+            path: File to map
+            growth_factor: Growth factor of derived arrays
+        Returns:
+            Array backed by the mapped file
+        Raises:
+            ValueError: If the file is not in the binary format
+        """
+        data = MappedArray(path)
+        return DynamicArray(data, len(data), len(data), growth_factor)
+
+    def save(self, path: str) -> int:
+        """Write elements in the binary format read by open_mmap.
+        Typed arrays store raw values, other arrays store one pickle
+        record per element.
+        Args:
+            path: File to write
+        Returns:
+            Number of elements written
+        """
+        return binary_format.write(path, self._elements(),
+                                   _typecode_of(self._data))
+
+    def to_shared(self) -> shared.SharedHandle:
+        """Copy the elements into a new shared memory block.
+        Typed arrays are copied raw, other elements are pickled once.
+        The returned handle owns the block: pass it to workers, which
+        call attach() to read the elements without copying them, and
+        unlink it when they are done.
+        Returns:
+            Picklable handle owning the block
+        """
+        typed = self._buffer()
+        return shared.share(self._elements() if typed is None else typed,
+                            _typecode_of(self._data))
+
+    @staticmethod
+    def attach(handle: shared.SharedHandle,
+               growth_factor: float = 2.0) -> 'DynamicArray':
+        """Open array data shared by to_shared() as a read-only array.
+        Attaching is O(1) and copies nothing; the mapping is released
+        when the array is garbage collected. Arrays derived from it
+        are stored in memory as usual. Pickling an attached array
+        sends only the block name.
+        Args:
+            handle: Handle returned by to_shared(), possibly unpickled
+                in another process
+            growth_factor: Growth factor of derived arrays
+        Returns:
+            Array backed by the shared block
+        Raises:
+            FileNotFoundError: If the block was unlinked
+        """
+        data = shared.SharedArray(handle.name)
+        return DynamicArray(data, len(data), len(data), growth_factor)
+
+    def to_file(self, path: str,
+                render: Optional[Callable[[Any], str]] = None,
+                records: bool = False, encoding: str = 'utf-8') -> int:
+        """Stream elements to a file without copying the array.
+        Args:
+            path: File to write
+            render: Function converting an element to one line of text,
+                default str
+            records: Write pickle records instead of lines
+            encoding: Text encoding of line files
+        Returns:
+            Number of elements written
+        Raises:
+            ValueError: If a rendered element contains a line break
+        """
+        if records:
+            return streaming.write_records(path, self._elements())
+        return streaming.write_lines(path, self._elements(), render,
+                                     encoding)
+
+    @staticmethod
+    def builder(growth_factor: float = 2.0, backend: str = TUPLE_BACKEND,
+                dtype: Optional[str] = None) -> 'ArrayBuilder':
+        """Create an empty mutable builder for bulk construction.
+        Args:
+            growth_factor: Growth factor of the frozen array
+            backend: Storage backend of the frozen array
+            dtype: Element type code of the frozen array
+        Returns:
+            New empty builder
+        """
+        return ArrayBuilder(growth_factor, backend, dtype)
+
+    def transient(self) -> 'ArrayBuilder':
+        """Create a mutable builder holding a copy of the elements.
+        Returns:
+            Builder with the same elements, backend and growth factor
+        """
+        if self.dtype() is not None:
+            result = ArrayBuilder(self._growth_factor,
+                                  dtype=self.dtype())
+        elif isinstance(self._data, PersistentVector):
+            result = ArrayBuilder(self._growth_factor, TRIE_BACKEND)
+        else:
+            result = ArrayBuilder(self._growth_factor)
+        result.extend(self._elements())
+        instrumentation.allocated(self._length)
+        return result
+
+    def backend(self) -> str:
+        """Get name of the storage backend.
+        Returns:
+            'tuple', 'trie', 'typed', 'mmap' or 'shared'
+        """
+        if isinstance(self._data, PersistentVector):
+            return TRIE_BACKEND
+        if isinstance(self._data, array):
+            return TYPED_BACKEND
+        if isinstance(self._data, MappedArray):
+            return MMAP_BACKEND
+        if isinstance(self._data, shared.SharedArray):
+            return SHARED_BACKEND
+        return TUPLE_BACKEND
+
+    def dtype(self) -> Optional[str]:
+        """Get element type code of the typed backend.
+        Returns:
+            Type code such as 'f8', or None for untyped storage
+        """
+        typecode = _typecode_of(self._data)
+        return None if typecode is None else _dtype_of(typecode)
+
+    def indexed(self) -> 'DynamicArray':
+        """Create array that answers lookups through a hash index.
+        The index is built on the first member, count or index_of
+        call and cached for the life of the returned instance, making
+        later lookups O(1) on average. Arrays derived from it are not
+        indexed.
+        Returns:
+            Indexed array sharing this array's storage
+        """
+        result = DynamicArray(self._data, self._length, self._capacity,
+                              self._growth_factor, self._offset,
+                              self._stride)
+        result._indexed = True
+        result._sorted = self._sorted
+        return result
+
+    def _derive(self, items: Iterable[Any],
+                capacity: Optional[int] = None) -> 'DynamicArray':
+        """Create array with the same backend and growth factor.
+        Typed arrays fall back to a tuple when items do not fit the
+        dtype. Arrays mapped from typed files derive typed arrays.
+        Args:
+            items: Elements of the new array
+            capacity: Array capacity, defaults to the number of items
+        Returns:
+            New array
+        """
+        data: Optional[Storage] = None
+        typecode = _typecode_of(self._data)
+        if isinstance(self._data, PersistentVector):
+            data = PersistentVector.from_iterable(items)
+        elif typecode is not None:
+            if isinstance(items, array) and items.typecode == typecode:
+                data = items
+            else:
+                items = list(items)
+                data = to_typed(typecode, items)
+        if data is None:
+            data = tuple(items)
+        length = len(data)
+        instrumentation.allocated(length)
+        return DynamicArray(data, length,
+                            length if capacity is None else capacity,
+                            self._growth_factor)
+
+    def _elements(self) -> Iterator[Any]:
+        """Iterate stored elements without copying.
+        Views never walk the storage before their offset, so reading
+        one costs O(length) whatever its position, and stopping early
+        costs O(1).
+        Returns:
+            Iterator over the array's elements in order
+        """
+        data = self._data
+        if self._stride == 1:
+            start = self._offset
+            stop = start + self._length
+            if start == 0:
+                return islice(data, stop)
+            if isinstance(data, PersistentVector):
+                return data.iter_range(start, stop)
+            if not isinstance(data, BinaryArray):
+                # Bounded slices keep early exits O(1) and never hold
+                # a full copy of the view
+                return chain.from_iterable(
+                    data[position:min(position + _READ_CHUNK, stop)]
+                    for position in range(start, stop, _READ_CHUNK))
+        # Mapped and shared records are unpickled only for the view
+        return map(data.__getitem__, self._positions())
+
+    def _positions(self) -> range:
+        """Get storage positions of the elements.
+        Returns:
+            Range of storage indices in element order
+        """
+        return range(self._offset,
+                     self._offset + self._length * self._stride,
+                     self._stride)
+
+    def _is_view(self) -> bool:
+        """Check whether elements are not exactly the whole storage.
+        Returns:
+            True if storage must be copied before rebuilding it, which
+            includes read-only mapped files and shared memory
+        """
+        return (self._offset != 0 or self._stride != 1 or
+                len(self._data) != self._length or
+                isinstance(self._data, BinaryArray))
+
+    def _trie_suffix(self) -> Optional[PersistentVector]:
+        """Get trie storage whose last elements are exactly this array.
+        Such arrays, including tries grown by cons, are updated by
+        copying trie paths like whole tries.
+        Returns:
+            The trie, or None for other storage and other views
+        """
+        data = self._data
+        if (isinstance(data, PersistentVector) and self._stride == 1 and
+                self._offset + self._length == len(data)):
+            return data
+        return None
+
+    def compact(self) -> 'DynamicArray':
+        """Copy a view into storage of its own.
+        Call it to let a large parent be freed when only a small view
+        of it is kept.
+        Returns:
+            Array equal to this one that shares no storage with a
+            parent, or this array if it is not a view
+        """
+        if not self._is_view():
+            return self
+        if isinstance(self._data, PersistentVector):
+            data: Storage = PersistentVector.from_iterable(self._elements())
+        else:
+            positions = self._positions()
+            data = self._data[positions.start:
+                              positions.stop if positions.stop >= 0
+                              else None:
+                              positions.step]
+        instrumentation.allocated(self._length)
+        return DynamicArray(data, self._length, self._capacity,
+                            self._growth_factor)._with_order(self._sorted)
+
+    def _with_order(self, order: Optional[_SortOrder]) -> 'DynamicArray':
+        """Mark a newly created array as sorted.
+        Args:
+            order: Order its elements follow, or None
+        Returns:
+            This array
+        """
+        self._sorted = order
+        return self
+
+    def _typed_view(self) -> Optional[memoryview]:
+        """Get the typed elements without copying them.
+        Storage, mapped files, shared memory and views are all read in
+        place, so kernels never materialise them. Callers release the
+        memoryview when done, as mapped storage cannot close while it
+        is exported.
+        Returns:
+            Memoryview of the elements, or None for untyped storage
+        """
+        data = self._data
+        if isinstance(data, BinaryArray):
+            values = data.values()
+            if values is None:
+                return None
+        elif isinstance(data, array):
+            values = memoryview(data)
+        else:
+            return None
+        positions = self._positions()
+        return values[positions.start:
+                      positions.stop if positions.stop >= 0 else None:
+                      positions.step]
+
+    def _buffer(self) -> Optional['array[Any]']:
+        """Get typed storage holding exactly the elements.
+        Returns:
+            Typed buffer, or None for untyped storage
+        """
+        if _typecode_of(self._data) is None:
+            return None
+        data = self.compact()._data
+        return data if isinstance(data, array) else None
+
+    def slice(self, start: Optional[int] = None,
+              stop: Optional[int] = None,
+              step: Optional[int] = None) -> 'DynamicArray':
+        """Create a view of a range of elements without copying.
+        Args:
+            start: First index, default 0 (supports negative indexing)
+            stop: End index, exclusive, default length
+            step: Index step, default 1 (may be negative)
+        Returns:
+            View array following Python slice semantics
+        Raises:
+            ValueError: If step is 0
+        """
+        first, end, step = slice(start, stop, step).indices(self._length)
+        length = len(range(first, end, step))
+        if length == self._length and step == 1:
+            return self
+        order = self._sorted
+        if order is not None and step < 0:
+            order = order.flipped()
+        return DynamicArray(self._data, length, length,
+                            self._growth_factor,
+                            self._offset + first * self._stride,
+                            self._stride * step)._with_order(order)
+
+    def iter_chunks(self, size: int) -> Iterator['DynamicArray']:
+        """Iterate consecutive views of at most size elements.
+        Chunks are slice views, so no elements are copied.
+        Args:
+            size: Maximum number of elements per chunk
+        Returns:
+            Iterator over chunks in order
+        Raises:
+            ValueError: If size is not positive
+        """
+        if size <= 0:
+            raise ValueError("Chunk size must be positive")
+        return (self.slice(start, start + size)
+                for start in range(0, self._length, size))
+
+    def take(self, count: int) -> 'DynamicArray':
+        """Create a view of the first elements.
+        Args:
+            count: Number of elements to keep
+        Returns:
+            View array
+        Raises:
+            ValueError: If count is negative
+        """
+        if count < 0:
+            raise ValueError("Count must be non-negative")
+        return self.slice(0, count)
+
+    def drop(self, count: int) -> 'DynamicArray':
+        """Create a view without the first elements.
+        Args:
+            count: Number of elements to skip
+        Returns:
+            View array
+        Raises:
+            ValueError: If count is negative
+        """
+        if count < 0:
+            raise ValueError("Count must be non-negative")
+        return self.slice(count)
+
+    def split_at(self, index: int
+                 ) -> Tuple['DynamicArray', 'DynamicArray']:
+        """Split into two views at an index.
+        Args:
+            index: Split position (supports negative indexing)
+        Returns:
+            Views of the elements before and from index
+        """
+        return self.slice(None, index), self.slice(index)
+
     def cons(self, element: Any) -> 'DynamicArray':
         """Add element to the front of the array.
+        Amortised O(1) for tuple and typed arrays: the newest version
+        of a front buffer writes into its reserved head room, while
+        older versions and other storage copy into a new buffer grown
+        by the growth factor. Tries also keep head room at the front
+        and write into it persistently, in amortised O(log32 n).
         Args:
             element: Element to add
         Returns:
@@ -63,9 +644,42 @@ class DynamicArray:
         if self._length >= self._capacity:
             # Need to resize
             return self._resize().cons(element)
-        new_data = (element,) + self._data
-        return DynamicArray(new_data, self._length + 1,
-                            self._capacity, self._growth_factor)
+        data = self._data
+        offset = self._offset
+        typecode = _typecode_of(data)
+        if self._stride == 1 and offset > 0:
+            if isinstance(data, PersistentVector):
+                # Persistent writes leave older versions untouched
+                instrumentation.allocated(min(WIDTH, len(data)))
+                return DynamicArray(data.set(offset - 1, element),
+                                    self._length + 1, self._capacity,
+                                    self._growth_factor, offset - 1)
+            if (isinstance(data, (_FrontBuffer, _TypedFrontBuffer)) and
+                    (typecode is None or _fits(typecode, element)) and
+                    data.claim(offset)):
+                data[offset - 1] = element
+                return DynamicArray(data, self._length + 1,
+                                    self._capacity, self._growth_factor,
+                                    offset - 1)
+        size = max(self._length + 1,
+                   int(self._length * self._growth_factor))
+        headroom = size - self._length - 1
+        buffer: Storage
+        if isinstance(data, PersistentVector):
+            buffer = PersistentVector.from_iterable(
+                chain(repeat(None, headroom), (element,),
+                      self._elements()))
+        elif typecode is not None and _fits(typecode, element):
+            buffer = _TypedFrontBuffer(typecode, headroom)
+            buffer.append(element)
+            buffer.extend(self._elements())
+        else:
+            buffer = _FrontBuffer(headroom)
+            buffer.append(element)
+            buffer.extend(self._elements())
+        instrumentation.allocated(self._length + 1)
+        return DynamicArray(buffer, self._length + 1, self._capacity,
+                            self._growth_factor, headroom)
 
     def _resize(self) -> 'DynamicArray':
         """Expand array capacity.
@@ -77,9 +691,11 @@ class DynamicArray:
         # If new capacity equals current, increment by 1
         if new_capacity <= self._capacity:
             new_capacity = self._capacity + 1
-        new_data = self._data + (None,) * (new_capacity - self._capacity)
-        return DynamicArray(new_data, self._length,
-                            new_capacity, self._growth_factor)
+        instrumentation.resized()
+        # Capacity is logical, the storage itself is shared unchanged
+        return DynamicArray(self._data, self._length,
+                            new_capacity, self._growth_factor,
+                            self._offset, self._stride)
 
     def remove(self, value: Any) -> 'DynamicArray':
         """Remove first occurrence of value.
@@ -88,16 +704,174 @@ class DynamicArray:
         Returns:
             New array with value removed
         """
-        def _remove_rec(idx: int, acc: Tuple[Any, ...]) -> Tuple[Any, ...]:
-            if idx >= self._length:
-                return acc
-            current = self._data[idx]
-            if current == value and len(acc) == idx:
-                return acc + self._data[idx + 1:self._length]
-            return _remove_rec(idx + 1, acc + (current,))
-        result = _remove_rec(0, ())
-        return DynamicArray(result + (None,) * (self._capacity - len(result)),
-                            len(result), self._capacity, self._growth_factor)
+        idx = self._find(value)
+        if idx < 0:
+            return self._derive(self._elements(),
+                                self._capacity)._with_order(self._sorted)
+        elements = self._elements()
+        return self._derive(chain(islice(elements, idx),
+                                  islice(elements, 1, None)),
+                            self._capacity)._with_order(self._sorted)
+
+    def set_many(self, updates: Mapping[int, Any]) -> 'DynamicArray':
+        """Set elements at several indices in one pass.
+        Runs in O(n + k) instead of the O(n * k) of k set calls. The
+        trie backend copies each touched leaf and branch only once.
+        Args:
+            updates: New values by index (supports negative indexing)
+        Returns:
+            New updated array
+        Raises:
+            IndexError: If an index is out of bounds
+        """
+        resolved = {self._resolve(index): value
+                    for index, value in updates.items()}
+        trie = self._trie_suffix()
+        if trie is not None:
+            offset = self._offset
+            instrumentation.allocated(min(WIDTH * len(resolved),
+                                          self._length))
+            return DynamicArray(
+                trie.set_many((offset + index, value)
+                              for index, value in resolved.items()),
+                self._length, self._capacity, self._growth_factor, offset)
+        # Views are copied once, straight into the new storage
+        typecode = _typecode_of(self._data)
+        if (typecode is not None and
+                all(_fits(typecode, value) for value in resolved.values())):
+            new_data: Union[List[Any], 'array[Any]'] = array(
+                typecode, self._elements())
+        else:
+            new_data = list(self._elements())
+        for index, value in resolved.items():
+            new_data[index] = value
+        return self._derive(new_data, self._capacity)
+
+    def remove_all(self, value: Any = _MISSING,
+                   predicate: Optional[Callable[[Any], bool]] = None
+                   ) -> 'DynamicArray':
+        """Remove every element equal to value or matching predicate.
+        Runs in one pass, unlike repeated remove calls.
+        Args:
+            value: Value to remove
+            predicate: Function returning True for elements to remove,
+                instead of value
+        Returns:
+            New array without the removed elements
+        Raises:
+            ValueError: If not exactly one of value and predicate is
+                given
+        """
+        if (value is _MISSING) == (predicate is None):
+            raise ValueError("Give either a value or a predicate")
+        if predicate is None:
+            # Recognised by the typed kernels
+            return self.filter(ScalarOp('ne', value))
+        rejected = predicate
+        return self.filter(lambda current: not rejected(current))
+
+    def insert_at(self, index: int, items: Iterable[Any]) -> 'DynamicArray':
+        """Insert elements before an index.
+        Inserting at the end shares storage like concat.
+        Args:
+            index: Position of the first inserted element, from 0 to
+                length (supports negative indexing)
+            items: Elements to insert
+        Returns:
+            New array
+        Raises:
+            IndexError: If index out of bounds
+        """
+        adjusted_index = index if index >= 0 else self._length + index
+        if adjusted_index == self._length:
+            return self.concat(self._derive(items))
+        return self.apply_patch([(PATCH_INSERT, index, items)])
+
+    def delete_range(self, start: int, stop: int) -> 'DynamicArray':
+        """Delete elements from start up to stop.
+        Deleting a prefix or suffix returns a view without copying.
+        Args:
+            start: First deleted index, clamped like slicing
+            stop: End of the deleted range, exclusive
+        Returns:
+            New array without the range
+        """
+        first, end, _ = slice(start, stop).indices(self._length)
+        if end <= first:
+            return self
+        if first == 0:
+            return self.slice(end)
+        if end == self._length:
+            return self.slice(0, first)
+        return self.apply_patch([(PATCH_DELETE, first, end)])
+
+    def apply_patch(self, ops: Iterable[Tuple[str, int, Any]]
+                    ) -> 'DynamicArray':
+        """Apply several edits in a single pass.
+        Each operation is one of:
+            ('set', index, value)
+            ('insert', index, items), inserting before index
+            ('delete', start, stop)
+        Indices refer to this array, not to the result of earlier
+        operations, so the order of ops only matters for inserts at
+        the same index. Patches made only of sets run as set_many.
+        Args:
+            ops: Operations (support negative indexing)
+        Returns:
+            New patched array
+        Raises:
+            IndexError: If an index is out of bounds
+            ValueError: If an operation is unknown, or edits overlap
+        """
+        edits: List[Tuple[int, int, int, str, Any, int]] = []
+        length = self._length
+        for order, (op, position, argument) in enumerate(ops):
+            if op == PATCH_SET:
+                index = self._resolve(position)
+                edits.append((index, 1, order, op, argument, index + 1))
+            elif op == PATCH_INSERT:
+                index = (position if position >= 0
+                         else self._length + position)
+                if index < 0 or index > self._length:
+                    raise IndexError("Index out of range")
+                inserted = tuple(argument)
+                length += len(inserted)
+                edits.append((index, 0, order, op, inserted, index))
+            elif op == PATCH_DELETE:
+                first, end, _ = slice(position, argument).indices(
+                    self._length)
+                if end > first:
+                    length -= end - first
+                    edits.append((first, 1, order, op, None, end))
+            else:
+                raise ValueError("Unknown patch operation: {}".format(op))
+        # Inserts go before a set or delete at the same index
+        edits.sort(key=operator.itemgetter(0, 1, 2))
+        covered = 0
+        for first, replaces, _, _, _, end in edits:
+            if first < covered:
+                raise ValueError(
+                    "Patch operations overlap at index {}".format(first))
+            if replaces:
+                covered = end
+        if edits and all(edit[3] == PATCH_SET for edit in edits):
+            return self.set_many({edit[0]: edit[4] for edit in edits})
+        return self._derive(_patched(self._elements(), edits),
+                            max(self._capacity, length))
+
+    def _resolve(self, index: int) -> int:
+        """Resolve an index to an element position.
+        Args:
+            index: Index (supports negative indexing)
+        Returns:
+            Index in range [0, length)
+        Raises:
+            IndexError: If index out of bounds
+        """
+        adjusted_index = index if index >= 0 else self._length + index
+        if adjusted_index < 0 or adjusted_index >= self._length:
+            raise IndexError("Index out of range")
+        return adjusted_index
 
     def length(self) -> int:
         """Get array length.
@@ -108,39 +882,156 @@ class DynamicArray:
 
     def member(self, value: Any) -> bool:
         """Check if value exists in array.
+        Uses the hash index on arrays created by indexed().
         Args:
             value: Value to check
         Returns:
             True if value exists, else False
         """
-        def _member_rec(idx: int) -> bool:
-            if idx >= self._length:
-                return False
-            if self._data[idx] == value:
-                return True
-            return _member_rec(idx + 1)
-        return _member_rec(0)
+        return self._find(value) >= 0
+
+    def count(self, value: Any) -> int:
+        """Count occurrences of value.
+        Args:
+            value: Value to count
+        Returns:
+            Number of elements equal to value
+        """
+        if self._indexed:
+            return self._lookup().count(value)
+        return _scan_count(self._elements(), value)
+
+    def index_of(self, value: Any) -> int:
+        """Get position of first occurrence of value.
+        Args:
+            value: Value to find
+        Returns:
+            Index of first element equal to value
+        Raises:
+            ValueError: If value is not in the array
+        """
+        position = self._find(value)
+        if position < 0:
+            raise ValueError("Value not in array")
+        return position
+
+    def _find(self, value: Any) -> int:
+        """Find first position of value.
+        Args:
+            value: Value to find
+        Returns:
+            Index of value, or -1 if absent
+        """
+        if self._indexed:
+            return self._lookup().find(value)
+        return _scan_find(self._elements(), value)
+
+    def _lookup(self) -> '_HashIndex':
+        """Get hash index over elements.
+        Indexed arrays build it once and cache it, other arrays
+        build a throwaway one.
+        Returns:
+            Hash index
+        """
+        if self._index is not None:
+            return self._index
+        index = _HashIndex(self)
+        if self._indexed:
+            self._index = index
+        return index
 
     def reverse(self) -> 'DynamicArray':
         """Create reversed array.
         Returns:
             New reversed array
         """
-        def _reverse_rec(idx: int, acc: Tuple[Any, ...]) -> Tuple[Any, ...]:
-            if idx < 0:
-                return acc
-            return _reverse_rec(idx - 1, acc + (self._data[idx],))
-        reversed_data = _reverse_rec(self._length - 1, ())
-        return DynamicArray(reversed_data +
-                            (None,) * (self._capacity - self._length),
-                            self._length, self._capacity, self._growth_factor)
+        order = self._sorted
+        return self._derive(map(self._data.__getitem__,
+                                reversed(self._positions())),
+                            self._capacity)._with_order(
+                                None if order is None else order.flipped())
+
+    def sort(self, key: Optional[Callable[[Any], Any]] = None,
+             reverse: bool = False) -> 'DynamicArray':
+        """Create stably sorted array flagged as sorted.
+        The flag survives filter, remove, slicing, take, drop,
+        intersection and difference, enabling bisect, contains_sorted
+        and merge-based set operations.
+        Args:
+            key: Function computing the sort key, default the element
+            reverse: Sort in descending order
+        Returns:
+            Sorted array, or this array if already sorted that way
+        """
+        order = _SortOrder(key, reverse)
+        if self._sorted == order:
+            return self
+        return self._derive(sorted(self._elements(), key=key,
+                                   reverse=reverse),
+                            self._capacity)._with_order(order)
+
+    def is_sorted(self) -> bool:
+        """Check whether the array is flagged as sorted.
+        Returns:
+            True if created by sort or derived from a sorted array by
+            an order-preserving operation
+        """
+        return self._sorted is not None
+
+    def bisect(self, value: Any, right: bool = False) -> int:
+        """Find where value would be inserted to keep the order.
+        Runs in O(log n) on a sorted array.
+        Args:
+            value: Element to locate, the sort key is applied to it
+            right: Return the position after equal keys instead of
+                before them
+        Returns:
+            Insertion index in [0, length]
+        Raises:
+            ValueError: If the array is not flagged as sorted
+        """
+        if self._sorted is None:
+            raise ValueError("Array is not sorted")
+        key = self._sorted.key
+        before = operator.gt if self._sorted.reverse else operator.lt
+        target = value if key is None else key(value)
+        data, offset, stride = self._data, self._offset, self._stride
+        low, high = 0, self._length
+        while low < high:
+            middle = (low + high) // 2
+            probe = data[offset + middle * stride]
+            if key is not None:
+                probe = key(probe)
+            if (before(target, probe) if right
+                    else not before(probe, target)):
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    def contains_sorted(self, value: Any) -> bool:
+        """Check membership by binary search.
+        Runs in O(log n) plus the number of elements sharing value's
+        sort key.
+        Args:
+            value: Value to check
+        Returns:
+            True if an element equals value, else False
+        Raises:
+            ValueError: If the array is not flagged as sorted
+        """
+        start = self.bisect(value)
+        stop = self.bisect(value, right=True)
+        data, offset, stride = self._data, self._offset, self._stride
+        return any(data[offset + index * stride] == value
+                   for index in range(start, stop))
 
     def to_list(self) -> List[Any]:
         """Convert to Python list.
         Returns:
             Python list containing array elements
         """
-        return list(self._data[:self._length])
+        return list(self._elements())
 
     def get(self, index: int) -> Any:
         """Get element at specified index.
@@ -154,7 +1045,7 @@ class DynamicArray:
         adjusted_index = index if index >= 0 else self._length + index
         if adjusted_index < 0 or adjusted_index >= self._length:
             raise IndexError("Index out of range")
-        return self._data[adjusted_index]
+        return self._data[self._offset + adjusted_index * self._stride]
 
     def set(self, index: int, value: Any) -> 'DynamicArray':
         """Set element at specified index.
@@ -169,15 +1060,33 @@ class DynamicArray:
         adjusted_index = index if index >= 0 else self._length + index
         if adjusted_index < 0 or adjusted_index >= self._length:
             raise IndexError("Index out of range")
-
-        def _set_rec(idx: int, acc: Tuple[Any, ...]) -> Tuple[Any, ...]:
-            if idx >= self._length:
-                return acc
-            current = value if idx == adjusted_index else self._data[idx]
-            return _set_rec(idx + 1, acc + (current,))
-        new_data = _set_rec(0, ())
-        return DynamicArray(new_data + self._data[self._length:],
-                            self._length, self._capacity, self._growth_factor)
+        trie = self._trie_suffix()
+        if trie is not None:
+            # Only the leaf holding the index is copied
+            instrumentation.allocated(min(WIDTH, self._length))
+            return DynamicArray(trie.set(self._offset + adjusted_index,
+                                         value),
+                                self._length, self._capacity,
+                                self._growth_factor, self._offset)
+        if self._is_view():
+            # Copy straight from the view instead of compacting first
+            elements = self._elements()
+            return self._derive(chain(islice(elements, adjusted_index),
+                                      (value,), islice(elements, 1, None)),
+                                self._capacity)
+        data = self._data
+        # Whole tries were updated above
+        assert not isinstance(data, PersistentVector)
+        new_data: Storage
+        if isinstance(data, array) and _fits(data.typecode, value):
+            new_data = array(data.typecode, data)
+            new_data[adjusted_index] = value
+        else:
+            new_data = (*data[:adjusted_index], value,
+                        *data[adjusted_index + 1:])
+        instrumentation.allocated(self._length)
+        return DynamicArray(new_data, self._length, self._capacity,
+                            self._growth_factor)
 
     def filter(self, predicate: Callable[[Any], bool]) -> 'DynamicArray':
         """Filter array elements.
@@ -186,18 +1095,16 @@ class DynamicArray:
         Returns:
             New filtered array
         """
-        def _filter_rec(idx: int, acc: Tuple[Any, ...]) -> Tuple[Any, ...]:
-            if idx >= self._length:
-                return acc
-            current = self._data[idx]
-            if predicate(current):
-                return _filter_rec(idx + 1, acc + (current,))
-            return _filter_rec(idx + 1, acc)
-        filtered_data = _filter_rec(0, ())
-        return DynamicArray(filtered_data +
-                            (None,) * (self._capacity - len(filtered_data)),
-                            len(filtered_data),
-                            self._capacity, self._growth_factor)
+        buffer = self._typed_view()
+        if buffer is not None:
+            with buffer:
+                kept = filter_kernel(buffer, predicate)
+            if kept is not None:
+                return self._derive(kept,
+                                    self._capacity)._with_order(self._sorted)
+        return self._derive((current for current in self._elements()
+                             if predicate(current)),
+                            self._capacity)._with_order(self._sorted)
 
     def map(self, func: Callable[[Any], Any]) -> 'DynamicArray':
         """Map function over array elements.
@@ -206,14 +1113,22 @@ class DynamicArray:
         Returns:
             New mapped array
         """
-        def _map_rec(idx: int, acc: Tuple[Any, ...]) -> Tuple[Any, ...]:
-            if idx >= self._length:
-                return acc
-            return _map_rec(idx + 1, acc + (func(self._data[idx]),))
-        mapped_data = _map_rec(0, ())
-        return DynamicArray(mapped_data +
-                            (None,) * (self._capacity - self._length),
-                            self._length, self._capacity, self._growth_factor)
+        buffer = self._typed_view()
+        if buffer is not None:
+            with buffer:
+                mapped = map_kernel(buffer, func)
+            if mapped is not None:
+                return self._derive(mapped, self._capacity)
+        return self._derive(map(func, self._elements()), self._capacity)
+
+    def lazy(self) -> LazyArray:
+        """Start a lazy query over the array.
+        Chained map/filter/take/drop/zip stages run as one fused pass
+        when a terminal operation is called.
+        Returns:
+            Lazy query reading from this array
+        """
+        return LazyArray(self)
 
     def reduce(self, func: Callable[[Any, Any], Any], initial: Any) -> Any:
         """Reduce array elements.
@@ -223,40 +1138,227 @@ class DynamicArray:
         Returns:
             Reduction result
         """
-        def _reduce_rec(idx: int, acc: Any) -> Any:
-            if idx >= self._length:
-                return acc
-            return _reduce_rec(idx + 1, func(acc, self._data[idx]))
-        return _reduce_rec(0, initial)
+        buffer = self._typed_view()
+        if buffer is not None:
+            with buffer:
+                result = reduce_kernel(buffer, func, initial)
+            if result is not UNHANDLED:
+                return result
+        return functools.reduce(func, self._elements(), initial)
+
+    def pmap(self, func: Callable[[Any], Any],
+             workers: Optional[int] = None,
+             chunk_size: Optional[int] = None,
+             executor: Union[str, Executor] = parallel.PROCESS_EXECUTOR,
+             threshold: int = parallel.PARALLEL_THRESHOLD
+             ) -> 'DynamicArray':
+        """Map function over array elements on a worker pool.
+        Arrays shorter than threshold are mapped serially.
+        Args:
+            func: Function to apply to each element, picklable for
+                process pools
+            workers: Pool size, defaults to the CPU count
+            chunk_size: Elements per task, defaults to a quarter of
+                each worker's share
+            executor: 'process', 'thread' or an existing Executor
+            threshold: Minimum length for parallel execution
+        Returns:
+            New mapped array
+        """
+        if self._length < threshold:
+            return self.map(func)
+        results = parallel.run(
+            functools.partial(parallel.map_chunk, func),
+            parallel.split(self._elements(), self._length, workers,
+                           chunk_size),
+            executor, workers)
+        return self._derive(chain.from_iterable(results), self._capacity)
+
+    def pfilter(self, predicate: Callable[[Any], bool],
+                workers: Optional[int] = None,
+                chunk_size: Optional[int] = None,
+                executor: Union[str, Executor] = parallel.PROCESS_EXECUTOR,
+                threshold: int = parallel.PARALLEL_THRESHOLD
+                ) -> 'DynamicArray':
+        """Filter array elements on a worker pool.
+        Arrays shorter than threshold are filtered serially.
+        Args:
+            predicate: Function returning True for elements to keep,
+                picklable for process pools
+            workers: Pool size, defaults to the CPU count
+            chunk_size: Elements per task, defaults to a quarter of
+                each worker's share
+            executor: 'process', 'thread' or an existing Executor
+            threshold: Minimum length for parallel execution
+        Returns:
+            New filtered array
+        """
+        if self._length < threshold:
+            return self.filter(predicate)
+        results = parallel.run(
+            functools.partial(parallel.filter_chunk, predicate),
+            parallel.split(self._elements(), self._length, workers,
+                           chunk_size),
+            executor, workers)
+        return self._derive(chain.from_iterable(results), self._capacity)
+
+    def preduce(self, func: Callable[[Any, Any], Any], identity: Any,
+                workers: Optional[int] = None,
+                chunk_size: Optional[int] = None,
+                executor: Union[str, Executor] = parallel.PROCESS_EXECUTOR,
+                threshold: int = parallel.PARALLEL_THRESHOLD) -> Any:
+        """Reduce array elements on a worker pool.
+        Each chunk is reduced from identity, then the partial results
+        are reduced in order. This equals reduce(func, identity) when
+        func is associative and identity is its identity element.
+        Arrays shorter than threshold are reduced serially.
+        Args:
+            func: Associative reduction function, picklable for
+                process pools
+            identity: Identity element of func
+            workers: Pool size, defaults to the CPU count
+            chunk_size: Elements per task, defaults to a quarter of
+                each worker's share
+            executor: 'process', 'thread' or an existing Executor
+            threshold: Minimum length for parallel execution
+        Returns:
+            Reduction result
+        """
+        if self._length < threshold:
+            return self.reduce(func, identity)
+        partials = parallel.run(
+            functools.partial(parallel.reduce_chunk, func, identity),
+            parallel.split(self._elements(), self._length, workers,
+                           chunk_size),
+            executor, workers)
+        return functools.reduce(func, partials, identity)
+
+    async def amap(self, func: Callable[[Any], Awaitable[Any]],
+                   concurrency: int = asynchronous.DEFAULT_CONCURRENCY
+                   ) -> 'DynamicArray':
+        """Map a coroutine function over elements concurrently.
+        At most concurrency calls are awaited at once, so I/O-bound
+        maps take about length / concurrency call latencies.
+        Args:
+            func: Coroutine function to apply to each element
+            concurrency: Maximum number of calls in flight
+        Returns:
+            New mapped array, in element order
+        Raises:
+            ValueError: If concurrency is not positive
+        """
+        results = await asynchronous.run(func, self._elements(),
+                                         self._length, concurrency)
+        return self._derive(results, self._capacity)
+
+    async def afilter(self, predicate: Callable[[Any], Awaitable[bool]],
+                      concurrency: int = asynchronous.DEFAULT_CONCURRENCY
+                      ) -> 'DynamicArray':
+        """Filter elements with a coroutine predicate concurrently.
+        Args:
+            predicate: Coroutine function returning True for elements
+                to keep
+            concurrency: Maximum number of calls in flight
+        Returns:
+            New filtered array, in element order
+        Raises:
+            ValueError: If concurrency is not positive
+        """
+        keep = await asynchronous.run(predicate, self._elements(),
+                                      self._length, concurrency)
+        return self._derive(compress(self._elements(), keep),
+                            self._capacity)._with_order(self._sorted)
+
+    async def areduce(self, func: Callable[[Any, Any], Awaitable[Any]],
+                      identity: Any,
+                      concurrency: int = asynchronous.DEFAULT_CONCURRENCY
+                      ) -> Any:
+        """Reduce elements with a coroutine function concurrently.
+        Like preduce, the array is split into concurrency chunks that
+        are reduced from identity at the same time, then the partial
+        results are reduced in order. This equals a serial reduction
+        when func is associative and identity is its identity element.
+        Args:
+            func: Associative coroutine reduction function
+            identity: Identity element of func
+            concurrency: Maximum number of calls in flight
+        Returns:
+            Reduction result
+        Raises:
+            ValueError: If concurrency is not positive
+        """
+        if concurrency <= 0:
+            raise ValueError("Concurrency must be positive")
+        chunks = list(parallel.split(self._elements(), self._length, None,
+                                     -(-self._length // concurrency) or 1))
+        partials = await asynchronous.run(
+            functools.partial(asynchronous.reduce_chunk, func, identity),
+            chunks, len(chunks), concurrency)
+        return await asynchronous.reduce_chunk(func, identity, partials)
 
     def iterator(self) -> Generator[Any, None, None]:
         """Get array iterator.
         Returns:
             Generator yielding array elements
         """
-        for i in range(self._length):
-            yield self._data[i]
+        yield from self._elements()
 
     def intersection(self, other: 'DynamicArray') -> 'DynamicArray':
         """Get intersection with another array.
+        Runs in O(n + m), merging when both arrays are sorted in the
+        same natural order and using a hash index over other otherwise.
         Args:
             other: Another dynamic array
         Returns:
             New array containing common elements
         """
-        def _intersection_rec(idx: int, acc: Tuple[Any,
-                                ...]) -> Tuple[Any, ...]:
-            if idx >= self._length:
-                return acc
-            current = self._data[idx]
-            if other.member(current):
-                return _intersection_rec(idx + 1, acc + (current,))
-            return _intersection_rec(idx + 1, acc)
-        intersect_data = _intersection_rec(0, ())
-        return DynamicArray(intersect_data +
-                            (None,) * (self._capacity - len(intersect_data)),
-                            len(intersect_data),
-                            self._capacity, self._growth_factor)
+        matches = self._matches(other)
+        return self._derive((current for current, found in matches
+                             if found),
+                            self._capacity)._with_order(self._sorted)
+
+    def difference(self, other: 'DynamicArray') -> 'DynamicArray':
+        """Get elements not present in another array.
+        Runs in O(n + m) like intersection.
+        Args:
+            other: Another dynamic array
+        Returns:
+            New array containing elements of self missing from other
+        """
+        matches = self._matches(other)
+        return self._derive((current for current, found in matches
+                             if not found),
+                            self._capacity)._with_order(self._sorted)
+
+    def _matches(self, other: 'DynamicArray'
+                 ) -> Iterator[Tuple[Any, bool]]:
+        """Pair each element with whether other contains it.
+        Merges without hashing when both arrays are sorted in the
+        same natural order.
+        Args:
+            other: Another dynamic array
+        Returns:
+            Iterator over (element, found) pairs in element order
+        """
+        order = self._sorted
+        if (order is not None and order.key is None and
+                other._sorted == order):
+            return _merge_matches(self._elements(), other._elements(),
+                                  operator.gt if order.reverse
+                                  else operator.lt)
+        lookup = other._lookup()
+        return ((current, lookup.find(current) >= 0)
+                for current in self._elements())
+
+    def union(self, other: 'DynamicArray') -> 'DynamicArray':
+        """Get union with another array.
+        Args:
+            other: Another dynamic array
+        Returns:
+            New array with elements of self followed by elements
+            of other missing from self
+        """
+        return self.concat(other.difference(self))
 
     def concat(self, other: 'DynamicArray') -> 'DynamicArray':
         """Concatenate two arrays.
@@ -270,9 +1372,34 @@ class DynamicArray:
         # Expand if needed
         if new_capacity < total_length:
             new_capacity = max(1, int(new_capacity * self._growth_factor))
-        new_data = self._data[:self._length] + other._data[:other._length]
-        if len(new_data) < new_capacity:
-            new_data = new_data + (None,) * (new_capacity - len(new_data))
+        trie = self._trie_suffix()
+        if trie is not None:
+            # Append onto the trie, sharing all of self's full leaves
+            instrumentation.allocated(other._length)
+            return DynamicArray(trie.extend(other._elements()),
+                                total_length, new_capacity,
+                                self._growth_factor, self._offset)
+        if self._is_view() and not isinstance(self._data, PersistentVector):
+            # Copy straight from the view instead of compacting first
+            return self._derive(chain(self._elements(), other._elements()),
+                                new_capacity)
+        if self._is_view():
+            return self.compact().concat(other)
+        if isinstance(self._data, array):
+            typecode = self._data.typecode
+            if _typecode_of(other._data) == typecode:
+                if isinstance(other._data, array) and not other._is_view():
+                    joined = self._data + other._data
+                else:
+                    joined = array(typecode, self._data)
+                    joined.extend(other._elements())
+                instrumentation.allocated(total_length)
+                return DynamicArray(joined, total_length, new_capacity,
+                                    self._growth_factor)
+            return self._derive(chain(self._elements(), other._elements()),
+                                new_capacity)
+        new_data = tuple(chain(self._elements(), other._elements()))
+        instrumentation.allocated(total_length)
         return DynamicArray(new_data, total_length, new_capacity,
                             self._growth_factor)
 
@@ -283,25 +1410,83 @@ class DynamicArray:
         Returns:
             True if arrays have same content, else False
         """
+        if self is other:
+            return True
         if not isinstance(other, DynamicArray):
             return False
         if self._length != other._length:
             return False
+        if (self._data is other._data and self._offset == other._offset
+                and self._stride == other._stride):
+            return True
+        if (self._hash is not None and other._hash is not None and
+                self._hash != other._hash):
+            return False
+        return not any(map(operator.ne, self._elements(),
+                           other._elements()))
 
-        def _eq_rec(idx: int) -> bool:
-            if idx >= self._length:
-                return True
-            if self._data[idx] != other._data[idx]:
-                return False
-            return _eq_rec(idx + 1)
-        return _eq_rec(0)
+    def __hash__(self) -> int:
+        """Hash of the elements, computed once and cached.
+        Equal arrays hash equally whatever their backend.
+        Returns:
+            Hash value equal to the hash of a tuple of the elements
+        Raises:
+            TypeError: If an element is unhashable
+        """
+        if self._hash is None:
+            if isinstance(self._data, tuple) and not self._is_view():
+                self._hash = hash(self._data)
+            else:
+                self._hash = hash(tuple(self._elements()))
+        return self._hash
+
+    def intern(self) -> 'DynamicArray':
+        """Get the canonical instance equal to this array.
+        The first array interned with given contents becomes canonical
+        and later equal arrays return it, so callers can drop their
+        duplicates. The table holds weak references, so a canonical
+        array is evicted once nothing else refers to it.
+        Returns:
+            Canonical equal array, possibly this one
+        Raises:
+            TypeError: If an element is unhashable
+        """
+        return _INTERNED.intern(self)
 
     def __str__(self) -> str:
         """String representation.
         Returns:
             String in format [None, 1, 3]
         """
-        return str(list(self._data[:self._length]))
+        return str(self.to_list())
+
+    def __len__(self) -> int:
+        """Get array length.
+        Returns:
+            Number of elements in array
+        """
+        return self._length
+
+    @overload
+    def __getitem__(self, key: int) -> Any:
+        ...
+
+    @overload
+    def __getitem__(self, key: builtins.slice) -> 'DynamicArray':
+        ...
+
+    def __getitem__(self, key: Union[int, builtins.slice]) -> Any:
+        """Get element by index or view by slice.
+        Args:
+            key: Index (supports negative indexing) or slice
+        Returns:
+            Element at index, or view array for a slice
+        Raises:
+            IndexError: If index out of bounds
+        """
+        if isinstance(key, builtins.slice):
+            return self.slice(key.start, key.stop, key.step)
+        return self.get(key)
 
     def __iter__(self) -> Generator[Any, None, None]:
         """Implement iteration protocol.
@@ -309,3 +1494,525 @@ class DynamicArray:
             Array iterator
         """
         return self.iterator()
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        """Implement async iteration protocol.
+        Control returns to the event loop every
+        asynchronous.YIELD_EVERY elements, so long loops do not starve
+        other tasks.
+        Returns:
+            Async iterator over elements
+        """
+        return asynchronous.iterate(self._elements())
+
+
+def _patched(elements: Iterator[Any],
+             edits: List[Tuple[int, int, int, str, Any, int]]
+             ) -> Iterator[Any]:
+    """Stream elements with sorted, non-overlapping edits applied.
+    Args:
+        elements: Iterator over the original elements
+        edits: (start, replaces, order, op, argument, end) tuples
+            sorted by start
+    Returns:
+        Iterator over the patched elements
+    """
+    position = 0
+    for start, _, _, op, argument, end in edits:
+        yield from islice(elements, start - position)
+        if op == PATCH_INSERT:
+            yield from argument
+        else:
+            for _ in islice(elements, end - start):
+                pass
+            if op == PATCH_SET:
+                yield argument
+        position = end
+    yield from elements
+
+
+def _make_storage(backend: str, items: Any,
+                  dtype: Optional[str] = None) -> Storage:
+    """Build storage for a backend.
+    Args:
+        backend: Storage backend, 'tuple' or 'trie'
+        items: Iterable of elements
+        dtype: Element type code, selects the typed backend
+    Returns:
+        Tuple, PersistentVector or typed array holding items
+    Raises:
+        ValueError: If backend or dtype is unknown, or the combination
+            is not supported
+    """
+    if dtype is not None:
+        if dtype not in DTYPES:
+            raise ValueError("Unknown dtype: {}".format(dtype))
+        if backend not in (TUPLE_BACKEND, TYPED_BACKEND):
+            raise ValueError("Backend {} does not support dtype"
+                             .format(backend))
+        return array(DTYPES[dtype], items)
+    if backend == TYPED_BACKEND:
+        raise ValueError("Typed backend requires a dtype")
+    if backend == TUPLE_BACKEND:
+        return tuple(items)
+    if backend == TRIE_BACKEND:
+        return PersistentVector.from_iterable(items)
+    raise ValueError("Unknown backend: {}".format(backend))
+
+
+def _typecode_of(data: Storage) -> Optional[str]:
+    """Get array module typecode of typed storage.
+    Args:
+        data: Storage
+    Returns:
+        Typecode of typed storage, including typed files and shared
+        memory, else None
+    """
+    if isinstance(data, (array, BinaryArray)):
+        return data.typecode
+    return None
+
+
+def _dtype_of(typecode: str) -> str:
+    """Get the dtype name of an array typecode.
+    Args:
+        typecode: array module typecode
+    Returns:
+        Type code such as 'f8'
+    Raises:
+        ValueError: If typecode has no dtype name
+    """
+    for name, code in DTYPES.items():
+        if code == typecode:
+            return name
+    raise ValueError("Unknown typecode: {}".format(typecode))
+
+
+def _fits(typecode: str, value: Any) -> bool:
+    """Check that a value can be stored in a typed array exactly.
+    Args:
+        typecode: array module typecode
+        value: Value to store
+    Returns:
+        True if value has the dtype's Python type and range
+    """
+    if type(value) is not python_type(typecode):
+        return False
+    probe: 'array[Any]' = array(typecode)
+    try:
+        probe.append(value)
+    except OverflowError:
+        return False
+    return True
+
+
+class _HeadRoom:
+    """Storage with unused head room that arrays grow into by cons.
+
+    Slots before the front are free. Only the array starting exactly
+    at the front may claim the slot before it, so older versions,
+    which start further right, never see their elements overwritten.
+    The front is kept as the only key of a dict because dict.pop
+    checks and takes it in a single atomic step.
+    """
+    __slots__ = ()
+    _front: Dict[int, bool]
+
+    def claim(self, offset: int) -> bool:
+        """Take the free slot before offset if offset is the front.
+        Args:
+            offset: Storage position of the caller's first element
+        Returns:
+            True if the slot at offset - 1 now belongs to the caller
+        """
+        if offset == 0 or not self._front.pop(offset, False):
+            return False
+        self._front[offset - 1] = True
+        return True
+
+
+class _FrontBuffer(_HeadRoom, List[Any]):
+    """List with head room for cons."""
+    __slots__ = ('_front',)
+
+    def __init__(self, headroom: int):
+        """Initialize buffer with free head room and no elements.
+        Args:
+            headroom: Number of free slots before the elements
+        """
+        super().__init__(repeat(None, headroom))
+        self._front = {headroom: True}
+
+
+class _TypedFrontBuffer(_HeadRoom, array):  # type: ignore[type-arg]
+    """Typed array with head room for cons."""
+    __slots__ = ('_front',)
+
+    def __new__(cls, typecode: str,
+                headroom: int) -> '_TypedFrontBuffer':
+        """Create buffer with zeroed head room and no elements.
+        Args:
+            typecode: array module typecode
+            headroom: Number of free slots before the elements
+        Returns:
+            New buffer
+        """
+        buffer = super().__new__(cls, typecode,
+                                 bytes(array(typecode).itemsize * headroom))
+        buffer._front = {headroom: True}
+        return buffer
+
+    def __reduce_ex__(self, protocol: SupportsIndex) -> Any:
+        """Pickle as a plain typed array, as copies own no head room.
+        Args:
+            protocol: Pickle protocol
+        Returns:
+            Reduce value of an equal array
+        """
+        return array(self.typecode, self).__reduce_ex__(protocol)
+
+
+class _InternTable:
+    """Weak table of canonical arrays, grouped by hash.
+
+    Attributes:
+        _buckets: Weak references to canonical arrays by hash
+        _lock: Reentrant lock, as eviction callbacks may run while an
+            intern call holds it
+    """
+    __slots__ = ('_buckets', '_lock')
+
+    def __init__(self) -> None:
+        """Initialize empty table."""
+        self._buckets: Dict[int, List['weakref.ref[DynamicArray]']] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        """Get number of live canonical arrays.
+        Returns:
+            Number of interned arrays still alive
+        """
+        with self._lock:
+            return sum(ref() is not None
+                       for bucket in self._buckets.values()
+                       for ref in bucket)
+
+    def intern(self, arr: DynamicArray) -> DynamicArray:
+        """Get canonical array equal to arr, registering arr if new.
+        Args:
+            arr: Array to look up
+        Returns:
+            Canonical equal array
+        """
+        key = hash(arr)
+        with self._lock:
+            bucket = self._buckets.setdefault(key, [])
+            for ref in list(bucket):
+                candidate = ref()
+                if candidate is not None and candidate == arr:
+                    return candidate
+            bucket.append(weakref.ref(arr, functools.partial(
+                self._evict, key)))
+            return arr
+
+    def _evict(self, key: int, ref: 'weakref.ref[DynamicArray]') -> None:
+        """Drop the reference to a collected array.
+        Args:
+            key: Hash the array was stored under
+            ref: Dead weak reference
+        """
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None or ref not in bucket:
+                return
+            bucket.remove(ref)
+            if not bucket:
+                del self._buckets[key]
+
+
+_INTERNED = _InternTable()
+
+
+class ArrayBuilder:
+    """Single-owner mutable builder for DynamicArray.
+
+    Appends and prepends are amortized O(1). freeze() hands the
+    internal list to the new array without copying it when nothing was
+    prepended, and the builder refuses further use afterwards. Builders
+    are not thread-safe.
+
+    Attributes:
+        _front: Prepended elements in reverse order
+        _back: Appended elements in order
+        _growth_factor: Growth factor of the frozen array
+        _backend: Storage backend of the frozen array
+        _dtype: Element type code of the frozen array
+        _frozen: Whether freeze() was called
+    """
+    def __init__(self, growth_factor: float = 2.0,
+                 backend: str = TUPLE_BACKEND,
+                 dtype: Optional[str] = None):
+        """Initialize empty builder.
+        Args:
+            growth_factor: Growth factor of the frozen array
+            backend: Storage backend of the frozen array
+            dtype: Element type code of the frozen array
+        Raises:
+            ValueError: If backend or dtype is not supported
+        """
+        _make_storage(backend, (), dtype)
+        self._front: List[Any] = []
+        self._back: List[Any] = []
+        self._growth_factor = growth_factor
+        self._backend = backend
+        self._dtype = dtype
+        self._frozen = False
+
+    def _check(self) -> None:
+        """Ensure the builder is still mutable.
+        Raises:
+            RuntimeError: If the builder was frozen
+        """
+        if self._frozen:
+            raise RuntimeError("Builder used after freeze")
+
+    def _locate(self, index: int) -> Tuple[List[Any], int]:
+        """Map an index onto the internal lists.
+        Args:
+            index: Index (supports negative indexing)
+        Returns:
+            List holding the element and position inside it
+        Raises:
+            IndexError: If index out of bounds
+        """
+        length = self.length()
+        adjusted_index = index if index >= 0 else length + index
+        if adjusted_index < 0 or adjusted_index >= length:
+            raise IndexError("Index out of range")
+        front_length = len(self._front)
+        if adjusted_index < front_length:
+            return self._front, front_length - 1 - adjusted_index
+        return self._back, adjusted_index - front_length
+
+    def length(self) -> int:
+        """Get number of elements added so far.
+        Returns:
+            Number of elements
+        """
+        return len(self._front) + len(self._back)
+
+    def get(self, index: int) -> Any:
+        """Get element at specified index.
+        Args:
+            index: Index (supports negative indexing)
+        Returns:
+            Element at index
+        Raises:
+            IndexError: If index out of bounds
+        """
+        self._check()
+        items, position = self._locate(index)
+        return items[position]
+
+    def append(self, element: Any) -> 'ArrayBuilder':
+        """Add element to the end.
+        Args:
+            element: Element to add
+        Returns:
+            This builder
+        """
+        self._check()
+        self._back.append(element)
+        return self
+
+    def prepend(self, element: Any) -> 'ArrayBuilder':
+        """Add element to the front.
+        Args:
+            element: Element to add
+        Returns:
+            This builder
+        """
+        self._check()
+        self._front.append(element)
+        return self
+
+    def extend(self, items: Iterable[Any]) -> 'ArrayBuilder':
+        """Add elements to the end.
+        Args:
+            items: Elements to add
+        Returns:
+            This builder
+        """
+        self._check()
+        self._back.extend(items)
+        return self
+
+    def set(self, index: int, value: Any) -> 'ArrayBuilder':
+        """Replace element at specified index.
+        Args:
+            index: Index (supports negative indexing)
+            value: New value
+        Returns:
+            This builder
+        Raises:
+            IndexError: If index out of bounds
+        """
+        self._check()
+        items, position = self._locate(index)
+        items[position] = value
+        return self
+
+    def pop(self) -> Any:
+        """Remove and return the last element.
+        Returns:
+            Removed element
+        Raises:
+            IndexError: If the builder is empty
+        """
+        self._check()
+        if not self._back:
+            if not self._front:
+                raise IndexError("Pop from empty builder")
+            # Move the prepended elements over once, in order, so later
+            # pops stay O(1) instead of shifting the front list
+            self._front.reverse()
+            self._front, self._back = self._back, self._front
+        return self._back.pop()
+
+    def freeze(self) -> 'DynamicArray':
+        """Turn the builder into an immutable array.
+        Returns:
+            Array holding the built elements
+        Raises:
+            RuntimeError: If the builder was already frozen
+            TypeError: If a value does not have the dtype's type; the
+                builder is left unfrozen
+            OverflowError: If a value is out of the dtype's range; the
+                builder is left unfrozen
+        """
+        self._check()
+        if self._backend == TUPLE_BACKEND and self._dtype is None:
+            items = self._back
+            if self._front:
+                self._front.reverse()
+                self._front.extend(self._back)
+                items = self._front
+            data: Storage = items
+        else:
+            # Built before anything is cleared, so a value that does
+            # not fit the dtype leaves the builder usable
+            data = _make_storage(self._backend,
+                                 chain(reversed(self._front), self._back),
+                                 self._dtype)
+            instrumentation.allocated(len(data))
+        self._frozen = True
+        self._front = []
+        self._back = []
+        return DynamicArray(data, len(data), len(data), self._growth_factor)
+
+
+class _HashIndex:
+    """Hash lookup table over array elements.
+    Unhashable elements are kept aside and compared one by one,
+    unhashable values are looked up with a linear scan.
+
+    Attributes:
+        _owner: Array the index was built from
+        _first: First position of each hashable element
+        _counts: Number of occurrences of each hashable element
+        _unhashable: Positions and values of unhashable elements
+    """
+    def __init__(self, owner: DynamicArray):
+        """Build index in a single pass.
+        Args:
+            owner: Array to index
+        """
+        self._owner = owner
+        self._first: Dict[Any, int] = {}
+        self._counts: Dict[Any, int] = {}
+        self._unhashable: List[Tuple[int, Any]] = []
+        for position, item in enumerate(owner._elements()):
+            try:
+                if item in self._counts:
+                    self._counts[item] += 1
+                else:
+                    self._first[item] = position
+                    self._counts[item] = 1
+            except TypeError:
+                self._unhashable.append((position, item))
+
+    def find(self, value: Any) -> int:
+        """Find first position of value.
+        Args:
+            value: Value to find
+        Returns:
+            Index of value, or -1 if absent
+        """
+        try:
+            position = self._first.get(value, -1)
+        except TypeError:
+            return _scan_find(self._owner._elements(), value)
+        for candidate, item in self._unhashable:
+            if 0 <= position < candidate:
+                break
+            if item == value:
+                return candidate
+        return position
+
+    def count(self, value: Any) -> int:
+        """Count occurrences of value.
+        Args:
+            value: Value to count
+        Returns:
+            Number of elements equal to value
+        """
+        try:
+            total = self._counts.get(value, 0)
+        except TypeError:
+            return _scan_count(self._owner._elements(), value)
+        return total + _scan_count((item for _, item in self._unhashable),
+                                   value)
+
+
+def _merge_matches(items: Iterable[Any], others: Iterable[Any],
+                   before: Callable[[Any, Any], Any]
+                   ) -> Iterator[Tuple[Any, bool]]:
+    """Pair sorted items with whether sorted others contain them.
+    Args:
+        items: Elements sorted by before
+        others: Elements sorted by before
+        before: operator.lt for ascending, operator.gt for descending
+    Returns:
+        Iterator over (item, found) pairs
+    """
+    others = iter(others)
+    current = next(others, _MISSING)
+    for item in items:
+        while current is not _MISSING and before(current, item):
+            current = next(others, _MISSING)
+        yield item, current is not _MISSING and current == item
+
+
+def _scan_find(items: Iterable[Any], value: Any) -> int:
+    """Find first position of value with a linear scan.
+    Args:
+        items: Elements to scan
+        value: Value to find
+    Returns:
+        Index of value, or -1 if absent
+    """
+    for position, current in enumerate(items):
+        if current == value:
+            return position
+    return -1
+
+
+def _scan_count(items: Iterable[Any], value: Any) -> int:
+    """Count occurrences of value with a linear scan.
+    Args:
+        items: Elements to scan
+        value: Value to count
+    Returns:
+        Number of elements equal to value
+    """
+    return sum(1 for current in items if current == value)
@@ -0,0 +1,371 @@
+import functools
+import inspect
+import threading
+import time
+import types
+from typing import (Any, AsyncGenerator, Callable, Dict, Generator, List,
+                    NamedTuple, Optional)
+
+# Dunder methods instrumented besides the public ones
+SPECIAL_METHODS = ('__aiter__', '__eq__', '__getitem__', '__hash__',
+                   '__iter__', '__len__', '__str__')
+
+
+class Event(NamedTuple):
+    """One finished DynamicArray method call, passed to hooks.
+
+    Attributes:
+        method: Method name
+        seconds: Time spent running the method, nested calls included;
+            coroutines and generators are timed only while they run
+        copied: Elements copied into new storage during the call
+        allocations: Storage objects allocated during the call
+        resizes: Capacity expansions during the call
+    """
+    method: str
+    seconds: float
+    copied: int
+    allocations: int
+    resizes: int
+
+
+class Stats(NamedTuple):
+    """Snapshot of the counters since the last reset.
+
+    Attributes:
+        calls: Number of calls by method name
+        seconds: Cumulative time by method name, nested calls included
+        copied: Elements copied into newly allocated storage
+        allocations: Storage objects (tuples, lists, typed arrays or
+            tries) allocated
+        resizes: Capacity expansions by _resize
+    """
+    calls: Dict[str, int]
+    seconds: Dict[str, float]
+    copied: int
+    allocations: int
+    resizes: int
+
+
+Hook = Callable[[Event], None]
+
+active = False
+
+_lock = threading.Lock()
+_local = threading.local()
+_calls: Dict[str, int] = {}
+_seconds: Dict[str, float] = {}
+_totals = [0, 0, 0]
+_hooks: List[Hook] = []
+_originals: Dict[str, Any] = {}
+
+# Positions in _totals and in per-call frames
+_COPIED, _ALLOCATIONS, _RESIZES = range(3)
+
+
+def enable() -> None:
+    """Start counting by wrapping DynamicArray methods.
+    Disabled instrumentation leaves the class untouched, so it costs
+    nothing beyond one flag check where storage is allocated.
+    """
+    global active
+    from dynamic_array import DynamicArray
+    with _lock:
+        if active:
+            return
+        for name, member in list(vars(DynamicArray).items()):
+            if name.startswith('_') and name not in SPECIAL_METHODS:
+                continue
+            if isinstance(member, staticmethod):
+                wrapped: Any = staticmethod(_wrap(name, member.__func__))
+            elif callable(member):
+                wrapped = _wrap(name, member)
+            else:
+                continue
+            _originals[name] = member
+            setattr(DynamicArray, name, wrapped)
+        active = True
+
+
+def disable() -> None:
+    """Stop counting and restore the original methods.
+    Counters keep their values until reset.
+    """
+    global active
+    from dynamic_array import DynamicArray
+    with _lock:
+        for name, member in _originals.items():
+            setattr(DynamicArray, name, member)
+        _originals.clear()
+        active = False
+
+
+def is_enabled() -> bool:
+    """Check whether instrumentation is on.
+    Returns:
+        True between enable() and disable()
+    """
+    return active
+
+
+def stats() -> Stats:
+    """Get a snapshot of the counters.
+    Returns:
+        Counters accumulated across all threads since the last reset
+    """
+    with _lock:
+        return _snapshot()
+
+
+def reset() -> Stats:
+    """Clear the counters, e.g. at the end of a request.
+    Returns:
+        Snapshot taken just before clearing
+    """
+    with _lock:
+        snapshot = _snapshot()
+        _calls.clear()
+        _seconds.clear()
+        _totals[:] = [0, 0, 0]
+    return snapshot
+
+
+def add_hook(hook: Hook) -> None:
+    """Register a callback run after every instrumented call.
+    Hooks run in the calling thread and must be thread-safe.
+    Args:
+        hook: Function receiving an Event
+    """
+    with _lock:
+        _hooks.append(hook)
+
+
+def remove_hook(hook: Hook) -> None:
+    """Unregister a callback.
+    Args:
+        hook: Previously added function
+    Raises:
+        ValueError: If the hook was not added
+    """
+    with _lock:
+        _hooks.remove(hook)
+
+
+def allocated(copied: int) -> None:
+    """Record one new storage object filled with copied elements.
+    Args:
+        copied: Number of elements written into it
+    """
+    if active:
+        _count(_COPIED, copied)
+        _count(_ALLOCATIONS, 1)
+
+
+def resized() -> None:
+    """Record one capacity expansion."""
+    if active:
+        _count(_RESIZES, 1)
+
+
+def _count(position: int, amount: int) -> None:
+    """Add to a total and to the innermost running call.
+    Args:
+        position: _COPIED, _ALLOCATIONS or _RESIZES
+        amount: Amount to add
+    """
+    with _lock:
+        _totals[position] += amount
+    frames: Optional[List[List[int]]] = getattr(_local, 'frames', None)
+    if frames:
+        frames[-1][position] += amount
+
+
+def _snapshot() -> Stats:
+    """Copy the counters, holding the lock.
+    Returns:
+        Current counters
+    """
+    return Stats(dict(_calls), dict(_seconds), *_totals)
+
+
+class _Call:
+    """Counters of one instrumented call, which may run in several steps.
+
+    Attributes:
+        name: Method name
+        seconds: Time spent running so far
+        counts: Copies, allocations and resizes so far
+    """
+    __slots__ = ('name', 'seconds', 'counts')
+
+    def __init__(self, name: str):
+        """Start a call with zero counters.
+        Args:
+            name: Method name
+        """
+        self.name = name
+        self.seconds = 0.0
+        self.counts = [0, 0, 0]
+
+    def run(self, func: Callable[..., Any], *args: Any,
+            **kwargs: Any) -> Any:
+        """Run one step of the call, counting its time and allocations.
+        Args:
+            func: Function running the step
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+        Returns:
+            Result of func
+        """
+        frames: Optional[List[List[int]]] = getattr(_local, 'frames', None)
+        if frames is None:
+            frames = _local.frames = []
+        frame = [0, 0, 0]
+        frames.append(frame)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.seconds += time.perf_counter() - start
+            frames.pop()
+            for position, amount in enumerate(frame):
+                self.counts[position] += amount
+                if frames:
+                    # Nested calls also count towards the caller's event
+                    frames[-1][position] += amount
+
+    def finish(self) -> None:
+        """Add the call to the counters and pass its event to hooks."""
+        with _lock:
+            _calls[self.name] = _calls.get(self.name, 0) + 1
+            _seconds[self.name] = (_seconds.get(self.name, 0.0) +
+                                   self.seconds)
+            hooks = list(_hooks)
+        if hooks:
+            event = Event(self.name, self.seconds, *self.counts)
+            for hook in hooks:
+                hook(event)
+
+
+class _Awaitable:
+    """Awaitable driving a generator of coroutine steps.
+
+    Attributes:
+        _steps: Generator yielding to the event loop
+    """
+    __slots__ = ('_steps',)
+
+    def __init__(self, steps: Generator[Any, Any, Any]):
+        """Wrap steps.
+        Args:
+            steps: Generator yielding to the event loop
+        """
+        self._steps = steps
+
+    def __await__(self) -> Generator[Any, Any, Any]:
+        """Implement the await protocol.
+        Returns:
+            The wrapped steps
+        """
+        return self._steps
+
+
+def _steps(call: _Call, steps: Generator[Any, Any, Any]
+           ) -> Generator[Any, Any, Any]:
+    """Forward a generator, running each of its steps inside call.
+    Time spent by the consumer between steps is not counted.
+    Args:
+        call: Call the steps belong to
+        steps: Generator, or iterator behind an await
+    Returns:
+        Generator yielding what steps yields and returning its result
+    """
+    value: Any = None
+    error: Optional[BaseException] = None
+    while True:
+        try:
+            if error is None:
+                item = call.run(steps.send, value)
+            else:
+                item = call.run(steps.throw, error)
+        except StopIteration as stop:
+            return stop.value
+        try:
+            value, error = (yield item), None
+        except GeneratorExit:
+            call.run(steps.close)
+            raise
+        except BaseException as exc:
+            value, error = None, exc
+
+
+def _resume(call: _Call, steps: Generator[Any, Any, Any]
+            ) -> Generator[Any, Any, Any]:
+    """Forward a generator and finish call once it is done or closed.
+    Args:
+        call: Call the generator belongs to
+        steps: Generator, or iterator behind an await
+    Returns:
+        Generator yielding what steps yields and returning its result
+    """
+    try:
+        return (yield from _steps(call, steps))
+    finally:
+        call.finish()
+
+
+async def _aresume(call: _Call, items: AsyncGenerator[Any, Any]
+                   ) -> AsyncGenerator[Any, Any]:
+    """Forward an async generator and finish call once it is done.
+    Args:
+        call: Call the async generator belongs to
+        items: Async generator
+    Returns:
+        Async generator yielding the same items
+    """
+    try:
+        while True:
+            try:
+                item = await _Awaitable(
+                    _steps(call, items.__anext__().__await__()))
+            except StopAsyncIteration:
+                return
+            yield item
+    finally:
+        await _Awaitable(_steps(call, items.aclose().__await__()))
+        call.finish()
+
+
+def _wrap(name: str, func: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a method to count calls, time and allocations.
+    Coroutines, generators and async generators are counted while
+    they run, until they finish, rather than until they are created.
+    Args:
+        name: Method name
+        func: Original function
+    Returns:
+        Wrapper function
+    """
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def coroutine_wrapper(*args: Any, **kwargs: Any) -> Any:
+            call = _Call(name)
+            return await _Awaitable(
+                _resume(call, func(*args, **kwargs).__await__()))
+        return coroutine_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        call = _Call(name)
+        try:
+            result = call.run(func, *args, **kwargs)
+        except BaseException:
+            call.finish()
+            raise
+        if isinstance(result, types.GeneratorType):
+            return _resume(call, result)
+        if isinstance(result, types.AsyncGeneratorType):
+            return _aresume(call, result)
+        call.finish()
+        return result
+    return wrapper
@@ -0,0 +1,160 @@
+import functools
+from itertools import islice
+from typing import (TYPE_CHECKING, Any, Callable, Iterable, Iterator, List,
+                    Optional, Tuple)
+
+if TYPE_CHECKING:
+    from dynamic_array import DynamicArray
+
+Stage = Tuple[str, Any]
+
+
+class LazyArray:
+    """Deferred query over a DynamicArray.
+
+    Stages such as map and filter are only recorded. A terminal
+    operation fuses all of them into one streaming pass over the
+    source, so no intermediate arrays are materialised.
+
+    Attributes:
+        _source: Array the query reads from
+        _stages: Recorded (kind, argument) stages in order
+    """
+    def __init__(self, source: 'DynamicArray',
+                 stages: Tuple[Stage, ...] = ()):
+        """Initialize lazy query.
+        Args:
+            source: Array the query reads from
+            stages: Recorded stages
+        """
+        self._source = source
+        self._stages = stages
+
+    def _then(self, kind: str, argument: Any) -> 'LazyArray':
+        """Create query with one more stage.
+        Args:
+            kind: Stage name
+            argument: Stage argument
+        Returns:
+            New lazy query
+        """
+        return LazyArray(self._source, self._stages + ((kind, argument),))
+
+    def map(self, func: Callable[[Any], Any]) -> 'LazyArray':
+        """Add a map stage.
+        Args:
+            func: Function to apply to each element
+        Returns:
+            New lazy query
+        """
+        return self._then('map', func)
+
+    def filter(self, predicate: Callable[[Any], bool]) -> 'LazyArray':
+        """Add a filter stage.
+        Args:
+            predicate: Function returning True for elements to keep
+        Returns:
+            New lazy query
+        """
+        return self._then('filter', predicate)
+
+    def take(self, count: int) -> 'LazyArray':
+        """Add a stage keeping only the first elements.
+        Args:
+            count: Number of elements to keep
+        Returns:
+            New lazy query
+        Raises:
+            ValueError: If count is negative
+        """
+        if count < 0:
+            raise ValueError("Count must be non-negative")
+        return self._then('take', count)
+
+    def drop(self, count: int) -> 'LazyArray':
+        """Add a stage skipping the first elements.
+        Args:
+            count: Number of elements to skip
+        Returns:
+            New lazy query
+        Raises:
+            ValueError: If count is negative
+        """
+        if count < 0:
+            raise ValueError("Count must be non-negative")
+        return self._then('drop', count)
+
+    def zip(self, other: Iterable[Any]) -> 'LazyArray':
+        """Add a stage pairing elements with another sequence.
+        Stops at the shorter of the two.
+        Args:
+            other: DynamicArray or any iterable
+        Returns:
+            New lazy query yielding (element, other_element) tuples
+        """
+        return self._then('zip', other)
+
+    def __iter__(self) -> Iterator[Any]:
+        """Run all stages as one fused stream.
+        Returns:
+            Iterator over query results
+        """
+        stream: Iterator[Any] = self._source._elements()
+        for kind, argument in self._stages:
+            if kind == 'map':
+                stream = map(argument, stream)
+            elif kind == 'filter':
+                stream = filter(argument, stream)
+            elif kind == 'take':
+                stream = islice(stream, argument)
+            elif kind == 'drop':
+                stream = islice(stream, argument, None)
+            else:
+                stream = zip(stream, argument)
+        return stream
+
+    def reduce(self, func: Callable[[Any, Any], Any], initial: Any) -> Any:
+        """Reduce query results in O(1) extra memory.
+        Args:
+            func: Reduction function taking accumulator and current element
+            initial: Initial accumulator value
+        Returns:
+            Reduction result
+        """
+        return functools.reduce(func, self, initial)
+
+    def to_list(self) -> List[Any]:
+        """Collect query results into a Python list.
+        Returns:
+            Python list of results
+        """
+        return list(self)
+
+    def collect(self) -> 'DynamicArray':
+        """Collect query results into a new array.
+        Returns:
+            Array with the source's backend and growth factor
+        """
+        return self._source._derive(self)
+
+    def first(self, default: Optional[Any] = None) -> Any:
+        """Get first result, stopping the stream early.
+        Args:
+            default: Value returned when there are no results
+        Returns:
+            First result or default
+        """
+        return next(iter(self), default)
+
+    def any(self, predicate: Optional[Callable[[Any], bool]] = None
+            ) -> bool:
+        """Check whether any result is truthy or matches predicate.
+        Stops at the first match.
+        Args:
+            predicate: Optional test applied to each result
+        Returns:
+            True if a result matches, else False
+        """
+        if predicate is None:
+            return any(self)
+        return any(map(predicate, self))
@@ -0,0 +1,256 @@
+import functools
+import threading
+import weakref
+from collections import OrderedDict
+from typing import (Any, Callable, Dict, Hashable, NamedTuple, Optional,
+                    Set, Tuple)
+
+from dynamic_array import DynamicArray
+
+# Entries kept when no limit is given
+DEFAULT_MAX_ENTRIES = 1024
+
+Key = Tuple[str, Tuple[int, ...], Hashable]
+
+
+class CacheStats(NamedTuple):
+    """Snapshot of a cache's counters.
+
+    Attributes:
+        hits: Lookups answered from the cache
+        misses: Lookups that computed the result
+        evictions: Entries dropped to stay within budget
+        entries: Entries currently cached
+        elements: Elements held by cached results
+    """
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    elements: int
+
+
+class ResultCache:
+    """Opt-in LRU cache of derived arrays.
+
+    Arrays never change, so the result of an operation depends only
+    on the source arrays and the function passed to it. Entries are
+    keyed on the identity of the source arrays, the operation name and
+    the callable, so map(f) and map(g) are cached separately even if
+    f and g compute the same thing. Equal but distinct source arrays
+    miss. Sources are held by weak references: once a source array is
+    collected, every entry computed from it is dropped. Callables are
+    held strongly until their entries are evicted; bound methods are
+    compared by equality, so obj.method hits on every access.
+
+    The cache is thread-safe. Concurrent misses on the same key may
+    each compute the result; one of them is kept.
+
+    Attributes:
+        max_entries: Maximum number of cached results
+        max_elements: Maximum total length of cached results, None
+            for no limit
+        _entries: Cached results, least recently used first
+        _sources: Keys computed from each live source array, by id
+        _refs: Weak references to source arrays, by id
+        _counts: Hits, misses and evictions
+        _elements: Total length of cached results
+        _lock: Reentrant lock, as collection callbacks may run while
+            a lookup holds it
+    """
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_elements: Optional[int] = None):
+        """Initialize empty cache.
+        Args:
+            max_entries: Maximum number of cached results
+            max_elements: Maximum total length of cached results
+        Raises:
+            ValueError: If a limit is not positive
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        if max_elements is not None and max_elements <= 0:
+            raise ValueError("max_elements must be positive")
+        self.max_entries = max_entries
+        self.max_elements = max_elements
+        self._entries: 'OrderedDict[Key, DynamicArray]' = OrderedDict()
+        self._sources: Dict[int, Set[Key]] = {}
+        self._refs: Dict[int, 'weakref.ref[DynamicArray]'] = {}
+        self._counts = [0, 0, 0]
+        self._elements = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        """Get number of cached results.
+        Returns:
+            Number of entries
+        """
+        return len(self._entries)
+
+    def map(self, arr: DynamicArray,
+            func: Callable[[Any], Any]) -> DynamicArray:
+        """Get arr.map(func), cached.
+        Args:
+            arr: Source array
+            func: Function to apply to each element
+        Returns:
+            Mapped array
+        """
+        return self._lookup('map', (arr,), func, lambda: arr.map(func))
+
+    def filter(self, arr: DynamicArray,
+               predicate: Callable[[Any], bool]) -> DynamicArray:
+        """Get arr.filter(predicate), cached.
+        Args:
+            arr: Source array
+            predicate: Function returning True for elements to keep
+        Returns:
+            Filtered array
+        """
+        return self._lookup('filter', (arr,), predicate,
+                            lambda: arr.filter(predicate))
+
+    def reverse(self, arr: DynamicArray) -> DynamicArray:
+        """Get arr.reverse(), cached.
+        Args:
+            arr: Source array
+        Returns:
+            Reversed array
+        """
+        return self._lookup('reverse', (arr,), None, arr.reverse)
+
+    def intersection(self, arr: DynamicArray,
+                     other: DynamicArray) -> DynamicArray:
+        """Get arr.intersection(other), cached.
+        Args:
+            arr: Source array
+            other: Reference array
+        Returns:
+            Elements of arr present in other
+        """
+        return self._lookup('intersection', (arr, other), None,
+                            lambda: arr.intersection(other))
+
+    def difference(self, arr: DynamicArray,
+                   other: DynamicArray) -> DynamicArray:
+        """Get arr.difference(other), cached.
+        Args:
+            arr: Source array
+            other: Reference array
+        Returns:
+            Elements of arr missing from other
+        """
+        return self._lookup('difference', (arr, other), None,
+                            lambda: arr.difference(other))
+
+    def stats(self) -> CacheStats:
+        """Get a snapshot of the counters.
+        Returns:
+            Counters since creation or the last clear
+        """
+        with self._lock:
+            hits, misses, evictions = self._counts
+            return CacheStats(hits, misses, evictions, len(self._entries),
+                              self._elements)
+
+    def clear(self) -> CacheStats:
+        """Drop every entry and reset the counters.
+        Returns:
+            Snapshot taken just before clearing
+        """
+        with self._lock:
+            snapshot = self.stats()
+            self._entries.clear()
+            self._sources.clear()
+            self._refs.clear()
+            self._counts = [0, 0, 0]
+            self._elements = 0
+        return snapshot
+
+    def _lookup(self, operation: str, sources: Tuple[DynamicArray, ...],
+                func: Any, compute: Callable[[], DynamicArray]
+                ) -> DynamicArray:
+        """Get a cached result or compute and store it.
+        Args:
+            operation: Operation name
+            sources: Arrays the result is computed from
+            func: Callable passed to the operation, or None
+            compute: Function computing the result
+        Returns:
+            Cached or computed result
+        """
+        try:
+            hash(func)
+        except TypeError:
+            # Unhashable callables cannot be keys
+            with self._lock:
+                self._counts[1] += 1
+            return compute()
+        key = (operation, tuple(map(id, sources)), func)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self._counts[0] += 1
+                return result
+            self._counts[1] += 1
+        result = compute()
+        with self._lock:
+            if key not in self._entries:
+                self._store(key, sources, result)
+        return result
+
+    def _store(self, key: Key, sources: Tuple[DynamicArray, ...],
+               result: DynamicArray) -> None:
+        """Add an entry and evict until within budget.
+        Results longer than max_elements are not stored.
+        Args:
+            key: Entry key
+            sources: Arrays the result is computed from
+            result: Result to store
+        """
+        length = result._length
+        if self.max_elements is not None and length > self.max_elements:
+            return
+        for source in sources:
+            source_id = id(source)
+            if source_id not in self._refs:
+                self._refs[source_id] = weakref.ref(
+                    source, functools.partial(self._collect, source_id))
+                self._sources[source_id] = set()
+            self._sources[source_id].add(key)
+        self._entries[key] = result
+        self._elements += length
+        while (len(self._entries) > self.max_entries or
+               (self.max_elements is not None and
+                self._elements > self.max_elements)):
+            self._remove(next(iter(self._entries)))
+            self._counts[2] += 1
+
+    def _remove(self, key: Key) -> None:
+        """Drop an entry and forget sources left without entries.
+        Args:
+            key: Cached key
+        """
+        self._elements -= self._entries.pop(key)._length
+        for source_id in key[1]:
+            keys = self._sources.get(source_id)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if not keys:
+                del self._sources[source_id]
+                del self._refs[source_id]
+
+    def _collect(self, source_id: int,
+                 ref: 'weakref.ref[DynamicArray]') -> None:
+        """Drop the entries of a collected source array.
+        Args:
+            source_id: Id the source array was stored under
+            ref: Dead weak reference
+        """
+        with self._lock:
+            if self._refs.get(source_id) is not ref:
+                return
+            for key in list(self._sources[source_id]):
+                self._remove(key)
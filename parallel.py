@@ -0,0 +1,109 @@
+import functools
+import os
+from concurrent.futures import (Executor, ProcessPoolExecutor,
+                                ThreadPoolExecutor)
+from itertools import islice
+from typing import (Any, Callable, Iterable, Iterator, List, Optional,
+                    Tuple, TypeVar, Union)
+
+R = TypeVar('R')
+
+PROCESS_EXECUTOR = 'process'
+THREAD_EXECUTOR = 'thread'
+
+# Arrays shorter than this are processed serially by default
+PARALLEL_THRESHOLD = 10000
+
+# Chunks handed to each worker when no chunk size is given
+CHUNKS_PER_WORKER = 4
+
+
+def map_chunk(func: Callable[[Any], Any],
+              chunk: Tuple[Any, ...]) -> List[Any]:
+    """Map function over one chunk.
+    Args:
+        func: Function to apply to each element
+        chunk: Elements
+    Returns:
+        Mapped elements
+    """
+    return list(map(func, chunk))
+
+
+def filter_chunk(predicate: Callable[[Any], bool],
+                 chunk: Tuple[Any, ...]) -> List[Any]:
+    """Filter one chunk.
+    Args:
+        predicate: Function returning True for elements to keep
+        chunk: Elements
+    Returns:
+        Kept elements
+    """
+    return [item for item in chunk if predicate(item)]
+
+
+def reduce_chunk(func: Callable[[Any, Any], Any], identity: Any,
+                 chunk: Tuple[Any, ...]) -> Any:
+    """Reduce one chunk starting from the identity.
+    Args:
+        func: Associative reduction function
+        identity: Identity element of func
+        chunk: Elements
+    Returns:
+        Partial result
+    """
+    return functools.reduce(func, chunk, identity)
+
+
+def split(items: Iterable[Any], length: int, workers: Optional[int],
+          chunk_size: Optional[int]) -> Iterator[Tuple[Any, ...]]:
+    """Split elements into consecutive chunks in a single pass.
+    Args:
+        items: Elements
+        length: Number of elements
+        workers: Number of workers, defaults to the CPU count
+        chunk_size: Elements per chunk, derived from workers if None
+    Returns:
+        Iterator over chunks
+    Raises:
+        ValueError: If chunk_size is not positive
+    """
+    if chunk_size is None:
+        parts = (workers or os.cpu_count() or 1) * CHUNKS_PER_WORKER
+        chunk_size = max(1, -(-length // parts))
+    if chunk_size <= 0:
+        raise ValueError("Chunk size must be positive")
+    iterator = iter(items)
+    while True:
+        chunk = tuple(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run(task: Callable[[Tuple[Any, ...]], R],
+        chunks: Iterable[Tuple[Any, ...]],
+        executor: Union[str, Executor],
+        workers: Optional[int]) -> List[R]:
+    """Run task over chunks on a pool, keeping chunk order.
+    Process pools need task and its arguments to be picklable.
+    Args:
+        task: Function applied to each chunk
+        chunks: Chunks of elements
+        executor: 'process', 'thread' or an existing Executor
+        workers: Pool size for a new pool, defaults to the CPU count
+    Returns:
+        Task results in chunk order
+    Raises:
+        ValueError: If executor is unknown
+    """
+    if isinstance(executor, Executor):
+        return list(executor.map(task, chunks))
+    if executor == PROCESS_EXECUTOR:
+        pool: Executor = ProcessPoolExecutor(max_workers=workers)
+    elif executor == THREAD_EXECUTOR:
+        pool = ThreadPoolExecutor(max_workers=workers)
+    else:
+        raise ValueError("Unknown executor: {}".format(executor))
+    with pool:
+        return list(pool.map(task, chunks))
@@ -0,0 +1,431 @@
+from itertools import groupby, islice
+from operator import itemgetter
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+BITS = 5
+WIDTH = 1 << BITS
+MASK = WIDTH - 1
+
+Node = Tuple[Any, ...]
+
+
+class PersistentVector:
+    """Immutable bit-partitioned vector trie (Clojure style).
+
+    Elements live in 32-wide leaf tuples hanging off a tree of 32-wide
+    branch tuples, plus a tail tuple holding the last (up to 32)
+    elements. Updates copy only the path from the root to the touched
+    leaf, so every new version shares all other nodes with its parent.
+    Vectors of at most 32 elements are just the tail tuple.
+
+    Attributes:
+        _count: Number of elements
+        _shift: Bit offset of the root level
+        _root: Root branch node
+        _tail: Tuple of trailing elements not yet pushed into the tree
+    """
+    __slots__ = ('_count', '_shift', '_root', '_tail')
+
+    def __init__(self, count: int, shift: int, root: Node,
+                 tail: Node):
+        """Initialize vector from its internal parts.
+        Args:
+            count: Number of elements
+            shift: Bit offset of the root level
+            root: Root branch node
+            tail: Trailing elements
+        """
+        self._count = count
+        self._shift = shift
+        self._root = root
+        self._tail = tail
+
+    @staticmethod
+    def empty() -> 'PersistentVector':
+        """Create an empty vector.
+        Returns:
+            New empty vector
+        """
+        return PersistentVector(0, BITS, (), ())
+
+    @staticmethod
+    def from_iterable(items: Iterable[Any],
+                      base: Optional['PersistentVector'] = None
+                      ) -> 'PersistentVector':
+        """Build a vector from an iterable in a single pass.
+        Args:
+            items: Elements in order
+            base: Vector to share nodes with: its leaves are reused
+                where the new ones are equal, and when both vectors
+                have the same shape only the paths to changed leaves
+                are copied
+        Returns:
+            Vector containing the elements
+        """
+        if isinstance(items, (tuple, list)):
+            tail_off = _tail_offset(len(items))
+            leaves: List[Node] = [tuple(items[i:i + WIDTH])
+                                  for i in range(0, tail_off, WIDTH)]
+            tail = tuple(items[tail_off:])
+        else:
+            # Stream leaf by leaf so no flat copy of the input is made
+            iterator = iter(items)
+            leaves = []
+            tail = tuple(islice(iterator, WIDTH))
+            while True:
+                following = tuple(islice(iterator, WIDTH))
+                if not following:
+                    break
+                leaves.append(tail)
+                tail = following
+        if base is None:
+            return _from_leaves(leaves, tail)
+        return base._rebuild(leaves, tail)
+
+    def __len__(self) -> int:
+        """Get number of elements.
+        Returns:
+            Vector length
+        """
+        return self._count
+
+    def __getitem__(self, index: int) -> Any:
+        """Get element at a non-negative index.
+        Args:
+            index: Index in range [0, len)
+        Returns:
+            Element at index
+        Raises:
+            IndexError: If index out of bounds
+        """
+        if index < 0 or index >= self._count:
+            raise IndexError("Index out of range")
+        return self._leaf_for(index)[index & MASK]
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate elements leaf by leaf.
+        Returns:
+            Iterator over elements
+        """
+        tail_off = _tail_offset(self._count)
+        for start in range(0, tail_off, WIDTH):
+            yield from self._leaf_for(start)
+        yield from self._tail
+
+    def iter_range(self, start: int, stop: int) -> Iterator[Any]:
+        """Iterate elements in [start, stop) from the leaf holding start.
+        Runs in O(stop - start + log n), skipping earlier leaves.
+        Args:
+            start: First index, in range [0, len]
+            stop: End index, exclusive, in range [start, len]
+        Returns:
+            Iterator over elements
+        """
+        tail_off = _tail_offset(self._count)
+        index = start
+        while index < stop:
+            base = tail_off if index >= tail_off else index & ~MASK
+            leaf = self._leaf_for(index)
+            yield from islice(leaf, index - base, stop - base)
+            index = base + len(leaf)
+
+    def set(self, index: int, value: Any) -> 'PersistentVector':
+        """Replace element at index, copying one root-to-leaf path.
+        Args:
+            index: Index in range [0, len)
+            value: New value
+        Returns:
+            New vector sharing all untouched nodes
+        Raises:
+            IndexError: If index out of bounds
+        """
+        if index < 0 or index >= self._count:
+            raise IndexError("Index out of range")
+        if index >= _tail_offset(self._count):
+            pos = index & MASK
+            tail = self._tail[:pos] + (value,) + self._tail[pos + 1:]
+            return PersistentVector(self._count, self._shift,
+                                    self._root, tail)
+        root = _assoc(self._shift, self._root, index, value)
+        return PersistentVector(self._count, self._shift, root,
+                                self._tail)
+
+    def set_many(self, updates: Iterable[Tuple[int, Any]]
+                 ) -> 'PersistentVector':
+        """Replace several elements, copying each touched node once.
+        Args:
+            updates: (index, value) pairs with indices in range
+                [0, len); later pairs win for repeated indices
+        Returns:
+            New vector sharing all untouched nodes
+        Raises:
+            IndexError: If an index is out of bounds
+        """
+        tail_off = _tail_offset(self._count)
+        in_tree: List[Tuple[int, Any]] = []
+        tail: Optional[List[Any]] = None
+        for index, value in updates:
+            if index < 0 or index >= self._count:
+                raise IndexError("Index out of range")
+            if index >= tail_off:
+                if tail is None:
+                    tail = list(self._tail)
+                tail[index - tail_off] = value
+            else:
+                in_tree.append((index, value))
+        root = self._root
+        if in_tree:
+            # Stable, so repeated indices keep their order
+            in_tree.sort(key=itemgetter(0))
+            root = _assoc_many(self._shift, root, in_tree)
+        return PersistentVector(self._count, self._shift, root,
+                                self._tail if tail is None else tuple(tail))
+
+    def append(self, value: Any) -> 'PersistentVector':
+        """Add element to the end.
+        Args:
+            value: Element to add
+        Returns:
+            New vector with element appended
+        """
+        if len(self._tail) < WIDTH:
+            return PersistentVector(self._count + 1, self._shift,
+                                    self._root, self._tail + (value,))
+        shift = self._shift
+        if (self._count >> BITS) > (1 << shift):
+            # Root is full, grow the tree by one level
+            root: Node = (self._root,
+                          _new_path(shift, self._tail))
+            shift += BITS
+        else:
+            root = _push_tail(self._count, shift, self._root,
+                              self._tail)
+        return PersistentVector(self._count + 1, shift, root, (value,))
+
+    def extend(self, items: Iterable[Any]) -> 'PersistentVector':
+        """Append all items to the end.
+        Args:
+            items: Elements to append
+        Returns:
+            New vector sharing this vector's nodes
+        """
+        result = self
+        for item in items:
+            result = result.append(item)
+        return result
+
+    def changed(self, other: 'PersistentVector') -> Iterator[int]:
+        """Find indices whose elements differ from another vector's.
+        Subtrees shared by both vectors are skipped, so the cost is
+        proportional to the changed region for related versions.
+        Args:
+            other: Vector to compare with
+        Returns:
+            Iterator over differing indices below the shorter length
+        """
+        limit = min(self._count, other._count)
+        tree_limit = min(_tail_offset(self._count),
+                         _tail_offset(other._count))
+        if self._shift == other._shift:
+            yield from _changed(self._shift, self._root, other._root, 0)
+        else:
+            for start in range(0, tree_limit, WIDTH):
+                yield from _changed(0, self._leaf_for(start),
+                                    other._leaf_for(start), start)
+        for index in range(tree_limit, limit):
+            mine = self[index]
+            theirs = other[index]
+            if mine is not theirs and mine != theirs:
+                yield index
+
+    def _rebuild(self, leaves: List[Node],
+                 tail: Node) -> 'PersistentVector':
+        """Build a vector from leaves, sharing this vector's nodes.
+        Args:
+            leaves: Full leaves of the new vector
+            tail: Tail of the new vector
+        Returns:
+            Vector holding the leaves followed by the tail
+        """
+        count = len(leaves) * WIDTH + len(tail)
+        tail_off = _tail_offset(self._count)
+        changes = []
+        for position, leaf in enumerate(leaves):
+            start = position * WIDTH
+            if start >= tail_off:
+                break
+            old = self._leaf_for(start)
+            if old == leaf:
+                leaves[position] = old
+            else:
+                changes.append((start, leaf))
+        if tail == self._tail:
+            tail = self._tail
+        if _tail_offset(count) != tail_off:
+            return _from_leaves(leaves, tail)
+        root = self._root
+        if changes:
+            root = _assoc_leaves(self._shift, root, changes)
+        return PersistentVector(count, self._shift, root, tail)
+
+    def _leaf_for(self, index: int) -> Node:
+        """Find the leaf node holding an index.
+        Args:
+            index: Index in range [0, len)
+        Returns:
+            Leaf or tail tuple containing the index
+        """
+        if index >= _tail_offset(self._count):
+            return self._tail
+        node = self._root
+        level = self._shift
+        while level > 0:
+            node = node[(index >> level) & MASK]
+            level -= BITS
+        return node
+
+
+def _from_leaves(leaves: List[Node], tail: Node) -> PersistentVector:
+    """Build a vector from full leaves and a tail.
+    Args:
+        leaves: Leaf tuples of WIDTH elements each
+        tail: Trailing elements, between 1 and WIDTH unless empty
+    Returns:
+        Vector holding the leaves' elements followed by the tail
+    """
+    count = len(leaves) * WIDTH + len(tail)
+    nodes = leaves
+    shift = BITS
+    while len(nodes) > WIDTH:
+        nodes = [tuple(nodes[i:i + WIDTH])
+                 for i in range(0, len(nodes), WIDTH)]
+        shift += BITS
+    return PersistentVector(count, shift, tuple(nodes), tail)
+
+
+def _tail_offset(count: int) -> int:
+    """Get index of the first element stored in the tail.
+    Args:
+        count: Number of elements
+    Returns:
+        Tail offset
+    """
+    if count < WIDTH:
+        return 0
+    return ((count - 1) >> BITS) << BITS
+
+
+def _assoc(level: int, node: Node, index: int, value: Any) -> Node:
+    """Copy path to index, replacing the element in its leaf.
+    Args:
+        level: Bit offset of node
+        node: Current node
+        index: Element index
+        value: New value
+    Returns:
+        Copied node
+    """
+    pos = (index >> level) & MASK
+    if level == 0:
+        child: Any = value
+    else:
+        child = _assoc(level - BITS, node[pos], index, value)
+    return node[:pos] + (child,) + node[pos + 1:]
+
+
+def _assoc_many(level: int, node: Node,
+                updates: List[Tuple[int, Any]]) -> Node:
+    """Copy the paths to several indices, replacing their elements.
+    Args:
+        level: Bit offset of node
+        node: Current node
+        updates: (index, value) pairs below node, sorted by index
+    Returns:
+        Copied node
+    """
+    copied = list(node)
+    if level == 0:
+        for index, value in updates:
+            copied[index & MASK] = value
+        return tuple(copied)
+    for pos, group in groupby(updates,
+                              key=lambda update: (update[0] >> level) & MASK):
+        copied[pos] = _assoc_many(level - BITS, node[pos], list(group))
+    return tuple(copied)
+
+
+def _assoc_leaves(level: int, node: Node,
+                  leaves: List[Tuple[int, Node]]) -> Node:
+    """Copy the paths to several leaves, replacing them.
+    Args:
+        level: Bit offset of node
+        node: Current node
+        leaves: (first index, new leaf) pairs below node, sorted by
+            index
+    Returns:
+        Copied node, or the new leaf at level 0
+    """
+    if level == 0:
+        return leaves[0][1]
+    copied = list(node)
+    for pos, group in groupby(leaves,
+                              key=lambda leaf: (leaf[0] >> level) & MASK):
+        copied[pos] = _assoc_leaves(level - BITS, node[pos], list(group))
+    return tuple(copied)
+
+
+def _changed(level: int, mine: Node, theirs: Node,
+             first: int) -> Iterator[int]:
+    """Find differing indices below two nodes at the same level.
+    Args:
+        level: Bit offset of both nodes
+        mine: Node of one vector
+        theirs: Node of the other vector
+        first: Index of the first element below the nodes
+    Returns:
+        Iterator over differing indices present in both nodes
+    """
+    if mine is theirs:
+        return
+    if level == 0:
+        for pos, (a, b) in enumerate(zip(mine, theirs)):
+            if a is not b and a != b:
+                yield first + pos
+        return
+    for pos, (a, b) in enumerate(zip(mine, theirs)):
+        yield from _changed(level - BITS, a, b, first + (pos << level))
+
+
+def _new_path(level: int, leaf: Node) -> Node:
+    """Wrap a leaf in single-child branches down from level.
+    Args:
+        level: Bit offset of the returned node
+        leaf: Leaf tuple
+    Returns:
+        Branch chain ending in leaf
+    """
+    node = leaf
+    while level > 0:
+        node = (node,)
+        level -= BITS
+    return node
+
+
+def _push_tail(count: int, level: int, parent: Node, tail: Node) -> Node:
+    """Insert a full tail as the rightmost leaf below parent.
+    Args:
+        count: Element count before the push
+        level: Bit offset of parent
+        parent: Branch node
+        tail: Full tail to insert
+    Returns:
+        Copied parent containing the new leaf
+    """
+    pos = ((count - 1) >> level) & MASK
+    if level == BITS:
+        child = tail
+    elif pos < len(parent):
+        child = _push_tail(count, level - BITS, parent[pos], tail)
+    else:
+        child = _new_path(level - BITS, tail)
+    return parent[:pos] + (child,) + parent[pos + 1:]
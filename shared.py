@@ -0,0 +1,192 @@
+import importlib
+import mmap
+import os
+import sys
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Iterable, Optional, Tuple
+
+import binary_format
+from binary_format import BinaryArray
+
+
+class SharedHandle:
+    """Picklable reference to array data in a shared memory block.
+
+    The handle returned by DynamicArray.to_shared() owns the block:
+    keep it until every worker has attached, then call unlink(), or
+    use it as a context manager. Pickled copies sent to workers carry
+    only the block name and length.
+
+    Attributes:
+        name: Shared memory block name
+        length: Number of elements
+    """
+    __slots__ = ('name', 'length', '_block')
+
+    def __init__(self, name: str, length: int,
+                 block: Optional[SharedMemory] = None):
+        """Initialize handle.
+        Args:
+            name: Shared memory block name
+            length: Number of elements
+            block: Open block when this process created it
+        """
+        self.name = name
+        self.length = length
+        self._block = block
+
+    def __reduce__(self) -> Tuple[Any, Tuple[str, int]]:
+        """Pickle as the name and length only."""
+        return SharedHandle, (self.name, self.length)
+
+    def __repr__(self) -> str:
+        """Get representation.
+        Returns:
+            Handle description
+        """
+        return 'SharedHandle({!r}, {})'.format(self.name, self.length)
+
+    def __enter__(self) -> 'SharedHandle':
+        """Use the handle for the duration of a block.
+        Returns:
+            This handle
+        """
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Unlink the block."""
+        self.unlink()
+
+    def close(self) -> None:
+        """Close this process's view of the block without destroying it.
+        Attached arrays keep working.
+        """
+        if self._block is not None:
+            self._block.close()
+            self._block = None
+
+    def unlink(self) -> None:
+        """Destroy the block once every attached array is released.
+        No new arrays can attach afterwards. Safe to call twice.
+        """
+        block = self._block
+        if block is None:
+            try:
+                block = _open(self.name)
+            except FileNotFoundError:
+                return
+        self._block = None
+        block.close()
+        try:
+            block.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class SharedArray(BinaryArray):
+    """Read-only sequence over a shared memory block.
+
+    Attaching maps the block without copying it. The mapping is
+    released when the array is garbage collected or closed. Pickling
+    a SharedArray attaches the same block again by name.
+
+    Attributes:
+        name: Shared memory block name
+    """
+    __slots__ = ('name', '_mapping')
+
+    def __init__(self, name: str):
+        """Attach to a block written by share().
+        Args:
+            name: Shared memory block name
+        Raises:
+            FileNotFoundError: If the block was unlinked
+            ValueError: If the block does not hold array data
+        """
+        buffer, mapping = _attach(name)
+        try:
+            super().__init__(buffer)
+        except ValueError:
+            mapping.close()
+            raise
+        self.name = name
+        self._mapping: Any = mapping
+
+    def __reduce__(self) -> Tuple[Any, Tuple[str]]:
+        """Pickle as the name, so other processes attach the block."""
+        return SharedArray, (self.name,)
+
+    def __del__(self) -> None:
+        """Release the views before the block closes."""
+        self.close()
+
+    def close(self) -> None:
+        """Detach from the block. Elements can no longer be read."""
+        mapping = getattr(self, '_mapping', None)
+        if mapping is not None:
+            self._release()
+            self._mapping = None
+            mapping.close()
+
+
+def share(items: Iterable[Any], typecode: Optional[str] = None
+          ) -> SharedHandle:
+    """Copy elements into a new shared memory block.
+    The block holds the binary format, so typed values are laid out
+    raw and other elements as pickle records.
+    Args:
+        items: Elements, iterated once
+        typecode: array module typecode for a typed payload, None
+            stores pickle records
+    Returns:
+        Handle owning the block
+    """
+    pieces = [memoryview(piece).cast('B')
+              for piece in binary_format.encode(items, typecode)]
+    size = sum(piece.nbytes for piece in pieces)
+    block = SharedMemory(create=True, size=size)
+    buffer = block.buf
+    assert buffer is not None
+    position = 0
+    for piece in pieces:
+        buffer[position:position + piece.nbytes] = piece
+        position += piece.nbytes
+    # Element count field of the header
+    length = binary_format.HEADER.unpack_from(buffer)[6]
+    return SharedHandle(block.name, length, block)
+
+
+def _attach(name: str) -> Tuple[Any, Any]:
+    """Map an existing block without tying its life to this process.
+    Before Python 3.13 SharedMemory registers every block it opens
+    with the resource tracker, which unlinks it when the attaching
+    process exits unless the tracker is shared with the owner, so
+    POSIX blocks are mapped directly instead.
+    Args:
+        name: Shared memory block name
+    Returns:
+        Buffer over the block, and the object to close to detach
+    """
+    if sys.version_info < (3, 13) and os.name == 'posix':
+        posixshmem = importlib.import_module('_posixshmem')
+        fd = posixshmem.shm_open('/' + name, os.O_RDONLY, mode=0o600)
+        try:
+            mapped = mmap.mmap(fd, os.fstat(fd).st_size,
+                               access=mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+        return mapped, mapped
+    block = _open(name)
+    return block.buf, block
+
+
+def _open(name: str) -> SharedMemory:
+    """Open an existing block, untracked where Python supports it.
+    Args:
+        name: Shared memory block name
+    Returns:
+        Open block
+    """
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name, track=False)
+    return SharedMemory(name)
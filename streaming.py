@@ -0,0 +1,84 @@
+import pickle
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+NEWLINE = '\n'
+
+# Universal newline mode splits lines on these, so elements may not hold them
+LINE_BREAKS = ('\n', '\r')
+
+
+def read_lines(path: str, parse: Optional[Callable[[str], Any]] = None,
+               encoding: str = 'utf-8') -> Iterator[Any]:
+    """Stream one element per line of a text file.
+    Args:
+        path: File to read
+        parse: Function converting a line without its newline into an
+            element, default keeps the string
+        encoding: Text encoding
+    Returns:
+        Iterator over parsed lines, closing the file when exhausted
+    """
+    with open(path, encoding=encoding) as source:
+        for line in source:
+            if line.endswith(NEWLINE):
+                line = line[:-1]
+            yield line if parse is None else parse(line)
+
+
+def write_lines(path: str, items: Iterable[Any],
+                render: Optional[Callable[[Any], str]] = None,
+                encoding: str = 'utf-8') -> int:
+    """Write one element per line of a text file.
+    Args:
+        path: File to write
+        items: Elements
+        render: Function converting an element to a string, default str
+        encoding: Text encoding
+    Returns:
+        Number of lines written
+    Raises:
+        ValueError: If a rendered element contains a line break
+    """
+    count = 0
+    with open(path, 'w', encoding=encoding) as target:
+        for item in items:
+            line = str(item) if render is None else render(item)
+            if any(brk in line for brk in LINE_BREAKS):
+                raise ValueError("Rendered element contains a line "
+                                 "break: {!r}".format(line))
+            target.write(line + NEWLINE)
+            count += 1
+    return count
+
+
+def read_records(path: str) -> Iterator[Any]:
+    """Stream pickled records written by write_records.
+    Only read files from trusted sources, as unpickling can run
+    arbitrary code.
+    Args:
+        path: File to read
+    Returns:
+        Iterator over records, closing the file when exhausted
+    """
+    with open(path, 'rb') as source:
+        while True:
+            try:
+                yield pickle.load(source)
+            except EOFError:
+                return
+
+
+def write_records(path: str, items: Iterable[Any]) -> int:
+    """Write elements as consecutive pickle records.
+    Args:
+        path: File to write
+        items: Picklable elements
+    Returns:
+        Number of records written
+    """
+    count = 0
+    with open(path, 'wb') as target:
+        for item in items:
+            pickle.dump(item, target, pickle.HIGHEST_PROTOCOL)
+            count += 1
+    return count
@@ -0,0 +1,140 @@
+import asyncio
+import time
+import unittest
+from typing import Any, List
+
+from hypothesis import given, strategies as st
+
+import asynchronous
+from dynamic_array import DynamicArray
+
+
+async def double(x: int) -> int:
+    """Double after yielding to the event loop."""
+    await asyncio.sleep(0)
+    return x * 2
+
+
+async def is_even(x: int) -> bool:
+    """Check parity after yielding to the event loop."""
+    await asyncio.sleep(0)
+    return x % 2 == 0
+
+
+async def add(x: Any, y: Any) -> Any:
+    """Add after yielding to the event loop."""
+    await asyncio.sleep(0)
+    return x + y
+
+
+async def collect(items: List[Any]) -> List[Any]:
+    """Collect an async iteration over an array."""
+    return [item async for item in DynamicArray.from_list(items)]
+
+
+class TestAsynchronous(unittest.TestCase):
+    """Test async map, filter, reduce and iteration."""
+    def test_run_limits_concurrency(self) -> None:
+        """Test no more than the limit is in flight and order is kept."""
+        in_flight: List[int] = [0, 0]
+
+        async def track(x: int) -> int:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight[1], in_flight[0])
+            # Finish in reverse order of start
+            await asyncio.sleep(0.001 * (100 - x))
+            in_flight[0] -= 1
+            return x
+
+        results = asyncio.run(asynchronous.run(track, range(100), 100, 7))
+        self.assertEqual(results, list(range(100)))
+        self.assertEqual(in_flight[1], 7)
+        with self.assertRaises(ValueError):
+            asyncio.run(asynchronous.run(track, range(3), 3, 0))
+
+    def test_run_cancels_on_error(self) -> None:
+        """Test a failing call cancels the remaining workers."""
+        started: List[int] = []
+
+        async def fail(x: int) -> int:
+            started.append(x)
+            await asyncio.sleep(0.001)
+            if x == 3:
+                raise KeyError(x)
+            return x
+
+        with self.assertRaises(KeyError):
+            asyncio.run(asynchronous.run(fail, range(1000), 1000, 4))
+        self.assertLess(len(started), 20)
+
+    def test_throughput_scales(self) -> None:
+        """Test I/O-bound maps are bounded by the limit, not latency."""
+        async def lookup(x: int) -> int:
+            await asyncio.sleep(0.02)
+            return x
+
+        arr = DynamicArray.from_list(list(range(200)))
+        start = time.perf_counter()
+        result = asyncio.run(arr.amap(lookup, concurrency=100))
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(result, arr)
+
+    def test_operations(self) -> None:
+        """Test amap, afilter and areduce equal their serial versions."""
+        arr = DynamicArray.from_list(list(range(50)))
+        self.assertEqual(asyncio.run(arr.amap(double, 3)),
+                         arr.map(lambda x: x * 2))
+        self.assertEqual(asyncio.run(arr.afilter(is_even, 3)),
+                         arr.filter(lambda x: x % 2 == 0))
+        self.assertEqual(asyncio.run(arr.areduce(add, 0, 3)), 1225)
+        self.assertEqual(asyncio.run(DynamicArray.empty().areduce(add, 0)),
+                         0)
+        with self.assertRaises(ValueError):
+            asyncio.run(arr.areduce(add, 0, 0))
+
+    def test_typed(self) -> None:
+        """Test typed arrays keep their dtype."""
+        arr = DynamicArray.from_list([1.0, 2.0, 3.0], dtype='f8')
+        self.assertEqual(asyncio.run(arr.amap(double)).dtype(), 'f8')
+        self.assertEqual(asyncio.run(arr.afilter(is_even)).to_list(), [2.0])
+
+    def test_aiter(self) -> None:
+        """Test async iteration and construction."""
+        items = list(range(asynchronous.YIELD_EVERY * 2 + 5))
+        self.assertEqual(asyncio.run(collect(items)), items)
+        arr = DynamicArray.from_list(items)
+        created = asyncio.run(DynamicArray.afrom_async_iterable(
+            arr, size_hint=10000, backend='trie'))
+        self.assertEqual(created, arr)
+        self.assertEqual(created.backend(), 'trie')
+        self.assertEqual(created._capacity, 10000)
+        # Tuple arrays keep the collected list instead of copying it
+        created = asyncio.run(DynamicArray.afrom_async_iterable(
+            arr, size_hint=10))
+        self.assertIs(type(created._data), list)
+        self.assertEqual(created, arr)
+        self.assertEqual(created._capacity, len(items))
+        self.assertEqual(created.cons(-1).get(0), -1)
+
+
+class AsynchronousPropertyTest(unittest.TestCase):
+    """Property-based tests for async operations."""
+    @given(st.lists(st.text()), st.integers(1, 10))
+    def test_areduce_matches_reduce(self, items: List[str],
+                                    concurrency: int) -> None:
+        """Test chunked reduction keeps element order."""
+        arr = DynamicArray.from_list(items)
+        self.assertEqual(asyncio.run(arr.areduce(add, '', concurrency)),
+                         arr.reduce(lambda x, y: x + y, ''))
+
+    @given(st.lists(st.integers()), st.integers(1, 10))
+    def test_amap_matches_map(self, items: List[int],
+                              concurrency: int) -> None:
+        """Test concurrent maps keep element order."""
+        arr = DynamicArray.from_list(items)
+        self.assertEqual(asyncio.run(arr.amap(double, concurrency)),
+                         arr.map(lambda x: x * 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
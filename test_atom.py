@@ -0,0 +1,131 @@
+import functools
+import threading
+import unittest
+from concurrent.futures import Future
+from typing import List
+
+from hypothesis import given, strategies as st
+
+from atom import ArrayRef
+from dynamic_array import DynamicArray
+
+
+def increment(arr: DynamicArray, index: int = 0) -> DynamicArray:
+    """Add one to an element."""
+    return arr.set(index, arr.get(index) + 1)
+
+
+def cons_to(value: int, arr: DynamicArray) -> DynamicArray:
+    """Append a value."""
+    return arr.cons(value)
+
+
+class TestArrayRef(unittest.TestCase):
+    """Test swaps, compare-and-set and batched updates."""
+    def test_get_reset_compare_and_set(self) -> None:
+        """Test compare-and-set compares by identity."""
+        first = DynamicArray.from_list([1])
+        ref = ArrayRef(first)
+        self.assertIs(ref.get(), first)
+        self.assertEqual(ArrayRef().get().length(), 0)
+        equal = DynamicArray.from_list([1])
+        self.assertFalse(ref.compare_and_set(equal, equal))
+        self.assertTrue(ref.compare_and_set(first, equal))
+        self.assertIs(ref.get(), equal)
+        self.assertIs(ref.reset(first), first)
+        self.assertEqual((ref.published, ref.retries), (2, 1))
+        self.assertEqual(repr(ref), 'ArrayRef([1])')
+
+    def test_swap_retries(self) -> None:
+        """Test swap reruns fn when another writer published first."""
+        ref = ArrayRef(DynamicArray.from_list([0, 0]))
+        calls: List[int] = []
+
+        def interfere(arr: DynamicArray) -> DynamicArray:
+            calls.append(arr.get(1))
+            if len(calls) == 1:
+                ref.swap(increment, 1)
+            return increment(arr)
+
+        self.assertEqual(ref.swap(interfere).to_list(), [1, 1])
+        self.assertEqual(calls, [0, 1])
+        self.assertEqual(ref.retries, 1)
+
+    def test_swap_threads(self) -> None:
+        """Test concurrent swaps lose no update."""
+        ref = ArrayRef(DynamicArray.from_list([0] * 100))
+
+        def work() -> None:
+            for _ in range(500):
+                ref.swap(increment)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(ref.get().get(0), 4000)
+        self.assertEqual(ref.published, 4000)
+
+    def test_batching(self) -> None:
+        """Test queued updates are coalesced into one version."""
+        ref = ArrayRef(DynamicArray.from_list([0]), batch_interval=60)
+        futures = [ref.submit(increment) for _ in range(10)]
+        failed = ref.submit(lambda arr: arr.get(5))
+        cancelled = ref.submit(increment)
+        cancelled.cancel()
+        value = ref.flush()
+        assert value is not None
+        self.assertEqual(value.to_list(), [10])
+        self.assertEqual(ref.published, 1)
+        for future in futures:
+            self.assertIs(future.result(), value)
+        self.assertIsInstance(failed.exception(), IndexError)
+        self.assertIsNone(ref.flush())
+        ref.close()
+        with self.assertRaises(RuntimeError):
+            ref.submit(increment)
+        with self.assertRaises(RuntimeError):
+            ArrayRef().submit(increment)
+        with self.assertRaises(ValueError):
+            ArrayRef(batch_interval=0)
+
+    def test_batch_thread(self) -> None:
+        """Test the batch thread applies updates from many threads."""
+        futures: List['Future[DynamicArray]'] = []
+        with ArrayRef(DynamicArray.from_list([0]),
+                      batch_interval=0.001) as ref:
+            def work() -> None:
+                for _ in range(200):
+                    futures.append(ref.submit(increment))
+
+            threads = [threading.Thread(target=work) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(ref.get().to_list(), [800])
+        self.assertTrue(all(future.done() for future in futures))
+        self.assertLessEqual(ref.published, len(futures))
+        self.assertEqual(ref.retries, 0)
+
+
+class ArrayRefPropertyTest(unittest.TestCase):
+    """Property-based tests for array references."""
+    @given(st.lists(st.integers(), max_size=50),
+           st.lists(st.integers(), max_size=20))
+    def test_batch_matches_swaps(self, items: List[int],
+                                 values: List[int]) -> None:
+        """Test a batch publishes the same array as sequential swaps."""
+        swapped = ArrayRef(DynamicArray.from_list(items))
+        batched = ArrayRef(DynamicArray.from_list(items), batch_interval=60)
+        for value in values:
+            swapped.swap(DynamicArray.cons, value)
+            batched.submit(functools.partial(cons_to, value))
+        batched.close()
+        self.assertEqual(batched.get(), swapped.get())
+        self.assertEqual(batched.published, 1 if values else 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
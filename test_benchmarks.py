@@ -0,0 +1,89 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from benchmarks import runner
+from benchmarks.cases import CASES, TARGETS, Case
+
+
+class TestBenchmarks(unittest.TestCase):
+    """Test the benchmark runner."""
+    def test_cases(self) -> None:
+        """Test every case runs and names are unique."""
+        names = [case.name for case in CASES]
+        self.assertEqual(len(names), len(set(names)))
+        for case in CASES:
+            self.assertIn(case.target, TARGETS)
+            case.run(case.setup(10))
+
+    def test_select(self) -> None:
+        """Test selecting cases by glob."""
+        names = [case.name for case in runner.select(['*.cons'])]
+        self.assertEqual(names, ['dynamic_array.cons', 'list.cons',
+                                 'tuple.cons'])
+        self.assertEqual(len(runner.select(None)), len(CASES))
+
+    def test_fit_exponent(self) -> None:
+        """Test fitting exact power laws."""
+        linear = {size: 2e-9 * size for size in (10, 1000, 100000)}
+        quadratic = {size: 1e-9 * size ** 2 for size in (1000, 10000)}
+        self.assertAlmostEqual(runner.fit_exponent(linear) or 0, 1.0)
+        self.assertAlmostEqual(runner.fit_exponent(quadratic) or 0, 2.0)
+        self.assertIsNone(runner.fit_exponent({10: 1e-6}))
+
+    def test_bench_case(self) -> None:
+        """Test max_size and the time budget stop larger sizes."""
+        case = Case('list', 'sum', lambda size: list(range(size)), sum,
+                    max_size=100)
+        timings = runner.bench_case(case, [10, 100, 1000], 0.001)
+        self.assertEqual(sorted(timings), [10, 100])
+        timings = runner.bench_case(case, [10, 100], 0.001, budget=0.0)
+        self.assertEqual(sorted(timings), [10])
+
+    def test_regressions(self) -> None:
+        """Test comparing results with a baseline."""
+        baseline = {'a': {10: 1e-3, 100: 1e-2}, 'b': {10: 1e-9}}
+        results = {'a': {10: 1.2e-3, 100: 3e-2}, 'b': {10: 1e-8},
+                   'c': {10: 1.0}}
+        regressions = runner.find_regressions(results, baseline, 1.5)
+        self.assertEqual([(r.case, r.size) for r in regressions],
+                         [('a', 100)])
+        self.assertAlmostEqual(regressions[0].ratio, 3.0)
+        self.assertEqual(runner.find_regressions(results, baseline, 4.0),
+                         [])
+
+    def test_json_round_trip(self) -> None:
+        """Test results survive JSON serialisation."""
+        results = {'a': {10: 1e-6, 100: 1e-5}}
+        document = json.loads(json.dumps(runner.to_json(results)))
+        self.assertEqual(runner.from_json(document), results)
+        self.assertAlmostEqual(document['cases']['a']['exponent'], 1.0)
+
+    def test_main(self) -> None:
+        """Test the command line writes results and gates on baseline."""
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'results.json')
+            baseline = os.path.join(directory, 'baseline.json')
+            options = ['list.map', '--sizes', '10', '100',
+                       '--min-time', '0.001']
+            with redirect_stdout(io.StringIO()):
+                self.assertEqual(runner.main(
+                    options + ['--output', output, '--baseline', baseline,
+                               '--update-baseline']), 0)
+                with open(output) as source:
+                    self.assertIn('list.map', json.load(source)['cases'])
+                self.assertEqual(runner.main(
+                    options + ['--baseline', baseline,
+                               '--threshold', '1000']), 0)
+                with open(baseline, 'w') as target:
+                    json.dump(runner.to_json({'list.map': {100: 1e-9}}),
+                              target)
+                self.assertEqual(runner.main(
+                    options + ['--baseline', baseline]), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import os
+import pickle
+import tempfile
+import unittest
+from array import array
+from typing import Any, List
+from unittest import mock
+
+from hypothesis import given, strategies as st
+
+import binary_format
+from binary_format import MappedArray
+from dynamic_array import DynamicArray
+
+
+class TestBinaryFormat(unittest.TestCase):
+    """Test writing and memory-mapping binary files."""
+    def setUp(self) -> None:
+        """Create a scratch directory."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'data.bin')
+
+    def tearDown(self) -> None:
+        """Remove the scratch directory."""
+        self.directory.cleanup()
+
+    def test_typed(self) -> None:
+        """Test typed values are read straight from the mapping."""
+        self.assertEqual(binary_format.write(self.path, [1.5, -2.0, 3.25],
+                                             'd'), 3)
+        self.assertEqual(os.path.getsize(self.path),
+                         binary_format.HEADER.size + 24)
+        mapped = MappedArray(self.path)
+        self.assertEqual(mapped.typecode, 'd')
+        self.assertEqual(len(mapped), 3)
+        self.assertEqual(mapped[1], -2.0)
+        self.assertEqual(list(mapped), [1.5, -2.0, 3.25])
+        self.assertEqual(mapped[::2], array('d', [1.5, 3.25]))
+        with self.assertRaises(IndexError):
+            mapped[3]
+        mapped.close()
+
+    def test_records(self) -> None:
+        """Test arbitrary elements are stored as indexed records."""
+        items = [1, 'two', None, (3, [4])]
+        self.assertEqual(binary_format.write(self.path, iter(items)), 4)
+        mapped = MappedArray(self.path)
+        self.assertIsNone(mapped.typecode)
+        self.assertEqual(mapped[3], (3, [4]))
+        self.assertEqual(list(mapped), items)
+        self.assertEqual(mapped[1:3], ('two', None))
+        mapped.close()
+
+    def test_empty(self) -> None:
+        """Test empty files of both kinds."""
+        for typecode in ('i', None):
+            binary_format.write(self.path, [], typecode)
+            mapped = MappedArray(self.path)
+            self.assertEqual(len(mapped), 0)
+            self.assertEqual(list(mapped), [])
+            mapped.close()
+
+    def test_pickle_reopens(self) -> None:
+        """Test pickling maps the file again instead of copying it."""
+        binary_format.write(self.path, range(5), 'q')
+        mapped = MappedArray(self.path)
+        self.assertLess(len(pickle.dumps(mapped)), 200)
+        copy = pickle.loads(pickle.dumps(mapped))
+        self.assertEqual(list(copy), [0, 1, 2, 3, 4])
+        copy.close()
+        mapped.close()
+
+    def test_invalid(self) -> None:
+        """Test files in other formats are rejected."""
+        with open(self.path, 'wb') as target:
+            target.write(b'short')
+        with self.assertRaises(ValueError):
+            MappedArray(self.path)
+        with open(self.path, 'wb') as target:
+            target.write(b'\0' * binary_format.HEADER.size)
+        with self.assertRaises(ValueError):
+            MappedArray(self.path)
+
+    def test_truncated(self) -> None:
+        """Test files shorter than their header claims are rejected."""
+        for items, typecode in (([1.5] * 100, 'd'), (['x'] * 100, None)):
+            binary_format.write(self.path, items, typecode)
+            size = os.path.getsize(self.path)
+            # Cut inside an item and exactly on an item boundary
+            for cut in (size - 3, size - 8):
+                with open(self.path, 'r+b') as target:
+                    target.truncate(cut)
+                with self.assertRaises(ValueError):
+                    MappedArray(self.path)
+
+    def test_record_views_unpickle_only_the_view(self) -> None:
+        """Test slicing a record file reads just the sliced records."""
+        size = 20000
+        binary_format.write(self.path, map(str, range(size)))
+        arr = DynamicArray.open_mmap(self.path)
+        with mock.patch.object(pickle, 'loads',
+                               wraps=pickle.loads) as loads:
+            self.assertEqual(arr.drop(size - 3).to_list(),
+                             [str(size - 3), str(size - 2), str(size - 1)])
+            self.assertEqual(arr[100:90:-5].to_list(), ['100', '95'])
+        self.assertEqual(loads.call_count, 5)
+
+
+class BinaryFormatPropertyTest(unittest.TestCase):
+    """Property-based tests for binary round trips."""
+    @given(st.lists(st.one_of(st.integers(), st.text(), st.none())))
+    def test_records_round_trip(self, items: List[Any]) -> None:
+        """Test records read back exactly as written."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'data.bin')
+            binary_format.write(path, items)
+            mapped = MappedArray(path)
+            self.assertEqual(list(mapped), items)
+            self.assertEqual([mapped[i] for i in range(len(items))], items)
+            mapped.close()
+
+    @given(st.lists(st.integers(-2 ** 31, 2 ** 31 - 1)))
+    def test_typed_round_trip(self, items: List[int]) -> None:
+        """Test typed values read back exactly as written."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'data.bin')
+            binary_format.write(path, items, 'i')
+            mapped = MappedArray(path)
+            self.assertEqual(list(mapped), items)
+            mapped.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
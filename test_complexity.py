@@ -0,0 +1,330 @@
+import sys
+import unittest
+from typing import Any, Callable, Dict
+
+from hypothesis import given, settings, strategies as st
+
+import instrumentation
+import persistent_vector
+from dynamic_array import (TRIE_BACKEND, TUPLE_BACKEND, TYPED_BACKEND,
+                           DynamicArray)
+from persistent_vector import WIDTH, PersistentVector
+
+# Input sizes every bound is checked at
+SIZES = (0, 1, 10, 100, 1000, 5000)
+
+# Size of the stress tests, far beyond the recursion limit
+STRESS_SIZE = 100 * sys.getrecursionlimit()
+
+sizes = st.sampled_from(SIZES)
+backends = st.sampled_from([TUPLE_BACKEND, TRIE_BACKEND])
+
+# How input arrays are built: in one pass, by cons, or as a view
+builders = st.sampled_from(['iterable', 'cons', 'view'])
+
+# Elements prepended by cons when building 'cons' inputs
+CONS_COUNT = 100
+
+_counts: Dict[str, int] = {'eq': 0, 'order': 0, 'hash': 0}
+
+
+class Counted:
+    """Element counting its comparisons and hashes."""
+    __slots__ = ('value',)
+
+    def __init__(self, value: int):
+        """Wrap a value."""
+        self.value = value
+
+    def __eq__(self, other: object) -> bool:
+        """Compare values, counting the call."""
+        _counts['eq'] += 1
+        return isinstance(other, Counted) and self.value == other.value
+
+    def __lt__(self, other: 'Counted') -> bool:
+        """Order values, counting the call."""
+        _counts['order'] += 1
+        return self.value < other.value
+
+    def __gt__(self, other: 'Counted') -> bool:
+        """Order values, counting the call."""
+        _counts['order'] += 1
+        return self.value > other.value
+
+    def __hash__(self) -> int:
+        """Hash the value, counting the call."""
+        _counts['hash'] += 1
+        return hash(self.value)
+
+
+def counted(values: range, backend: str = TUPLE_BACKEND) -> DynamicArray:
+    """Create an array of Counted elements.
+    Args:
+        values: Element values
+        backend: Storage backend
+    Returns:
+        New array
+    """
+    return DynamicArray.from_iterable(map(Counted, values), backend=backend)
+
+
+def build(builder: str, size: int, backend: str) -> DynamicArray:
+    """Create the array of range(size) in one of several ways.
+    Args:
+        builder: 'iterable' for from_iterable, 'cons' to prepend the
+            first elements with cons, 'view' for a slice view with an
+            offset into a larger array
+        size: Number of elements
+        backend: Storage backend
+    Returns:
+        New array
+    """
+    if builder == 'view':
+        return DynamicArray.from_iterable(range(-3, size + 2),
+                                          backend=backend)[3:size + 3]
+    if builder == 'iterable':
+        return DynamicArray.from_iterable(range(size), backend=backend)
+    split = min(CONS_COUNT, size)
+    arr = DynamicArray.from_iterable(range(split, size), backend=backend)
+    for value in range(split - 1, -1, -1):
+        arr = arr.cons(value)
+    return arr
+
+
+def measure(func: Callable[[], Any]) -> Dict[str, int]:
+    """Count the work done by one call.
+    Args:
+        func: Function to call
+    Returns:
+        Elements copied, storage allocations, equality comparisons,
+        ordering comparisons and hashes made during the call
+    """
+    for name in _counts:
+        _counts[name] = 0
+    instrumentation.reset()
+    func()
+    stats = instrumentation.stats()
+    return dict(_counts, copied=stats.copied, allocations=stats.allocations)
+
+
+def unshared_leaves(old: PersistentVector, new: PersistentVector) -> int:
+    """Count leaves of new, tail included, that old does not share.
+    Args:
+        old: Original vector
+        new: Vector derived from it
+    Returns:
+        Number of leaves that were copied
+    """
+    tail_offset = persistent_vector._tail_offset(new._count)
+    copied = sum(start >= persistent_vector._tail_offset(old._count) or
+                 old._leaf_for(start) is not new._leaf_for(start)
+                 for start in range(0, tail_offset, WIDTH))
+    return copied + (new._tail is not old._tail)
+
+
+class ComplexityPropertyTest(unittest.TestCase):
+    """Check operations stay within their documented bounds.
+
+    Work is counted rather than timed, so the checks are deterministic:
+    elements copied and storage allocations come from the
+    instrumentation counters, comparisons and hashes from Counted
+    elements, and trie sharing from node identity.
+    """
+    def setUp(self) -> None:
+        """Count copies during every test."""
+        instrumentation.enable()
+
+    def tearDown(self) -> None:
+        """Leave instrumentation disabled."""
+        instrumentation.disable()
+        instrumentation.reset()
+
+    @given(sizes, st.integers(0, 10 ** 6))
+    def test_remove(self, size: int, position: int) -> None:
+        """Test remove compares up to the match and copies once."""
+        arr = counted(range(size))
+        index = position % size if size else 0
+        work = measure(lambda: arr.remove(Counted(index)))
+        self.assertEqual(work['eq'], min(index + 1, size))
+        self.assertEqual(work['hash'], 0)
+        self.assertLessEqual(work['copied'], size)
+        self.assertLessEqual(work['allocations'], 1)
+        absent = measure(lambda: arr.remove(Counted(-1)))
+        self.assertEqual(absent['eq'], size)
+
+    @given(sizes, st.integers(0, 10 ** 6), backends, builders)
+    def test_set(self, size: int, position: int, backend: str,
+                 builder: str) -> None:
+        """Test set copies at most n elements, or one trie leaf."""
+        if size == 0:
+            return
+        index = position % size
+        arr = build(builder, size, backend)
+        work = measure(lambda: arr.set(index, -1))
+        self.assertLessEqual(work['copied'], size)
+        self.assertEqual(work['allocations'], 1)
+        if arr._trie_suffix() is not None:
+            self.assertLessEqual(work['copied'], WIDTH)
+            old = arr._data
+            new = arr.set(index, -1)._data
+            assert isinstance(old, PersistentVector)
+            assert isinstance(new, PersistentVector)
+            self.assertEqual(unshared_leaves(old, new), 1)
+
+    @given(sizes, st.integers(1, 3 * max(SIZES)),
+           st.sampled_from([TUPLE_BACKEND, TRIE_BACKEND, TYPED_BACKEND]))
+    def test_cons(self, size: int, count: int, backend: str) -> None:
+        """Test cons is amortized O(1), or O(log32 n) on a trie."""
+        if backend == TYPED_BACKEND:
+            arr = DynamicArray.from_iterable(range(size), dtype='i8')
+        else:
+            arr = DynamicArray.from_iterable(range(size), backend=backend)
+
+        def prepend() -> None:
+            result = arr
+            for value in range(count):
+                result = result.cons(value)
+            self.assertEqual(result.backend(), backend)
+
+        work = measure(prepend)
+        # Buffers grow geometrically
+        rebuilds = (size + count).bit_length() + 1
+        if backend == TRIE_BACKEND:
+            # Each write into the head room copies one leaf
+            self.assertLessEqual(work['copied'],
+                                 3 * (size + count) + WIDTH * count)
+            self.assertLessEqual(work['allocations'], count + rebuilds)
+        else:
+            self.assertLessEqual(work['copied'], 3 * (size + count))
+            self.assertLessEqual(work['allocations'], rebuilds)
+        # Older versions copy into a new buffer instead
+        arr.cons(0)
+        work = measure(lambda: arr.cons(1))
+        self.assertEqual(work['copied'], size + 1)
+
+    @given(sizes, sizes, backends, builders, builders)
+    def test_concat(self, size: int, other_size: int, backend: str,
+                    builder: str, other_builder: str) -> None:
+        """Test concat copies n + m elements, or only m onto a trie."""
+        arr = build(builder, size, backend)
+        other = build(other_builder, other_size, TUPLE_BACKEND)
+        work = measure(lambda: arr.concat(other))
+        self.assertLessEqual(work['copied'], size + other_size)
+        if arr._trie_suffix() is not None:
+            self.assertEqual(work['copied'], other_size)
+            old = arr._data
+            new = arr.concat(other)._data
+            assert isinstance(old, PersistentVector)
+            assert isinstance(new, PersistentVector)
+            # Only the old tail is rewritten into the tree
+            self.assertLessEqual(
+                unshared_leaves(old, new),
+                (other_size + len(old._tail)) // WIDTH + 1)
+        elif backend == TUPLE_BACKEND:
+            self.assertEqual(work['allocations'], 1)
+
+    @given(sizes, sizes)
+    def test_intersection(self, size: int, other_size: int) -> None:
+        """Test intersection hashes or merges in O(n + m)."""
+        arr = counted(range(size))
+        other = counted(range(0, 2 * other_size, 2))
+        work = measure(lambda: arr.intersection(other))
+        # Indexing other hashes each of its elements up to three times
+        self.assertLessEqual(work['hash'], size + 3 * other_size)
+        self.assertLessEqual(work['eq'], size)
+        self.assertEqual(work['order'], 0)
+        ordered = arr.sort()
+        ordered_other = other.sort()
+        work = measure(lambda: ordered.intersection(ordered_other))
+        self.assertEqual(work['hash'], 0)
+        self.assertLessEqual(work['order'], size + other_size)
+        self.assertLessEqual(work['eq'], size)
+
+    @settings(max_examples=20)
+    @given(sizes, backends)
+    def test_bounds_scale_linearly(self, size: int, backend: str) -> None:
+        """Test doubling the input at most doubles the work."""
+        def work(length: int) -> int:
+            arr = counted(range(length), backend)
+            total = 0
+            for counts in (measure(lambda: arr.remove(Counted(-1))),
+                           measure(lambda: arr.concat(arr)),
+                           measure(lambda: arr.cons(Counted(0)))):
+                total += sum(counts.values())
+            return total
+
+        self.assertLessEqual(work(2 * size), 2 * work(size) + 8)
+
+
+class StressTest(unittest.TestCase):
+    """Run operations at sizes far beyond the recursion limit."""
+    def test_tuple_backend(self) -> None:
+        """Test updates and traversals on a large tuple array."""
+        items = list(range(STRESS_SIZE))
+        arr = DynamicArray.from_list(items)
+        self.assertEqual(arr.remove(STRESS_SIZE - 1).length(),
+                         STRESS_SIZE - 1)
+        self.assertEqual(arr.set(-1, -1).get(-1), -1)
+        grown = arr
+        for value in range(STRESS_SIZE):
+            grown = grown.cons(value)
+        self.assertEqual(grown.length(), 2 * STRESS_SIZE)
+        self.assertEqual(grown.get(0), STRESS_SIZE - 1)
+        self.assertEqual(arr.concat(arr).get(-1), STRESS_SIZE - 1)
+        self.assertEqual(hash(arr), hash(tuple(items)))
+        self.assertEqual(arr, DynamicArray.from_iterable(items))
+        self.assertEqual(arr.sort(reverse=True).reverse(), arr)
+        self.assertEqual(str(arr)[-8:], str(items)[-8:])
+
+    def test_trie_backend(self) -> None:
+        """Test deep tries and long chains of versions."""
+        arr = DynamicArray.from_iterable(range(STRESS_SIZE),
+                                         backend=TRIE_BACKEND)
+        version = arr
+        for index in range(0, STRESS_SIZE, 7):
+            version = version.set(index, -index)
+        self.assertEqual(version.get(7 * 3), -21)
+        self.assertEqual(arr.get(7 * 3), 21)
+        self.assertEqual(arr.concat(arr).length(), 2 * STRESS_SIZE)
+        self.assertEqual(arr.remove(0).get(0), 1)
+        self.assertEqual(version.to_list()[-1], STRESS_SIZE - 1)
+
+    def test_views_and_lazy(self) -> None:
+        """Test chains of views and lazy stages longer than the limit."""
+        depth = 2 * sys.getrecursionlimit()
+        arr = DynamicArray.from_iterable(range(STRESS_SIZE))
+        view = arr
+        for _ in range(depth):
+            view = view.drop(1)
+        self.assertEqual(view.get(0), depth)
+        query = arr.take(10).lazy()
+        for _ in range(depth):
+            query = query.map(increment)
+        self.assertEqual(query.to_list()[0], depth)
+        self.assertEqual(arr.lazy().map(increment).filter(is_negative)
+                         .to_list(), [])
+
+    def test_bulk_updates(self) -> None:
+        """Test bulk updates touching every element."""
+        arr = DynamicArray.from_iterable(range(STRESS_SIZE))
+        updates = {index: -index for index in range(0, STRESS_SIZE, 2)}
+        updated = arr.set_many(updates)
+        self.assertEqual(updated.get(2), -2)
+        self.assertEqual(updated.remove_all(predicate=is_negative).length(),
+                         STRESS_SIZE // 2 + 1)
+        self.assertEqual(arr.delete_range(1, STRESS_SIZE - 1).to_list(),
+                         [0, STRESS_SIZE - 1])
+
+
+def increment(value: int) -> int:
+    """Add one."""
+    return value + 1
+
+
+def is_negative(value: int) -> bool:
+    """Check sign."""
+    return value < 0
+
+
+if __name__ == '__main__':
+    unittest.main()
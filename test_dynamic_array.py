@@ -1,51 +1,202 @@
+import gc
+import operator
+import os
+import pickle
+import tempfile
 import unittest
-from typing import List
+from typing import (Any, Callable, Dict, Iterator, List, SupportsIndex,
+                    Tuple, Union)
+from unittest import mock
 
 from hypothesis import given, strategies as st
 
+import dynamic_array
+import instrumentation
+import typed_kernels
 from dynamic_array import DynamicArray
+from persistent_vector import PersistentVector
 
 
 class TestDynamicArray(unittest.TestCase):
     """Test functionality of the DynamicArray class."""
+    backend = 'tuple'
+
+    def from_list(self, items: List[Any]) -> DynamicArray:
+        """Create array under test from a list."""
+        return DynamicArray.from_list(items, backend=self.backend)
+
+    def empty(self, growth_factor: float = 2.0) -> DynamicArray:
+        """Create empty array under test."""
+        return DynamicArray.empty(growth_factor, backend=self.backend)
+
     def test_empty(self) -> None:
         """Test creating an empty array."""
-        arr = DynamicArray.empty()
+        arr = self.empty()
         self.assertEqual(arr.length(), 0)
         self.assertEqual(str(arr), "[]")
 
     def test_from_list(self) -> None:
         """Test creating array from a list."""
-        arr = DynamicArray.from_list([1, 2, 3])
+        arr = self.from_list([1, 2, 3])
         self.assertEqual(arr.length(), 3)
         self.assertEqual(str(arr), "[1, 2, 3]")
 
     def test_cons(self) -> None:
         """Test cons operation."""
-        arr = DynamicArray.empty()
+        arr = self.empty()
         arr = arr.cons(3).cons(2).cons(1)
         self.assertEqual(arr.length(), 3)
         self.assertEqual(str(arr), "[1, 2, 3]")
 
+    def test_cons_versions(self) -> None:
+        """Test cons on old versions leaves every version intact."""
+        base = self.from_list([1, 2, 3])
+        first = base.cons(0)
+        second = first.cons(-1)
+        branch = first.cons('x')
+        tail = second.drop(1).cons('y')
+        self.assertEqual(base.to_list(), [1, 2, 3])
+        self.assertEqual(first.to_list(), [0, 1, 2, 3])
+        self.assertEqual(second.to_list(), [-1, 0, 1, 2, 3])
+        self.assertEqual(branch.to_list(), ['x', 0, 1, 2, 3])
+        self.assertEqual(tail.to_list(), ['y', 0, 1, 2, 3])
+        self.assertEqual(second.cons(-2).to_list(), [-2, -1, 0, 1, 2, 3])
+
+    def test_cons_headroom(self) -> None:
+        """Test cons writes into the storage's head room."""
+        arr = self.empty()
+        for i in range(100000):
+            arr = arr.cons(i)
+        self.assertEqual(arr.to_list(), list(range(99999, -1, -1)))
+        longer = arr.cons('a')
+        self.assertEqual(longer._offset, arr._offset - 1)
+        if self.backend == 'tuple':
+            self.assertIs(longer._data, arr._data)
+            self.assertIsNot(arr.cons('b')._data, arr._data)
+        else:
+            # Tries write into a new version of the head room
+            self.assertEqual(len(longer._data), len(arr._data))
+            self.assertEqual(arr.cons('b')._offset, longer._offset)
+        self.assertEqual(longer.get(0), 'a')
+        self.assertEqual(arr.get(0), 99999)
+        self.assertEqual(longer.concat(arr).length(), 200001)
+        self.assertEqual(longer.set(1, 'c').to_list()[:3], ['a', 'c', 99998])
+        self.assertEqual(arr.to_list()[:2], [99999, 99998])
+
+    def test_cons_built_copies(self) -> None:
+        """Test updates to cons-built arrays copy the elements once."""
+        arr = self.empty()
+        for i in range(1000):
+            arr = arr.cons(i)
+        other = self.from_list(list(range(10)))
+        instrumentation.enable()
+        try:
+            updates: List[Tuple[Callable[[], DynamicArray], int]] = [
+                (lambda: arr.concat(other), 1010),
+                (lambda: arr.set(5, -1), 1000),
+                (lambda: arr.set_many({1: -1}), 1000)]
+            for update, bound in updates:
+                instrumentation.reset()
+                result = update()
+                self.assertLessEqual(instrumentation.stats().copied, bound)
+                self.assertEqual(result.length(), bound)
+        finally:
+            instrumentation.disable()
+            instrumentation.reset()
+        self.assertEqual(arr.set(5, -1).get(5), -1)
+        self.assertEqual(arr.set_many({1: -1}).to_list()[:3], [999, -1, 997])
+        self.assertEqual(arr.concat(other).get(-1), 9)
+
     def test_remove(self) -> None:
         """Test remove operation."""
-        arr = DynamicArray.from_list([1, 2, 3, 2])
+        arr = self.from_list([1, 2, 3, 2])
         arr = arr.remove(2)
         self.assertEqual(str(arr), "[1, 3, 2]")
         # Test removing non-existent element
         arr = arr.remove(4)
         self.assertEqual(str(arr), "[1, 3, 2]")
 
+    def test_set_many(self) -> None:
+        """Test setting several indices at once."""
+        arr = self.from_list(list(range(100)))
+        updated = arr.set_many({0: 'a', -1: 'z', 50: 'm'})
+        self.assertEqual(updated.get(0), 'a')
+        self.assertEqual(updated.get(50), 'm')
+        self.assertEqual(updated.get(99), 'z')
+        self.assertEqual(updated.get(1), 1)
+        self.assertEqual(arr.get(0), 0)
+        self.assertEqual(arr.set_many({}), arr)
+        with self.assertRaises(IndexError):
+            arr.set_many({100: 0})
+
+    def test_remove_all(self) -> None:
+        """Test removing every match of a value or predicate."""
+        arr = self.from_list([1, 2, 3, 2, None, 2])
+        self.assertEqual(arr.remove_all(2).to_list(), [1, 3, None])
+        self.assertEqual(arr.remove_all(None).to_list(), [1, 2, 3, 2, 2])
+        self.assertEqual(arr.remove_all(predicate=lambda x: x == 2)
+                         .to_list(), [1, 3, None])
+        with self.assertRaises(ValueError):
+            arr.remove_all()
+        with self.assertRaises(ValueError):
+            arr.remove_all(2, predicate=bool)
+
+    def test_insert_at(self) -> None:
+        """Test inserting several elements at an index."""
+        arr = self.from_list([1, 2, 3])
+        self.assertEqual(arr.insert_at(1, ['a', 'b']).to_list(),
+                         [1, 'a', 'b', 2, 3])
+        self.assertEqual(arr.insert_at(0, iter([0])).to_list(),
+                         [0, 1, 2, 3])
+        self.assertEqual(arr.insert_at(3, [4]).to_list(), [1, 2, 3, 4])
+        self.assertEqual(arr.insert_at(-1, [9]).to_list(), [1, 2, 9, 3])
+        with self.assertRaises(IndexError):
+            arr.insert_at(4, [0])
+        with self.assertRaises(IndexError):
+            arr.insert_at(-4, [0])
+
+    def test_delete_range(self) -> None:
+        """Test deleting a range of elements."""
+        arr = self.from_list([0, 1, 2, 3, 4])
+        self.assertEqual(arr.delete_range(1, 3).to_list(), [0, 3, 4])
+        self.assertEqual(arr.delete_range(0, 2).to_list(), [2, 3, 4])
+        self.assertEqual(arr.delete_range(-2, 10).to_list(), [0, 1, 2])
+        self.assertIs(arr.delete_range(3, 1), arr)
+        self.assertEqual(arr.length(), 5)
+
+    def test_apply_patch(self) -> None:
+        """Test applying several edits in one pass."""
+        arr = self.from_list(list(range(10)))
+        patched = arr.apply_patch([('set', 9, 'nine'),
+                                   ('delete', 2, 5),
+                                   ('insert', 0, ['a']),
+                                   ('insert', 2, ['b', 'c']),
+                                   ('insert', 0, ['d'])])
+        self.assertEqual(patched.to_list(),
+                         ['a', 'd', 0, 1, 'b', 'c', 5, 6, 7, 8, 'nine'])
+        self.assertEqual(arr.apply_patch([('set', 1, 'x')]).get(1), 'x')
+        self.assertEqual(arr.apply_patch([]), arr)
+        with self.assertRaises(ValueError):
+            arr.apply_patch([('delete', 2, 5), ('set', 4, 0)])
+        with self.assertRaises(ValueError):
+            arr.apply_patch([('delete', 2, 5), ('insert', 3, [0])])
+        with self.assertRaises(ValueError):
+            arr.apply_patch([('set', 1, 0), ('set', 1, 1)])
+        with self.assertRaises(ValueError):
+            arr.apply_patch([('append', 0, 0)])
+        with self.assertRaises(IndexError):
+            arr.apply_patch([('set', 10, 0)])
+
     def test_length(self) -> None:
         """Test length operation."""
-        arr = DynamicArray.from_list([1, 2, 3])
+        arr = self.from_list([1, 2, 3])
         self.assertEqual(arr.length(), 3)
         arr = arr.cons(0)
         self.assertEqual(arr.length(), 4)
 
     def test_member(self) -> None:
         """Test member operation."""
-        arr = DynamicArray.from_list([1, 2, 3])
+        arr = self.from_list([1, 2, 3])
         self.assertTrue(arr.member(1))
         self.assertTrue(arr.member(2))
         self.assertTrue(arr.member(3))
@@ -53,7 +204,7 @@ class TestDynamicArray(unittest.TestCase):
 
     def test_reverse(self) -> None:
         """Test reverse operation."""
-        arr = DynamicArray.from_list([1, 2, 3])
+        arr = self.from_list([1, 2, 3])
         reversed_arr = arr.reverse()
         self.assertEqual(str(reversed_arr), "[3, 2, 1]")
         # Original array remains unchanged
@@ -61,12 +212,12 @@ class TestDynamicArray(unittest.TestCase):
 
     def test_to_list(self) -> None:
         """Test to_list operation."""
-        arr = DynamicArray.from_list([1, 2, 3])
+        arr = self.from_list([1, 2, 3])
         self.assertEqual(arr.to_list(), [1, 2, 3])
 
     def test_get(self) -> None:
         """Test get operation."""
-        arr = DynamicArray.from_list([1, 2, 3])
+        arr = self.from_list([1, 2, 3])
         self.assertEqual(arr.get(0), 1)
         self.assertEqual(arr.get(1), 2)
         self.assertEqual(arr.get(2), 3)
@@ -82,7 +233,7 @@ class TestDynamicArray(unittest.TestCase):
 
     def test_set(self) -> None:
         """Test set operation."""
-        arr = DynamicArray.from_list([1, 2, 3])
+        arr = self.from_list([1, 2, 3])
         new_arr = arr.set(1, 5)
         # New array is updated
         self.assertEqual(str(new_arr), "[1, 5, 3]")
@@ -99,7 +250,7 @@ class TestDynamicArray(unittest.TestCase):
 
     def test_filter(self) -> None:
         """Test filter operation."""
-        arr = DynamicArray.from_list([1, 2, 3, 4, 5])
+        arr = self.from_list([1, 2, 3, 4, 5])
         filtered = arr.filter(lambda x: x % 2 == 0)
         self.assertEqual(str(filtered), "[2, 4]")
         # Original array remains unchanged
@@ -107,7 +258,7 @@ class TestDynamicArray(unittest.TestCase):
 
     def test_map(self) -> None:
         """Test map operation."""
-        arr = DynamicArray.from_list([1, 2, 3])
+        arr = self.from_list([1, 2, 3])
         mapped = arr.map(lambda x: x * 2)
         self.assertEqual(str(mapped), "[2, 4, 6]")
         # Original array remains unchanged
@@ -115,7 +266,7 @@ class TestDynamicArray(unittest.TestCase):
 
     def test_reduce(self) -> None:
         """Test reduce operation."""
-        arr = DynamicArray.from_list([1, 2, 3, 4])
+        arr = self.from_list([1, 2, 3, 4])
         sum_result = arr.reduce(lambda acc, x: acc + x, 0)
         self.assertEqual(sum_result, 10)
         product_result = arr.reduce(lambda acc, x: acc * x, 1)
@@ -123,7 +274,7 @@ class TestDynamicArray(unittest.TestCase):
 
     def test_iterator(self) -> None:
         """Test iterator operation."""
-        arr = DynamicArray.from_list([1, 2, 3])
+        arr = self.from_list([1, 2, 3])
         iterator = arr.iterator()
         self.assertEqual(next(iterator), 1)
         self.assertEqual(next(iterator), 2)
@@ -133,18 +284,268 @@ class TestDynamicArray(unittest.TestCase):
 
     def test_intersection(self) -> None:
         """Test intersection operation."""
-        arr1 = DynamicArray.from_list([1, 2, 3, 4])
-        arr2 = DynamicArray.from_list([3, 4, 5, 6])
+        arr1 = self.from_list([1, 2, 3, 4])
+        arr2 = self.from_list([3, 4, 5, 6])
         intersection = arr1.intersection(arr2)
         self.assertEqual(str(intersection), "[3, 4]")
         # Original arrays remain unchanged
         self.assertEqual(str(arr1), "[1, 2, 3, 4]")
         self.assertEqual(str(arr2), "[3, 4, 5, 6]")
 
+    def test_indexed_lookups(self) -> None:
+        """Test member, count and index_of with and without an index."""
+        plain = self.from_list([1, [2], 3, 1, None, [2]])
+        arr = plain.indexed()
+        for candidate in (plain, arr):
+            self.assertTrue(candidate.member(1))
+            self.assertTrue(candidate.member([2]))
+            self.assertTrue(candidate.member(None))
+            self.assertFalse(candidate.member(4))
+            self.assertEqual(candidate.count(1), 2)
+            self.assertEqual(candidate.count([2]), 2)
+            self.assertEqual(candidate.count(4), 0)
+            self.assertEqual(candidate.index_of(3), 2)
+            self.assertEqual(candidate.index_of([2]), 1)
+            with self.assertRaises(ValueError):
+                candidate.index_of(4)
+        # Index is built lazily and cached
+        self.assertIsNotNone(arr._index)
+        self.assertIsNone(plain._index)
+        self.assertEqual(arr, plain)
+        self.assertEqual(arr.remove(1).to_list(), [[2], 3, 1, None, [2]])
+
+    def test_difference(self) -> None:
+        """Test difference operation."""
+        arr1 = self.from_list([1, 2, 3, 4, 2])
+        arr2 = self.from_list([2, 4, 6])
+        self.assertEqual(arr1.difference(arr2).to_list(), [1, 3])
+        self.assertEqual(arr2.difference(arr1).to_list(), [6])
+        self.assertEqual(arr1.difference(self.empty()), arr1)
+
+    def test_union(self) -> None:
+        """Test union operation."""
+        arr1 = self.from_list([1, 2, 3])
+        arr2 = self.from_list([3, 4, 1, 5])
+        self.assertEqual(arr1.union(arr2).to_list(), [1, 2, 3, 4, 5])
+        self.assertEqual(self.empty().union(arr1), arr1)
+
+    def test_sort(self) -> None:
+        """Test stable sorting with key and reverse."""
+        arr = self.from_list([3, 1, 2, 1])
+        self.assertFalse(arr.is_sorted())
+        ordered = arr.sort()
+        self.assertEqual(ordered.to_list(), [1, 1, 2, 3])
+        self.assertTrue(ordered.is_sorted())
+        self.assertIs(ordered.sort(), ordered)
+        self.assertEqual(arr.sort(reverse=True).to_list(), [3, 2, 1, 1])
+        words = self.from_list(['bb', 'a', 'cc', 'd'])
+        self.assertEqual(words.sort(key=len).to_list(),
+                         ['a', 'd', 'bb', 'cc'])
+        self.assertEqual(arr.to_list(), [3, 1, 2, 1])
+
+    def test_bisect(self) -> None:
+        """Test binary search on sorted arrays."""
+        arr = self.from_list([5, 1, 3, 3, 7]).sort()
+        self.assertEqual(arr.bisect(3), 1)
+        self.assertEqual(arr.bisect(3, right=True), 3)
+        self.assertEqual(arr.bisect(0), 0)
+        self.assertEqual(arr.bisect(9), 5)
+        self.assertTrue(arr.contains_sorted(7))
+        self.assertFalse(arr.contains_sorted(4))
+        descending = arr.sort(reverse=True)
+        self.assertEqual(descending.bisect(3), 2)
+        self.assertEqual(descending.bisect(3, right=True), 4)
+        self.assertTrue(descending.contains_sorted(1))
+        words = self.from_list(['ccc', 'a', 'bb', 'dd']).sort(key=len)
+        self.assertEqual(words.bisect('xx'), 1)
+        self.assertTrue(words.contains_sorted('dd'))
+        self.assertFalse(words.contains_sorted('xx'))
+        with self.assertRaises(ValueError):
+            self.from_list([1, 2]).bisect(1)
+        with self.assertRaises(ValueError):
+            self.from_list([1, 2]).contains_sorted(1)
+
+    def test_sorted_flag(self) -> None:
+        """Test which operations keep the sorted flag."""
+        arr = self.from_list(list(range(10, 0, -1))).sort()
+        kept = [arr.filter(lambda x: x % 2 == 0), arr[2:8:2], arr.take(3),
+                arr.drop(3), arr.split_at(4)[1], arr.remove(5),
+                arr.compact(), arr.indexed(), arr.intersection(arr),
+                arr.difference(arr.take(2))]
+        for result in kept:
+            self.assertTrue(result.is_sorted())
+            self.assertEqual(result.to_list(), sorted(result.to_list()))
+        self.assertEqual(arr.reverse().bisect(4), 6)
+        self.assertEqual(arr[::-2].bisect(4), 3)
+        dropped = [arr.map(lambda x: x), arr.cons(0), arr.set(0, 1),
+                   arr.concat(arr)]
+        for result in dropped:
+            self.assertFalse(result.is_sorted())
+
+    def test_sorted_set_operations(self) -> None:
+        """Test merge-based set operations on sorted arrays."""
+        arr1 = self.from_list([4, 2, 2, 1, 3]).sort()
+        arr2 = self.from_list([2, 4, 6, 4]).sort()
+        self.assertEqual(arr1.intersection(arr2).to_list(), [2, 2, 4])
+        self.assertEqual(arr1.difference(arr2).to_list(), [1, 3])
+        self.assertEqual(arr2.difference(arr1).to_list(), [6])
+        self.assertEqual(arr1.union(arr2).to_list(), [1, 2, 2, 3, 4, 6])
+        down1 = arr1.sort(reverse=True)
+        down2 = arr2.sort(reverse=True)
+        self.assertEqual(down1.intersection(down2).to_list(), [4, 2, 2])
+        self.assertEqual(down1.difference(down2).to_list(), [3, 1])
+        self.assertEqual(arr1.intersection(down2).to_list(), [2, 2, 4])
+
+    def test_slice(self) -> None:
+        """Test slicing returns views with Python slice semantics."""
+        items = list(range(10))
+        arr = self.from_list(items)
+        for start, stop, step in [(2, 7, None), (None, None, -1),
+                                  (-3, None, None), (8, 1, -3),
+                                  (1, None, 2), (5, 2, None),
+                                  (-100, 100, 4)]:
+            view = arr.slice(start, stop, step)
+            self.assertEqual(view.to_list(), items[start:stop:step])
+            self.assertEqual(arr[start:stop:step], view)
+        view = arr[1:9:2][::-1]
+        self.assertEqual(view.to_list(), [7, 5, 3, 1])
+        self.assertEqual(len(view), 4)
+        self.assertEqual(view[0], 7)
+        self.assertEqual(view[-1], 1)
+        with self.assertRaises(IndexError):
+            view[4]
+        with self.assertRaises(ValueError):
+            arr.slice(step=0)
+        # Original array remains unchanged
+        self.assertEqual(arr.to_list(), items)
+
+    def test_from_iterable(self) -> None:
+        """Test single-pass construction from a generator."""
+        arr = DynamicArray.from_iterable((i * i for i in range(100)),
+                                         size_hint=500,
+                                         backend=self.backend)
+        self.assertEqual(arr.to_list(), [i * i for i in range(100)])
+        self.assertEqual(arr._capacity, 500)
+        self.assertEqual(arr.backend(), self.backend)
+        self.assertEqual(DynamicArray.from_iterable(iter([])).length(), 0)
+
+    def test_files(self) -> None:
+        """Test streaming to and from line and record files."""
+        arr = self.from_list([3, 1, 2])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'data.txt')
+            self.assertEqual(arr.to_file(path), 3)
+            loaded = DynamicArray.from_file(path, int, backend=self.backend)
+            self.assertEqual(loaded, arr)
+            self.assertEqual(DynamicArray.from_file(path).to_list(),
+                             ['3', '1', '2'])
+            mixed = self.from_list([1, 'a', None, (2, 3)])
+            mixed.to_file(path, records=True)
+            self.assertEqual(DynamicArray.from_file(path, records=True),
+                             mixed)
+            with self.assertRaises(ValueError):
+                self.from_list(['a\nb']).to_file(path)
+
+    def test_mmap(self) -> None:
+        """Test operations on an array mapped from a binary file."""
+        arr = self.from_list([5, 'a', None, (1, 2)])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'data.bin')
+            self.assertEqual(arr.save(path), 4)
+            mapped = DynamicArray.open_mmap(path)
+            self.assertEqual(mapped.backend(), 'mmap')
+            self.assertEqual(mapped, arr)
+            self.assertEqual(mapped.get(-1), (1, 2))
+            self.assertEqual(list(mapped), [5, 'a', None, (1, 2)])
+            view = mapped[1:3]
+            self.assertIs(view._data, mapped._data)
+            self.assertEqual(view.to_list(), ['a', None])
+            self.assertEqual(mapped.reduce(lambda acc, _: acc + 1, 0), 4)
+            self.assertEqual(mapped.set(0, 6).to_list(),
+                             [6, 'a', None, (1, 2)])
+            self.assertEqual(mapped.cons(0).get(0), 0)
+            self.assertEqual(mapped.concat(arr).length(), 8)
+            self.assertEqual(view.compact().to_list(), ['a', None])
+            self.assertEqual(hash(mapped), hash(arr))
+            built = mapped.transient().append(7).freeze()
+            self.assertEqual(built.backend(), 'tuple')
+
+    def test_shared(self) -> None:
+        """Test operations on an array attached to shared memory."""
+        arr = self.from_list([5, 'a', None, (1, 2)])
+        with arr.to_shared() as handle:
+            self.assertEqual(handle.length, 4)
+            attached = DynamicArray.attach(handle)
+            self.assertEqual(attached.backend(), 'shared')
+            self.assertEqual(attached, arr)
+            self.assertEqual(attached[::-2].to_list(), [(1, 2), 'a'])
+            self.assertEqual(attached.set(1, 'b').get(1), 'b')
+            self.assertEqual(attached.cons(0).length(), 5)
+            self.assertEqual(attached.filter(lambda x: x is None).length(),
+                             1)
+            del attached
+
+    def test_iter_chunks(self) -> None:
+        """Test chunks are bounded views covering every element."""
+        arr = self.from_list(list(range(10)))
+        chunks = list(arr.iter_chunks(4))
+        self.assertEqual([chunk.to_list() for chunk in chunks],
+                         [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]])
+        self.assertIs(chunks[0]._data, arr._data)
+        self.assertEqual(list(self.empty().iter_chunks(3)), [])
+        with self.assertRaises(ValueError):
+            list(arr.iter_chunks(0))
+
+    def test_take_drop_split_at(self) -> None:
+        """Test take, drop and split_at views."""
+        arr = self.from_list([1, 2, 3, 4, 5])
+        self.assertEqual(arr.take(2).to_list(), [1, 2])
+        self.assertEqual(arr.take(9).to_list(), [1, 2, 3, 4, 5])
+        self.assertEqual(arr.drop(2).to_list(), [3, 4, 5])
+        self.assertEqual(arr.drop(9).to_list(), [])
+        left, right = arr.split_at(-2)
+        self.assertEqual(left.to_list(), [1, 2, 3])
+        self.assertEqual(right.to_list(), [4, 5])
+        with self.assertRaises(ValueError):
+            arr.take(-1)
+        with self.assertRaises(ValueError):
+            arr.drop(-1)
+
+    def test_view_operations(self) -> None:
+        """Test every operation on a strided view."""
+        parent = self.from_list(list(range(20)))
+        view = parent[3:15:3]
+        self.assertEqual(view.to_list(), [3, 6, 9, 12])
+        self.assertEqual(view.cons(0).to_list(), [0, 3, 6, 9, 12])
+        self.assertEqual(view.set(1, -1).to_list(), [3, -1, 9, 12])
+        self.assertEqual(view.remove(9).to_list(), [3, 6, 12])
+        self.assertEqual(view.reverse().to_list(), [12, 9, 6, 3])
+        self.assertEqual(view.map(lambda x: x + 1).to_list(),
+                         [4, 7, 10, 13])
+        self.assertEqual(view.filter(lambda x: x > 5).to_list(), [6, 9, 12])
+        self.assertEqual(view.reduce(lambda acc, x: acc + x, 0), 30)
+        self.assertTrue(view.member(12))
+        self.assertFalse(view.member(4))
+        self.assertEqual(view.indexed().index_of(9), 2)
+        self.assertEqual(view.concat(view).to_list(),
+                         [3, 6, 9, 12, 3, 6, 9, 12])
+        self.assertEqual(parent.take(3).concat(view).to_list(),
+                         [0, 1, 2, 3, 6, 9, 12])
+        self.assertEqual(view.intersection(parent).to_list(),
+                         [3, 6, 9, 12])
+        self.assertEqual(parent.take(7).difference(view).to_list(),
+                         [0, 1, 2, 4, 5])
+        self.assertEqual(view.lazy().map(str).to_list(),
+                         ['3', '6', '9', '12'])
+        self.assertEqual(str(view), "[3, 6, 9, 12]")
+        self.assertEqual(list(view), [3, 6, 9, 12])
+        self.assertEqual(view.transient().freeze(), view)
+        self.assertEqual(parent.to_list(), list(range(20)))
+
     def test_concat(self) -> None:
         """Test concat operation."""
-        arr1 = DynamicArray.from_list([1, 2])
-        arr2 = DynamicArray.from_list([3, 4])
+        arr1 = self.from_list([1, 2])
+        arr2 = self.from_list([3, 4])
         concatenated = arr1.concat(arr2)
         self.assertEqual(str(concatenated), "[1, 2, 3, 4]")
         # Original arrays remain unchanged
@@ -153,21 +554,75 @@ class TestDynamicArray(unittest.TestCase):
 
     def test_eq(self) -> None:
         """Test __eq__ operation."""
-        arr1 = DynamicArray.from_list([1, 2, 3])
-        arr2 = DynamicArray.from_list([1, 2, 3])
-        arr3 = DynamicArray.from_list([1, 2, 4])
+        arr1 = self.from_list([1, 2, 3])
+        arr2 = self.from_list([1, 2, 3])
+        arr3 = self.from_list([1, 2, 4])
         self.assertEqual(arr1, arr2)
         self.assertNotEqual(arr1, arr3)
         self.assertNotEqual(arr1, "not an array")
 
+    def test_hash(self) -> None:
+        """Test hashing is cached and consistent with equality."""
+        arr = self.from_list([1, 2, 3])
+        self.assertEqual(hash(arr), hash((1, 2, 3)))
+        self.assertEqual(arr._hash, hash((1, 2, 3)))
+        self.assertEqual(hash(arr.map(lambda x: x)), hash(arr))
+        self.assertEqual({arr: 'a'}[self.from_list([1, 2, 3])], 'a')
+        self.assertEqual(len({arr, arr.reverse().reverse(),
+                              self.from_list([3, 2, 1])}), 2)
+        with self.assertRaises(TypeError):
+            hash(self.from_list([[1]]))
+
+    def test_eq_short_circuits(self) -> None:
+        """Test equality skips element comparisons when it can."""
+        compared: List[int] = []
+
+        class Item:
+            """Element recording every equality comparison."""
+            def __init__(self, value: int) -> None:
+                self.value = value
+
+            def __eq__(self, other: object) -> bool:
+                compared.append(self.value)
+                return isinstance(other, Item) and self.value == other.value
+
+            def __ne__(self, other: object) -> bool:
+                return not self == other
+
+            def __hash__(self) -> int:
+                return self.value
+
+        arr = self.from_list([Item(1), Item(2)])
+        self.assertEqual(arr, arr)
+        self.assertEqual(arr, arr.indexed())
+        self.assertEqual(compared, [])
+        other = self.from_list([Item(1), Item(3)])
+        hash(arr)
+        hash(other)
+        self.assertNotEqual(arr, other)
+        self.assertEqual(compared, [])
+        self.assertEqual(arr, self.from_list([Item(1), Item(2)]))
+        self.assertEqual(compared, [1, 2])
+
+    def test_intern(self) -> None:
+        """Test interning returns one canonical instance per content."""
+        first = self.from_list([1, 2, 3]).intern()
+        second = self.from_list([1, 2, 3]).intern()
+        self.assertIs(first, second)
+        self.assertIsNot(self.from_list([1, 2]).intern(), first)
+        key = hash(first)
+        del first, second
+        gc.collect()
+        self.assertNotIn(key, dynamic_array._INTERNED._buckets)
+
     def test_str(self) -> None:
         """Test __str__ operation."""
-        arr = DynamicArray.from_list([1, None, 3])
+        arr = self.from_list([1, None, 3])
         self.assertEqual(str(arr), "[1, None, 3]")
 
     def test_iter(self) -> None:
         """Test __iter__ operation."""
-        arr = DynamicArray.from_list([1, 2, 3])
+        arr = self.from_list([1, 2, 3])
         items = []
         for item in arr:
             items.append(item)
@@ -175,7 +630,7 @@ class TestDynamicArray(unittest.TestCase):
 
     def test_none_values(self) -> None:
         """Test handling of None values."""
-        arr = DynamicArray.from_list([None, 1, None, 3])
+        arr = self.from_list([None, 1, None, 3])
         self.assertEqual(arr.length(), 4)
         self.assertEqual(str(arr), "[None, 1, None, 3]")
         # Test membership check for None
@@ -186,7 +641,7 @@ class TestDynamicArray(unittest.TestCase):
 
     def test_empty_operations(self) -> None:
         """Test operations on empty arrays."""
-        empty_arr = DynamicArray.empty()
+        empty_arr = self.empty()
         # Test basic operations on empty array
         self.assertEqual(empty_arr.length(), 0)
         self.assertFalse(empty_arr.member(1))
@@ -199,26 +654,57 @@ class TestDynamicArray(unittest.TestCase):
         # Test reduce on empty array
         self.assertEqual(empty_arr.reduce(lambda acc, x: acc + x, 0), 0)
         # Test concat with empty array
-        arr = DynamicArray.from_list([1, 2])
+        arr = self.from_list([1, 2])
         self.assertEqual(empty_arr.concat(arr).to_list(), [1, 2])
         self.assertEqual(arr.concat(empty_arr).to_list(), [1, 2])
 
     def test_growth_factor_one(self) -> None:
         """Test resizing behavior when growth_factor=1."""
-        arr = DynamicArray.empty(growth_factor=1.0)
+        arr = self.empty(growth_factor=1.0)
         # Add elements sequentially to observe resizing
         for i in range(5):
             arr = arr.cons(i)
         self.assertEqual(arr.length(), 5)
         self.assertEqual(arr.to_list(), [4, 3, 2, 1, 0])
 
+    def test_capacity_is_logical(self) -> None:
+        """Test storage holds only elements, whatever the capacity."""
+        arr = self.from_list(list(range(1000)))
+        small = arr.filter(lambda x: x < 10)
+        self.assertEqual(small.to_list(), list(range(10)))
+        self.assertGreaterEqual(small._capacity, 1000)
+        self.assertEqual(len(small._data), 10)
+        grown = self.empty()
+        for i in range(33):
+            grown = grown.cons(i)
+        self.assertEqual(len(grown.compact()._data), 33)
+        self.assertEqual(len(arr.concat(small).compact()._data), 1010)
+        self.assertFalse(hasattr(arr, '__dict__'))
+
+    def test_large_arrays(self) -> None:
+        """Test traversal methods far beyond the recursion limit."""
+        size = 50000
+        arr = self.from_list(list(range(size)))
+        self.assertEqual(arr.map(lambda x: x * 2).get(-1), 2 * (size - 1))
+        self.assertEqual(arr.filter(lambda x: x % 2 == 0).length(),
+                         size // 2)
+        self.assertEqual(arr.reduce(lambda acc, x: acc + x, 0),
+                         size * (size - 1) // 2)
+        self.assertEqual(arr.reverse().get(0), size - 1)
+        self.assertEqual(arr.set(size - 1, -1).get(-1), -1)
+        self.assertEqual(arr.remove(0).get(0), 1)
+        self.assertTrue(arr.member(size - 1))
+        self.assertEqual(arr, self.from_list(list(range(size))))
+        small = self.from_list([3, size - 1, size])
+        self.assertEqual(small.intersection(arr).to_list(), [3, size - 1])
+
     def test_api(self) -> None:
         """User-provided API test."""
         # Create empty array
-        empty_array = DynamicArray.empty()
+        empty_array = self.empty()
         self.assertEqual(empty_array.length(), 0)
         # Create array from list
-        array_from_list = DynamicArray.from_list([1, 2, 3])
+        array_from_list = self.from_list([1, 2, 3])
         self.assertEqual(array_from_list.length(), 3)
         # Add element
         new_array = array_from_list.cons(0)
@@ -247,8 +733,8 @@ class TestDynamicArray(unittest.TestCase):
         sum_result = array_from_list.reduce(lambda acc, x: acc + x, 0)
         self.assertEqual(sum_result, 6)
         # Array intersection
-        array1 = DynamicArray.from_list([1, 2, 3])
-        array2 = DynamicArray.from_list([2, 3, 4])
+        array1 = self.from_list([1, 2, 3])
+        array2 = self.from_list([2, 3, 4])
         intersection_array = array1.intersection(array2)
         self.assertEqual(intersection_array.to_list(), [2, 3])
         # Array concatenation
@@ -256,6 +742,487 @@ class TestDynamicArray(unittest.TestCase):
         self.assertEqual(concatenated_array.to_list(), [1, 2, 3, 2, 3, 4])
 
 
+class TestDynamicArrayTrie(TestDynamicArray):
+    """Run the DynamicArray tests against the trie backend."""
+    backend = 'trie'
+
+    def test_backend(self) -> None:
+        """Test backend selection and propagation."""
+        arr = self.from_list([1, 2, 3])
+        self.assertEqual(arr.backend(), 'trie')
+        self.assertEqual(arr.map(lambda x: x + 1).backend(), 'trie')
+        self.assertEqual(arr.cons(0).backend(), 'trie')
+        self.assertEqual(DynamicArray.from_list([1]).backend(), 'tuple')
+        with self.assertRaises(ValueError):
+            DynamicArray.from_list([1], backend='heap')
+
+    def test_large(self) -> None:
+        """Test set and concat beyond a single trie leaf."""
+        items = list(range(2000))
+        arr = self.from_list(items)
+        updated = arr.set(1500, -1).set(-1, -2)
+        items[1500] = -1
+        items[-1] = -2
+        self.assertEqual(updated.to_list(), items)
+        self.assertEqual(arr.get(1500), 1500)
+        extra = DynamicArray.from_list(list(range(100)))
+        self.assertEqual(arr.concat(extra).to_list(),
+                         list(range(2000)) + list(range(100)))
+
+
+class TestDynamicArrayView(TestDynamicArray):
+    """Run the DynamicArray tests against reversed strided views."""
+    def from_list(self, items: List[Any]) -> DynamicArray:
+        """Create a view over a larger, reversed parent."""
+        parent = DynamicArray.from_list(['x'] + items[::-1] + ['x'],
+                                        backend=self.backend)
+        return parent.slice(len(items), 0, -1)
+
+    def empty(self, growth_factor: float = 2.0) -> DynamicArray:
+        """Create an empty view over a non-empty parent."""
+        parent = DynamicArray.from_list(['x'], growth_factor,
+                                        backend=self.backend)
+        return parent.slice(1)
+
+    def test_view_shares_storage(self) -> None:
+        """Test views reference the parent's storage."""
+        arr = self.from_list([1, 2, 3])
+        self.assertEqual(arr.length(), 3)
+        self.assertIsNot(arr.compact()._data, arr._data)
+        self.assertEqual(arr.compact(), arr)
+
+
+class TestDynamicArrayTrieView(TestDynamicArrayView):
+    """Run the DynamicArray tests against views of a trie."""
+    backend = 'trie'
+
+
+class TestDynamicArrayTyped(unittest.TestCase):
+    """Test the typed numeric backend."""
+    def test_from_list(self) -> None:
+        """Test creating typed arrays."""
+        arr = DynamicArray.from_list([1.0, 2.5], dtype='f8')
+        self.assertEqual(arr.backend(), 'typed')
+        self.assertEqual(arr.dtype(), 'f8')
+        self.assertEqual(str(arr), "[1.0, 2.5]")
+        self.assertIsNone(DynamicArray.from_list([1]).dtype())
+        self.assertEqual(DynamicArray.empty(dtype='i4').length(), 0)
+        with self.assertRaises(ValueError):
+            DynamicArray.from_list([1], dtype='c16')
+        with self.assertRaises(ValueError):
+            DynamicArray.from_list([1], backend='trie', dtype='i4')
+        with self.assertRaises(ValueError):
+            DynamicArray.from_list([1], backend='typed')
+        with self.assertRaises(TypeError):
+            DynamicArray.from_list(['a'], dtype='i4')
+
+    def test_kernels(self) -> None:
+        """Test recognised operations stay typed."""
+        arr = DynamicArray.from_list([1.0, -2.0, 3.0], dtype='f8')
+        mapped = arr.map(typed_kernels.mul(2))
+        self.assertEqual(mapped.to_list(), [2.0, -4.0, 6.0])
+        self.assertEqual(mapped.dtype(), 'f8')
+        kept = arr.filter(typed_kernels.gt(0))
+        self.assertEqual(kept.to_list(), [1.0, 3.0])
+        self.assertEqual(kept.dtype(), 'f8')
+        self.assertEqual(arr.reduce(operator.add, 0.0), 2.0)
+        self.assertEqual(arr.reduce(max, 0.0), 3.0)
+
+    def test_generic_fallback(self) -> None:
+        """Test arbitrary callables and foreign values."""
+        arr = DynamicArray.from_list([1, 2, 3], dtype='i2')
+        self.assertEqual(arr.map(lambda x: x * 2).dtype(), 'i2')
+        as_str = arr.map(str)
+        self.assertEqual(as_str.to_list(), ['1', '2', '3'])
+        self.assertEqual(as_str.backend(), 'tuple')
+        self.assertEqual(arr.map(lambda x: x * 100000).backend(), 'tuple')
+        self.assertEqual(arr.filter(lambda x: x > 1).to_list(), [2, 3])
+        self.assertEqual(arr.reduce(lambda acc, x: acc * x, 1), 6)
+        self.assertEqual(arr.set(0, 'a').to_list(), ['a', 2, 3])
+        self.assertEqual(arr.set(0, 9).dtype(), 'i2')
+        self.assertEqual(arr.cons(None).to_list(), [None, 1, 2, 3])
+        self.assertEqual(arr.cons(0).cons(-1).dtype(), 'i2')
+        self.assertEqual(arr.concat(arr).dtype(), 'i2')
+        self.assertEqual(arr.concat(DynamicArray.from_list([4])).dtype(),
+                         'i2')
+        self.assertEqual(arr.concat(DynamicArray.from_list([4.0])).backend(),
+                         'tuple')
+        self.assertEqual(arr.reverse().to_list(), [3, 2, 1])
+        self.assertEqual(arr.remove(2).dtype(), 'i2')
+        self.assertEqual(arr, DynamicArray.from_list([1, 2, 3]))
+
+    def test_mmap(self) -> None:
+        """Test typed arrays mapped from a binary file."""
+        arr = DynamicArray.from_list([1.0, -2.0, 3.0], dtype='f8')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'data.bin')
+            arr.save(path)
+            mapped = DynamicArray.open_mmap(path)
+            self.assertEqual(mapped.backend(), 'mmap')
+            self.assertEqual(mapped.dtype(), 'f8')
+            self.assertEqual(mapped, arr)
+            doubled = mapped.map(typed_kernels.mul(2))
+            self.assertEqual(doubled.backend(), 'typed')
+            self.assertEqual(doubled.to_list(), [2.0, -4.0, 6.0])
+            self.assertEqual(mapped.filter(typed_kernels.gt(0)).dtype(),
+                             'f8')
+            self.assertEqual(mapped.reduce(operator.add, 0.0), 2.0)
+            self.assertEqual(mapped.set(1, 0.5).dtype(), 'f8')
+            built = mapped.transient().append(4.0).freeze()
+            self.assertEqual(built.dtype(), 'f8')
+            self.assertEqual(built.length(), 4)
+
+    def test_cons_headroom(self) -> None:
+        """Test typed cons writes into the buffer's head room."""
+        arr = DynamicArray.empty(dtype='i4')
+        for i in range(1000):
+            arr = arr.cons(i)
+        self.assertEqual(arr.dtype(), 'i4')
+        self.assertEqual(arr.to_list(), list(range(999, -1, -1)))
+        longer = arr.cons(-1)
+        self.assertIs(longer._data, arr._data)
+        branch = arr.cons(-2)
+        self.assertIsNot(branch._data, arr._data)
+        self.assertEqual((longer.get(0), branch.get(0)), (-1, -2))
+        self.assertEqual(arr.cons(2 ** 40).backend(), 'tuple')
+        self.assertEqual(arr.cons(1.5).get(0), 1.5)
+        self.assertEqual(arr.map(typed_kernels.add(1)).get(0), 1000)
+        restored = pickle.loads(pickle.dumps(longer))
+        self.assertEqual(restored, longer)
+        self.assertEqual(restored.cons(-3).to_list()[:2], [-3, -1])
+        self.assertEqual(longer.to_list()[:2], [-1, 999])
+
+    def test_kernels_read_in_place(self) -> None:
+        """Test kernels read mapped files and views without copying."""
+        arr = DynamicArray.from_list([float(i) for i in range(1000)],
+                                     dtype='f8')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'data.bin')
+            arr.save(path)
+            mapped = DynamicArray.open_mmap(path)
+            instrumentation.enable()
+            try:
+                for source in (mapped, mapped[::-3], arr[1:], arr[::2]):
+                    expected = source.to_list()
+                    instrumentation.reset()
+                    self.assertEqual(source.reduce(operator.add, 0.0),
+                                     sum(expected))
+                    self.assertEqual(source.reduce(max, -1.0),
+                                     max(expected))
+                    self.assertEqual(
+                        source.reduce(lambda acc, x: acc + 1, 0),
+                        len(expected))
+                    self.assertEqual(instrumentation.stats().copied, 0)
+                    kept = source.filter(typed_kernels.lt(10))
+                    self.assertEqual(kept.to_list(),
+                                     [x for x in expected if x < 10])
+                    self.assertEqual(instrumentation.stats().copied,
+                                     kept.length())
+                    doubled = source.map(typed_kernels.mul(2))
+                    self.assertEqual(doubled.to_list(),
+                                     [2 * x for x in expected])
+                    self.assertEqual(doubled.dtype(), 'f8')
+                    self.assertEqual(instrumentation.stats().copied,
+                                     kept.length() + len(expected))
+            finally:
+                instrumentation.disable()
+                instrumentation.reset()
+            del mapped
+
+    def test_shared(self) -> None:
+        """Test typed arrays attached to shared memory."""
+        arr = DynamicArray.from_list([1.0, -2.0, 3.0], dtype='f8')
+        with arr[::-1].to_shared() as handle:
+            attached = DynamicArray.attach(handle)
+            self.assertEqual(attached.dtype(), 'f8')
+            self.assertEqual(attached.to_list(), [3.0, -2.0, 1.0])
+            doubled = attached.map(typed_kernels.mul(2))
+            self.assertEqual(doubled.backend(), 'typed')
+            self.assertEqual(doubled.to_list(), [6.0, -4.0, 2.0])
+            del attached
+            # Temporary arrays close the block while kernels return
+            unraisable: List[Any] = []
+            with mock.patch('sys.unraisablehook', unraisable.append):
+                self.assertEqual(DynamicArray.attach(handle)
+                                 .reduce(operator.add, 0.0), 2.0)
+                self.assertEqual(DynamicArray.attach(handle)[::2]
+                                 .map(typed_kernels.add(1)).to_list(),
+                                 [4.0, 2.0])
+                gc.collect()
+            self.assertEqual(unraisable, [])
+
+    def test_views(self) -> None:
+        """Test typed views and compacting them."""
+        parent = DynamicArray.from_list([float(i) for i in range(10)],
+                                        dtype='f8')
+        view = parent[8:1:-2]
+        self.assertIs(view._data, parent._data)
+        self.assertEqual(view.to_list(), [8.0, 6.0, 4.0, 2.0])
+        self.assertEqual(view.map(typed_kernels.add(1)).to_list(),
+                         [9.0, 7.0, 5.0, 3.0])
+        self.assertEqual(view.filter(typed_kernels.lt(5)).to_list(),
+                         [4.0, 2.0])
+        self.assertEqual(view.reduce(operator.add, 0.0), 20.0)
+        self.assertEqual(view.concat(view).dtype(), 'f8')
+        self.assertEqual(view.cons(1.0).to_list(), [1.0, 8.0, 6.0, 4.0, 2.0])
+        compact = view.compact()
+        self.assertEqual(len(compact._data), 4)
+        self.assertEqual(compact, view)
+        self.assertIs(compact.compact(), compact)
+
+    def test_builder(self) -> None:
+        """Test building typed arrays."""
+        builder = DynamicArray.builder(dtype='f4')
+        builder.extend([1.0, 2.0])
+        arr = builder.freeze()
+        self.assertEqual(arr.dtype(), 'f4')
+        self.assertEqual(arr.transient().append(3.0).freeze().dtype(), 'f4')
+
+
+class TestArrayBuilder(unittest.TestCase):
+    """Test functionality of the ArrayBuilder class."""
+    def test_build(self) -> None:
+        """Test appending, prepending and freezing."""
+        builder = DynamicArray.builder()
+        builder.append(2).append(3).prepend(1).prepend(0)
+        builder.extend([4, 5])
+        self.assertEqual(builder.length(), 6)
+        self.assertEqual(builder.get(0), 0)
+        self.assertEqual(builder.get(-1), 5)
+        arr = builder.freeze()
+        self.assertEqual(arr.to_list(), [0, 1, 2, 3, 4, 5])
+        self.assertEqual(arr.cons(-1).to_list(), [-1, 0, 1, 2, 3, 4, 5])
+
+    def test_freeze_without_copy(self) -> None:
+        """Test freezing hands over the appended list."""
+        builder = DynamicArray.builder()
+        builder.extend(range(1000))
+        items = builder._back
+        arr = builder.freeze()
+        self.assertIs(arr._data, items)
+        self.assertEqual(arr.set(0, -1).get(0), -1)
+        self.assertEqual(arr.get(0), 0)
+        self.assertEqual(arr.concat(arr).length(), 2000)
+
+    def test_set_pop(self) -> None:
+        """Test set and pop across prepended and appended parts."""
+        builder = DynamicArray.builder()
+        builder.prepend(2).prepend(1).append(3)
+        builder.set(0, 10).set(-1, 30)
+        self.assertEqual(builder.pop(), 30)
+        self.assertEqual(builder.pop(), 2)
+        self.assertEqual(builder.pop(), 10)
+        with self.assertRaises(IndexError):
+            builder.pop()
+        with self.assertRaises(IndexError):
+            builder.set(0, 1)
+
+    def test_pop_after_prepends(self) -> None:
+        """Test popping prepended elements moves them over only once."""
+        builder = DynamicArray.builder()
+        for value in range(1000):
+            builder.prepend(value)
+        self.assertEqual(builder.pop(), 0)
+        self.assertEqual((len(builder._front), len(builder._back)),
+                         (0, 999))
+        builder.prepend(1000).append(-1)
+        self.assertEqual([builder.pop() for _ in range(3)], [-1, 1, 2])
+        self.assertEqual(builder.get(0), 1000)
+        self.assertEqual(builder.get(-1), 3)
+        self.assertEqual(builder.freeze().to_list(),
+                         [1000] + list(range(999, 2, -1)))
+
+    def test_frozen_guard(self) -> None:
+        """Test a frozen builder cannot be mutated."""
+        builder = DynamicArray.builder()
+        builder.append(1)
+        arr = builder.freeze()
+        for action in (lambda: builder.append(2),
+                       lambda: builder.prepend(0),
+                       lambda: builder.extend([2]),
+                       lambda: builder.set(0, 2),
+                       lambda: builder.pop(),
+                       lambda: builder.freeze()):
+            with self.assertRaises(RuntimeError):
+                action()
+        self.assertEqual(arr.to_list(), [1])
+
+    def test_failed_freeze(self) -> None:
+        """Test a value outside the dtype leaves the builder usable."""
+        builder = DynamicArray.builder(dtype='i1')
+        builder.append(1).append(1000).prepend(0)
+        with self.assertRaises(OverflowError):
+            builder.freeze()
+        self.assertEqual(builder.length(), 3)
+        self.assertEqual(builder.set(-1, 2).freeze().to_list(), [0, 1, 2])
+        builder = DynamicArray.builder(dtype='f8').append('x')
+        with self.assertRaises(TypeError):
+            builder.freeze()
+        self.assertEqual(builder.pop(), 'x')
+        self.assertEqual(builder.append(1.0).freeze().dtype(), 'f8')
+
+    def test_transient(self) -> None:
+        """Test building from an existing array."""
+        arr = DynamicArray.from_list([1, 2], backend='trie')
+        builder = arr.transient()
+        builder.append(3)
+        result = builder.freeze()
+        self.assertEqual(result.to_list(), [1, 2, 3])
+        self.assertEqual(result.backend(), 'trie')
+        self.assertEqual(arr.to_list(), [1, 2])
+        with self.assertRaises(ValueError):
+            DynamicArray.builder(backend='heap')
+
+
+class SortedSetOperationsTest(unittest.TestCase):
+    """Property-based tests for merge-based set operations."""
+    @given(st.lists(st.integers(0, 20)), st.lists(st.integers(0, 20)),
+           st.booleans(), st.sampled_from(['tuple', 'trie']))
+    def test_matches_hash_version(self, list_x: List[int],
+                                  list_y: List[int], reverse: bool,
+                                  backend: str) -> None:
+        """Test merging gives the same results as hashing."""
+        x = DynamicArray.from_list(list_x, backend=backend)
+        y = DynamicArray.from_list(list_y, backend=backend)
+        x = x.sort(reverse=reverse)
+        y = y.sort(reverse=reverse)
+        plain_x = DynamicArray.from_list(x.to_list())
+        self.assertEqual(x.intersection(y), plain_x.intersection(y))
+        self.assertEqual(x.difference(y), plain_x.difference(y))
+        self.assertEqual(x.union(y), plain_x.union(y))
+        for value in range(-1, 22):
+            self.assertEqual(x.contains_sorted(value), value in list_x)
+            position = x.bisect(value)
+            self.assertTrue(all(not (item < value if not reverse
+                                     else item > value)
+                                for item in x.to_list()[position:]))
+
+
+class BulkUpdatePropertyTest(unittest.TestCase):
+    """Property-based tests for bulk updates against list edits."""
+    @given(st.lists(st.integers(), min_size=1),
+           st.dictionaries(st.integers(0, 10 ** 6), st.integers()),
+           st.sampled_from(['tuple', 'trie']))
+    def test_set_many(self, items: List[int], updates: Dict[int, int],
+                      backend: str) -> None:
+        """Test set_many equals assigning each index."""
+        arr = DynamicArray.from_list(items, backend=backend)
+        expected = list(items)
+        resolved = {}
+        for index, value in updates.items():
+            expected[index % len(items)] = value
+            resolved[index % len(items)] = value
+        self.assertEqual(arr.set_many(resolved).to_list(), expected)
+
+    @given(st.lists(st.integers()), st.integers(0, 50), st.integers(0, 50),
+           st.lists(st.integers()))
+    def test_patch(self, items: List[int], start: int, size: int,
+                   inserted: List[int]) -> None:
+        """Test a delete and an insert behave like list edits."""
+        arr = DynamicArray.from_list(items)
+        start = min(start, len(items))
+        stop = min(start + size, len(items))
+        expected = items[:start] + inserted + items[stop:]
+        patched = arr.apply_patch([('delete', start, stop),
+                                   ('insert', start, inserted)])
+        self.assertEqual(patched.to_list(), expected)
+        self.assertEqual(arr.delete_range(start, stop)
+                         .insert_at(start, inserted).to_list(), expected)
+
+
+class CountingTuple(tuple):  # type: ignore[type-arg]
+    """Tuple storage counting the elements read from it."""
+    reads = 0
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate, counting every element."""
+        for item in super().__iter__():
+            CountingTuple.reads += 1
+            yield item
+
+    def __getitem__(self, key: Union[SupportsIndex, slice]) -> Any:
+        """Index or slice, counting the elements returned."""
+        result = super().__getitem__(key)
+        CountingTuple.reads += len(result) if isinstance(key, slice) else 1
+        return result
+
+
+class CountingVector(PersistentVector):
+    """Trie storage counting the leaves looked up."""
+    __slots__ = ()
+    leaves = 0
+
+    def _leaf_for(self, index: int) -> Any:
+        """Find a leaf, counting the lookup."""
+        CountingVector.leaves += 1
+        return super()._leaf_for(index)
+
+
+class ViewReadTest(unittest.TestCase):
+    """Test reading a view costs O(length), not O(offset + length)."""
+    def test_view_reads(self) -> None:
+        """Test views skip the storage before their offset."""
+        size = 100000
+        data = CountingTuple(range(size))
+        arr = DynamicArray(data, size, size)
+        CountingTuple.reads = 0
+        self.assertEqual(arr.drop(size - 10).to_list(),
+                         list(range(size - 10, size)))
+        self.assertEqual(arr[size - 5:size - 2].to_list(),
+                         [size - 5, size - 4, size - 3])
+        self.assertEqual(arr[size - 1:size - 21:-2].length(), 10)
+        self.assertLessEqual(CountingTuple.reads, 20)
+        # Early exits read a bounded number of elements
+        view = arr.drop(1)
+        CountingTuple.reads = 0
+        self.assertEqual(next(iter(view)), 1)
+        self.assertTrue(view.member(2))
+        self.assertEqual(view.index_of(3), 2)
+        self.assertEqual(view.lazy().first(), 1)
+        self.assertNotEqual(view, arr[:size - 1])
+        # The last comparison reads from both arrays
+        self.assertLessEqual(CountingTuple.reads,
+                             6 * dynamic_array._READ_CHUNK)
+        vec = PersistentVector.from_iterable(range(size))
+        trie = DynamicArray(CountingVector(vec._count, vec._shift,
+                                           vec._root, vec._tail),
+                            size, size)
+        CountingVector.leaves = 0
+        self.assertEqual(trie.drop(size - 40).to_list(),
+                         list(range(size - 40, size)))
+        self.assertEqual(trie[1000:1100].to_list(), list(range(1000, 1100)))
+        self.assertLessEqual(CountingVector.leaves, 2 + 5)
+
+    def test_iter_chunks_linear(self) -> None:
+        """Test iterating every chunk visits each element once."""
+        size = 50000
+        data = CountingTuple(range(size))
+        arr = DynamicArray(data, size, size)
+        CountingTuple.reads = 0
+        total = sum(sum(chunk) for chunk in arr.iter_chunks(1000))
+        self.assertEqual(total, size * (size - 1) // 2)
+        self.assertLessEqual(CountingTuple.reads, size)
+        vec = PersistentVector.from_iterable(range(size))
+        trie = DynamicArray(CountingVector(vec._count, vec._shift,
+                                           vec._root, vec._tail),
+                            size, size)
+        CountingVector.leaves = 0
+        self.assertEqual(sum(sum(chunk) for chunk in trie.iter_chunks(100)),
+                         total)
+        # One lookup per leaf, plus one per chunk straddling two leaves
+        self.assertLessEqual(CountingVector.leaves, size // 32 + size // 100)
+
+    @given(st.lists(st.integers(), max_size=3000), st.integers(0, 3000),
+           st.integers(0, 3000))
+    def test_iter_range(self, items: List[int], start: int,
+                        stop: int) -> None:
+        """Test trie ranges equal list slices."""
+        vec = PersistentVector.from_iterable(items)
+        start, stop = sorted((min(start, len(items)), min(stop, len(items))))
+        self.assertEqual(list(vec.iter_range(start, stop)),
+                         items[start:stop])
+
+
 class MonoidLawsTest(unittest.TestCase):
     """Test Monoid laws."""
     @given(st.lists(st.integers()),
@@ -275,6 +1242,20 @@ class MonoidLawsTest(unittest.TestCase):
         # Associativity: concat(concat(x, y), z) == concat(x, concat(y, z))
         self.assertEqual(x.concat(y).concat(z), x.concat(y.concat(z)))
 
+    @given(st.lists(st.integers()),
+           st.lists(st.integers()),
+           st.lists(st.integers()))
+    def test_monoid_laws_trie(self, list_x: List[int],
+                              list_y: List[int], list_z: List[int]) -> None:
+        """Test Monoid laws on the trie backend."""
+        x = DynamicArray.from_list(list_x, backend='trie')
+        y = DynamicArray.from_list(list_y, backend='trie')
+        z = DynamicArray.from_list(list_z, backend='trie')
+        empty = DynamicArray.empty(backend='trie')
+        self.assertEqual(empty.concat(x), x)
+        self.assertEqual(x.concat(empty), x)
+        self.assertEqual(x.concat(y).concat(z), x.concat(y.concat(z)))
+
 
 if __name__ == '__main__':
     unittest.main()
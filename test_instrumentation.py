@@ -0,0 +1,134 @@
+import asyncio
+import threading
+import time
+import unittest
+from typing import Any, List
+
+import instrumentation
+from dynamic_array import DynamicArray
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Test opt-in operation counters and hooks."""
+    def setUp(self) -> None:
+        """Start every test with fresh counters."""
+        instrumentation.reset()
+
+    def tearDown(self) -> None:
+        """Leave instrumentation disabled."""
+        instrumentation.disable()
+        instrumentation.reset()
+
+    def test_disabled(self) -> None:
+        """Test nothing is wrapped or counted while disabled."""
+        original = DynamicArray.map
+        DynamicArray.from_list([1, 2, 3]).map(str)
+        self.assertFalse(instrumentation.is_enabled())
+        self.assertEqual(instrumentation.stats(),
+                         instrumentation.Stats({}, {}, 0, 0, 0))
+        instrumentation.enable()
+        self.assertIsNot(DynamicArray.map, original)
+        instrumentation.disable()
+        self.assertIs(DynamicArray.map, original)
+
+    def test_counters(self) -> None:
+        """Test calls, copies, allocations, resizes and time."""
+        instrumentation.enable()
+        arr = DynamicArray.from_list([1, 2, 3])
+        arr.map(str).set(0, 'x')
+        arr.get(1)
+        stats = instrumentation.stats()
+        self.assertEqual(stats.calls, {'from_list': 1, 'map': 1,
+                                       'set': 1, 'get': 1})
+        self.assertEqual(stats.copied, 9)
+        self.assertEqual(stats.allocations, 3)
+        self.assertEqual(set(stats.seconds), set(stats.calls))
+        DynamicArray.empty().cons(1).cons(2).cons(3)
+        self.assertEqual(instrumentation.stats().resizes, 3)
+
+    def test_reset(self) -> None:
+        """Test reset returns the final snapshot and clears counters."""
+        instrumentation.enable()
+        DynamicArray.from_list([1]).reverse()
+        snapshot = instrumentation.reset()
+        self.assertEqual(snapshot.calls, {'from_list': 1, 'reverse': 1})
+        self.assertEqual(instrumentation.stats().calls, {})
+        self.assertEqual(instrumentation.stats().copied, 0)
+
+    def test_hooks(self) -> None:
+        """Test hooks see nested calls and their copies."""
+        events: List[instrumentation.Event] = []
+        instrumentation.add_hook(events.append)
+        try:
+            instrumentation.enable()
+            arr = DynamicArray.from_list([1, 2])
+            arr.union(DynamicArray.from_list([2, 3]))
+        finally:
+            instrumentation.remove_hook(events.append)
+        names = [event.method for event in events]
+        self.assertEqual(names[-1], 'union')
+        self.assertIn('difference', names)
+        self.assertIn('concat', names)
+        self.assertEqual(events[-1].copied, 1 + 3)
+        with self.assertRaises(ValueError):
+            instrumentation.remove_hook(events.append)
+
+    def test_generators_and_coroutines(self) -> None:
+        """Test generators and coroutines are counted while they run."""
+        events: List[instrumentation.Event] = []
+        instrumentation.add_hook(events.append)
+        try:
+            instrumentation.enable()
+            arr = DynamicArray.from_list([1, 2, 3])
+            items = iter(arr)
+            self.assertNotIn('iterator', instrumentation.stats().calls)
+            for _ in items:
+                time.sleep(0.01)
+            mapped = asyncio.run(arr.amap(increment))
+            collected = asyncio.run(collect(arr))
+        finally:
+            instrumentation.remove_hook(events.append)
+        self.assertEqual(mapped.to_list(), [2, 3, 4])
+        self.assertEqual(collected, [1, 2, 3])
+        by_name = {event.method: event for event in events}
+        # The consumer's time between elements is not counted
+        self.assertLess(by_name['__iter__'].seconds, 0.01)
+        self.assertLess(by_name['iterator'].seconds, 0.01)
+        # The coroutine's result is allocated after its first await
+        self.assertEqual((by_name['amap'].copied,
+                          by_name['amap'].allocations), (3, 1))
+        self.assertIn('__aiter__', by_name)
+        stats = instrumentation.stats()
+        self.assertEqual((stats.calls['iterator'], stats.calls['amap']),
+                         (1, 1))
+
+    def test_threads(self) -> None:
+        """Test counting from several threads."""
+        instrumentation.enable()
+        arr = DynamicArray.from_list(list(range(10)))
+
+        def work() -> None:
+            for i in range(500):
+                arr.get(i % 10)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(instrumentation.stats().calls['get'], 2000)
+
+
+async def increment(value: int) -> int:
+    """Add one after yielding to the event loop."""
+    await asyncio.sleep(0)
+    return value + 1
+
+
+async def collect(items: Any) -> List[Any]:
+    """Gather the elements of an async iterable."""
+    return [item async for item in items]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+from typing import List
+
+from hypothesis import given, strategies as st
+
+from dynamic_array import DynamicArray
+
+
+class TestLazyArray(unittest.TestCase):
+    """Test functionality of the LazyArray class."""
+    def test_map_filter_reduce(self) -> None:
+        """Test a fused three-stage pipeline."""
+        arr = DynamicArray.from_list([1, 2, 3, 4, 5])
+        query = arr.lazy().map(lambda x: x * 3).filter(lambda x: x % 2 == 0)
+        self.assertEqual(query.reduce(lambda acc, x: acc + x, 0), 18)
+        self.assertEqual(query.to_list(), [6, 12])
+        # Source array remains unchanged
+        self.assertEqual(arr.to_list(), [1, 2, 3, 4, 5])
+
+    def test_stages_are_deferred(self) -> None:
+        """Test nothing runs until a terminal operation."""
+        calls: List[int] = []
+
+        def record(x: int) -> int:
+            calls.append(x)
+            return x
+
+        arr = DynamicArray.from_list([1, 2, 3, 4])
+        query = arr.lazy().map(record)
+        self.assertEqual(calls, [])
+        self.assertEqual(query.first(), 1)
+        self.assertEqual(calls, [1])
+
+    def test_take_drop_zip(self) -> None:
+        """Test take, drop and zip stages."""
+        arr = DynamicArray.from_list([1, 2, 3, 4, 5])
+        other = DynamicArray.from_list(['a', 'b', 'c'])
+        self.assertEqual(arr.lazy().drop(1).take(3).to_list(), [2, 3, 4])
+        self.assertEqual(arr.lazy().zip(other).to_list(),
+                         [(1, 'a'), (2, 'b'), (3, 'c')])
+        self.assertEqual(arr.lazy().take(0).to_list(), [])
+        with self.assertRaises(ValueError):
+            arr.lazy().take(-1)
+        with self.assertRaises(ValueError):
+            arr.lazy().drop(-1)
+
+    def test_collect(self) -> None:
+        """Test collecting back into a DynamicArray."""
+        arr = DynamicArray.from_list([1, 2, 3], backend='trie')
+        result = arr.lazy().map(lambda x: x + 1).collect()
+        self.assertEqual(result, DynamicArray.from_list([2, 3, 4]))
+        self.assertEqual(result.backend(), 'trie')
+        self.assertEqual(result.cons(1).to_list(), [1, 2, 3, 4])
+
+    def test_first_any(self) -> None:
+        """Test short-circuiting terminal operations."""
+        arr = DynamicArray.from_list([1, 2, 3])
+        self.assertEqual(arr.lazy().filter(lambda x: x > 1).first(), 2)
+        self.assertIsNone(arr.lazy().filter(lambda x: x > 5).first())
+        self.assertEqual(DynamicArray.empty().lazy().first(0), 0)
+        self.assertTrue(arr.lazy().any(lambda x: x == 3))
+        self.assertFalse(arr.lazy().any(lambda x: x > 3))
+        self.assertFalse(DynamicArray.from_list([0, None]).lazy().any())
+
+
+class LazyArrayPropertyTest(unittest.TestCase):
+    """Property-based tests for LazyArray."""
+    @given(st.lists(st.integers()))
+    def test_matches_eager(self, items: List[int]) -> None:
+        """Test fused pipelines agree with eager operations."""
+        arr = DynamicArray.from_list(items)
+        eager = arr.map(lambda x: x + 1).filter(lambda x: x % 3 != 0)
+        lazy = arr.lazy().map(lambda x: x + 1).filter(lambda x: x % 3 != 0)
+        self.assertEqual(lazy.collect(), eager)
+        self.assertEqual(lazy.reduce(lambda acc, x: acc + x, 0),
+                         eager.reduce(lambda acc, x: acc + x, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import gc
+import unittest
+from typing import Any, List
+
+from hypothesis import given, strategies as st
+
+from dynamic_array import DynamicArray
+from memoization import CacheStats, ResultCache
+
+
+def double(x: int) -> int:
+    """Double a value."""
+    return x * 2
+
+
+def is_even(x: int) -> bool:
+    """Check parity."""
+    return x % 2 == 0
+
+
+class Scaler:
+    """Callable object with a bound method."""
+    def __init__(self, factor: int):
+        """Store the factor."""
+        self.factor = factor
+
+    def scale(self, x: int) -> int:
+        """Multiply by the factor."""
+        return x * self.factor
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __call__(self, x: int) -> int:
+        """Multiply by the factor."""
+        return self.scale(x)
+
+
+class TestResultCache(unittest.TestCase):
+    """Test cached operations, budgets, weak sources and stats."""
+    def test_hits_and_misses(self) -> None:
+        """Test repeated operations return the cached array."""
+        cache = ResultCache()
+        arr = DynamicArray.from_list([3, 1, 2, 4])
+        reference = DynamicArray.from_list([2, 4, 6])
+        mapped = cache.map(arr, double)
+        self.assertEqual(mapped, arr.map(double))
+        self.assertIs(cache.map(arr, double), mapped)
+        self.assertEqual(cache.filter(arr, is_even).to_list(), [2, 4])
+        self.assertEqual(cache.reverse(arr).to_list(), [4, 2, 1, 3])
+        common = cache.intersection(arr, reference)
+        self.assertEqual(common.to_list(), [2, 4])
+        self.assertIs(cache.intersection(arr, reference), common)
+        self.assertEqual(cache.difference(arr, reference).to_list(), [3, 1])
+        # Different callables, operands or instances miss
+        self.assertEqual(cache.map(arr, is_even).to_list(),
+                         [False, False, True, True])
+        self.assertEqual(cache.intersection(reference, arr).to_list(),
+                         [2, 4])
+        self.assertIsNot(cache.map(DynamicArray.from_list([3, 1, 2, 4]),
+                                   double), mapped)
+        # The entry of the temporary array left with it
+        self.assertEqual(cache.stats(), CacheStats(2, 8, 0, 7, 20))
+        self.assertEqual(len(cache), 7)
+        self.assertEqual(cache.clear().hits, 2)
+        self.assertEqual(cache.stats(), CacheStats(0, 0, 0, 0, 0))
+
+    def test_callables(self) -> None:
+        """Test bound methods hit and unhashable callables bypass."""
+        cache = ResultCache()
+        arr = DynamicArray.from_list([1, 2])
+        scaler = Scaler(3)
+        first = cache.map(arr, scaler.scale)
+        self.assertIs(cache.map(arr, scaler.scale), first)
+        self.assertEqual(cache.map(arr, scaler).to_list(), [3, 6])
+        self.assertEqual(cache.stats(), CacheStats(1, 2, 0, 1, 2))
+
+    def test_lru_budget(self) -> None:
+        """Test the least recently used entries are evicted first."""
+        cache = ResultCache(max_entries=2, max_elements=5)
+        arrays = [DynamicArray.from_list([i, i]) for i in range(3)]
+        first = cache.reverse(arrays[0])
+        cache.reverse(arrays[1])
+        self.assertIs(cache.reverse(arrays[0]), first)
+        cache.reverse(arrays[2])
+        self.assertEqual(cache.stats(), CacheStats(1, 3, 1, 2, 4))
+        self.assertIs(cache.reverse(arrays[0]), first)
+        cache.map(arrays[0], double)
+        self.assertEqual(cache.stats().evictions, 2)
+        # Results over the element budget are not stored
+        cache.reverse(DynamicArray.from_list(list(range(6))))
+        self.assertEqual(len(cache), 2)
+        with self.assertRaises(ValueError):
+            ResultCache(max_entries=0)
+        with self.assertRaises(ValueError):
+            ResultCache(max_elements=0)
+
+    def test_weak_sources(self) -> None:
+        """Test entries go away with their source arrays."""
+        cache = ResultCache()
+        arr = DynamicArray.from_list([1, 2, 3])
+        reference = DynamicArray.from_list([2])
+        cache.reverse(arr)
+        cache.intersection(arr, reference)
+        cache.map(reference, double)
+        del arr
+        gc.collect()
+        self.assertEqual(cache.stats().entries, 1)
+        del reference
+        gc.collect()
+        self.assertEqual(cache.stats(), CacheStats(0, 3, 0, 0, 0))
+        self.assertEqual((cache._sources, cache._refs), ({}, {}))
+
+
+class ResultCachePropertyTest(unittest.TestCase):
+    """Property-based tests for the result cache."""
+    @given(st.lists(st.integers(), max_size=30),
+           st.lists(st.integers(), max_size=30),
+           st.lists(st.sampled_from(['map', 'filter', 'reverse',
+                                     'intersection', 'difference']),
+                    max_size=30),
+           st.integers(1, 4))
+    def test_matches_uncached(self, items: List[int], others: List[int],
+                              operations: List[str],
+                              max_entries: int) -> None:
+        """Test cached results equal direct calls within budget."""
+        cache = ResultCache(max_entries=max_entries)
+        arr = DynamicArray.from_list(items)
+        other = DynamicArray.from_list(others)
+        for count, operation in enumerate(operations, 1):
+            args: List[Any] = [arr]
+            if operation == 'map':
+                args.append(double)
+            elif operation == 'filter':
+                args.append(is_even)
+            elif operation != 'reverse':
+                args.append(other)
+            self.assertEqual(getattr(cache, operation)(*args),
+                             getattr(DynamicArray, operation)(*args))
+            stats = cache.stats()
+            self.assertLessEqual(stats.entries, max_entries)
+            self.assertEqual(stats.hits + stats.misses, count)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import operator
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from hypothesis import given, strategies as st
+
+import parallel
+import typed_kernels
+from dynamic_array import DynamicArray
+
+
+class TestParallel(unittest.TestCase):
+    """Test parallel map, filter and reduce."""
+    def test_split(self) -> None:
+        """Test chunking keeps order and sizes."""
+        chunks = list(parallel.split(range(10), 10, None, 4))
+        self.assertEqual(chunks, [(0, 1, 2, 3), (4, 5, 6, 7), (8, 9)])
+        self.assertEqual(len(list(parallel.split(range(80), 80, 2, None))),
+                         8)
+        self.assertEqual(list(parallel.split([], 0, None, None)), [])
+        with self.assertRaises(ValueError):
+            list(parallel.split(range(3), 3, None, 0))
+
+    def test_threads(self) -> None:
+        """Test thread pools with unpicklable callables."""
+        arr = DynamicArray.from_list(list(range(1000)))
+        options: Dict[str, Any] = {'executor': 'thread', 'workers': 3,
+                                   'chunk_size': 64, 'threshold': 0}
+        self.assertEqual(arr.pmap(lambda x: x * 2, **options),
+                         arr.map(lambda x: x * 2))
+        self.assertEqual(arr.pfilter(lambda x: x % 3 == 0, **options),
+                         arr.filter(lambda x: x % 3 == 0))
+        self.assertEqual(arr.preduce(lambda a, x: a + x, 0, **options),
+                         sum(range(1000)))
+
+    def test_processes(self) -> None:
+        """Test process pools with picklable callables."""
+        arr = DynamicArray.from_list(list(range(2000)), backend='trie')
+        options: Dict[str, Any] = {'workers': 2, 'threshold': 0}
+        mapped = arr.pmap(typed_kernels.add(1), **options)
+        self.assertEqual(mapped.to_list(), list(range(1, 2001)))
+        self.assertEqual(mapped.backend(), 'trie')
+        self.assertEqual(
+            arr.pfilter(typed_kernels.lt(10), **options).to_list(),
+            list(range(10)))
+        self.assertEqual(arr.preduce(operator.add, 0, **options),
+                         sum(range(2000)))
+
+    def test_existing_executor(self) -> None:
+        """Test reusing a caller-owned pool."""
+        arr = DynamicArray.from_list(list(range(100)))
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            result = arr.pmap(str, executor=pool, threshold=0)
+        self.assertEqual(result.to_list(), [str(i) for i in range(100)])
+        with self.assertRaises(ValueError):
+            arr.pmap(str, executor='gpu', threshold=0)
+
+    def test_serial_fallback(self) -> None:
+        """Test small arrays skip the pool."""
+        arr = DynamicArray.from_list([1, 2, 3])
+        # Unknown executor is never used below the threshold
+        self.assertEqual(arr.pmap(lambda x: -x, executor='gpu').to_list(),
+                         [-1, -2, -3])
+        self.assertEqual(arr.pfilter(lambda x: x > 1,
+                                     executor='gpu').to_list(), [2, 3])
+        self.assertEqual(arr.preduce(operator.mul, 1, executor='gpu'), 6)
+
+
+class ParallelPropertyTest(unittest.TestCase):
+    """Property-based tests for preduce."""
+    @given(st.lists(st.lists(st.integers())),
+           st.integers(min_value=1, max_value=8))
+    def test_preduce_monoid(self, items: List[List[int]],
+                            chunk_size: int) -> None:
+        """Test preduce over the concat monoid matches reduce."""
+        arrays = DynamicArray.from_list(
+            [DynamicArray.from_list(x) for x in items])
+        empty = DynamicArray.empty()
+        self.assertEqual(
+            arrays.preduce(DynamicArray.concat, empty, chunk_size=chunk_size,
+                           executor='thread', threshold=0),
+            arrays.reduce(DynamicArray.concat, empty))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+from typing import Any, List, Tuple
+
+from hypothesis import given, strategies as st
+
+from persistent_vector import PersistentVector
+
+
+class TestPersistentVector(unittest.TestCase):
+    """Test functionality of the PersistentVector class."""
+    def test_empty(self) -> None:
+        """Test creating an empty vector."""
+        vec = PersistentVector.empty()
+        self.assertEqual(len(vec), 0)
+        self.assertEqual(list(vec), [])
+        with self.assertRaises(IndexError):
+            vec[0]
+
+    def test_from_iterable(self) -> None:
+        """Test bulk construction across several trie levels."""
+        for size in (1, 31, 32, 33, 1024, 1057, 40000):
+            vec = PersistentVector.from_iterable(range(size))
+            self.assertEqual(len(vec), size)
+            self.assertEqual(list(vec), list(range(size)))
+            self.assertEqual(vec[size - 1], size - 1)
+
+    def test_append(self) -> None:
+        """Test appending matches bulk construction."""
+        vec = PersistentVector.empty()
+        for i in range(40000):
+            vec = vec.append(i)
+        self.assertEqual(list(vec), list(range(40000)))
+        self.assertEqual(vec[1056], 1056)
+
+    def test_set(self) -> None:
+        """Test set copies only the touched path."""
+        vec = PersistentVector.from_iterable(range(5000))
+        updated = vec.set(100, 'x')
+        self.assertEqual(updated[100], 'x')
+        self.assertEqual(vec[100], 100)
+        self.assertIs(updated._tail, vec._tail)
+        self.assertIs(updated._root[1], vec._root[1])
+        self.assertEqual(vec.set(4999, 'y')[4999], 'y')
+        with self.assertRaises(IndexError):
+            vec.set(5000, 0)
+
+    def test_set_many(self) -> None:
+        """Test set_many copies each touched path once."""
+        vec = PersistentVector.from_iterable(range(5000))
+        updated = vec.set_many([(100, 'x'), (101, 'y'), (100, 'z'),
+                                (4999, 'w')])
+        self.assertEqual([updated[i] for i in (100, 101, 4999)],
+                         ['z', 'y', 'w'])
+        self.assertEqual(vec[100], 100)
+        self.assertIs(updated._root[1], vec._root[1])
+        self.assertIs(vec.set_many([(0, 'a')])._tail, vec._tail)
+        with self.assertRaises(IndexError):
+            vec.set_many([(5000, 0)])
+
+    def test_base_and_changed(self) -> None:
+        """Test building against a base shares equal leaves."""
+        vec = PersistentVector.from_iterable(range(5000))
+        items: List[Any] = list(range(5000))
+        items[100] = 'x'
+        updated = PersistentVector.from_iterable(iter(items), base=vec)
+        self.assertEqual(list(updated), items)
+        self.assertIs(updated._root[1], vec._root[1])
+        self.assertIs(updated._tail, vec._tail)
+        self.assertEqual(list(vec.changed(updated)), [100])
+        longer = PersistentVector.from_iterable(range(40000), base=vec)
+        self.assertIs(longer._root[0][0][0], vec._root[0][0])
+        self.assertEqual(list(vec.changed(longer)), [])
+        self.assertEqual(list(longer.changed(updated)), [100])
+
+    def test_extend_shares_nodes(self) -> None:
+        """Test extend keeps the original leaves."""
+        vec = PersistentVector.from_iterable(range(64))
+        longer = vec.extend(range(64, 100))
+        self.assertEqual(list(longer), list(range(100)))
+        self.assertIs(longer._root[0], vec._root[0])
+
+
+class PersistentVectorPropertyTest(unittest.TestCase):
+    """Property-based tests for PersistentVector."""
+    @given(st.lists(st.integers(), min_size=1, max_size=3000),
+           st.lists(st.tuples(st.integers(0, 10 ** 6), st.integers())))
+    def test_set_many_matches_set(self, items: List[int],
+                                  updates: List[Tuple[int, int]]) -> None:
+        """Test set_many equals a sequence of set calls."""
+        vec = PersistentVector.from_iterable(items)
+        updates = [(index % len(items), value) for index, value in updates]
+        expected = vec
+        for index, value in updates:
+            expected = expected.set(index, value)
+        self.assertEqual(list(vec.set_many(updates)), list(expected))
+
+    @given(st.lists(st.integers()), st.lists(st.integers()))
+    def test_append_matches_list(self, list_x: List[int],
+                                 list_y: List[int]) -> None:
+        """Test extend behaves like list concatenation."""
+        vec = PersistentVector.from_iterable(list_x).extend(list_y)
+        self.assertEqual(list(vec), list_x + list_y)
+        self.assertEqual([vec[i] for i in range(len(vec))], list_x + list_y)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import asyncio
+import gc
+import operator
+import pickle
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, List
+
+from hypothesis import given, strategies as st
+
+import shared
+from dynamic_array import DynamicArray
+
+
+def total(handle: shared.SharedHandle) -> float:
+    """Sum a shared array in a worker process."""
+    arr = DynamicArray.attach(handle)
+    return float(arr.reduce(operator.add, 0.0))
+
+
+class TestShared(unittest.TestCase):
+    """Test shared memory blocks and their lifecycle."""
+    def test_typed(self) -> None:
+        """Test typed values are shared raw."""
+        with shared.share([1.5, 2.5, -1.0], 'd') as handle:
+            self.assertEqual(handle.length, 3)
+            data = shared.SharedArray(handle.name)
+            self.assertEqual(data.typecode, 'd')
+            self.assertEqual(list(data), [1.5, 2.5, -1.0])
+            self.assertEqual(data[1], 2.5)
+            data.close()
+            data.close()
+
+    def test_records(self) -> None:
+        """Test other elements are shared as pickle records."""
+        items = [1, 'two', None, (3, [4])]
+        with shared.share(items) as handle:
+            data = shared.SharedArray(handle.name)
+            self.assertIsNone(data.typecode)
+            self.assertEqual(list(data), items)
+            copy = pickle.loads(pickle.dumps(data))
+            self.assertEqual(copy[3], (3, [4]))
+
+    def test_handle_pickles_name(self) -> None:
+        """Test pickled handles do not own the block."""
+        handle = shared.share(range(1000), 'q')
+        copy = pickle.loads(pickle.dumps(handle))
+        self.assertLess(len(pickle.dumps(handle)), 200)
+        self.assertEqual((copy.name, copy.length), (handle.name, 1000))
+        copy.close()
+        self.assertEqual(shared.SharedArray(copy.name)[999], 999)
+        handle.close()
+        handle.unlink()
+        handle.unlink()
+        with self.assertRaises(FileNotFoundError):
+            shared.SharedArray(handle.name)
+
+    def test_attached_survives_unlink(self) -> None:
+        """Test arrays attached before unlinking stay readable."""
+        handle = shared.share(['a', 'b'])
+        data = shared.SharedArray(handle.name)
+        handle.unlink()
+        self.assertEqual(list(data), ['a', 'b'])
+
+    def test_worker_processes(self) -> None:
+        """Test workers attach to the block instead of copying it."""
+        arr = DynamicArray.from_list([float(i) for i in range(10000)],
+                                     dtype='f8')
+        with arr.to_shared() as handle:
+            with ProcessPoolExecutor(max_workers=2) as pool:
+                results = list(pool.map(total, [handle, handle]))
+        self.assertEqual(results, [sum(range(10000))] * 2)
+
+    def test_iterate_dropped_array(self) -> None:
+        """Test iterators keep an unreferenced attached array alive."""
+        items = [float(i) for i in range(5000)]
+        with shared.share(items, 'd') as handle:
+            iterator = iter(DynamicArray.attach(handle))
+            gc.collect()
+            self.assertEqual(list(iterator), items)
+            query = iter(DynamicArray.attach(handle).lazy().map(abs))
+            gc.collect()
+            self.assertEqual(next(query), 0.0)
+            self.assertEqual(asyncio.run(collect(handle)), items)
+        with shared.share(['a', 'b']) as handle:
+            records = iter(shared.SharedArray(handle.name))
+            gc.collect()
+            self.assertEqual(list(records), ['a', 'b'])
+
+
+async def collect(handle: shared.SharedHandle) -> List[Any]:
+    """Iterate a freshly attached array asynchronously."""
+    return [item async for item in DynamicArray.attach(handle)]
+
+
+class SharedPropertyTest(unittest.TestCase):
+    """Property-based tests for shared round trips."""
+    @given(st.lists(st.one_of(st.integers(), st.text(), st.none())))
+    def test_round_trip(self, items: List[Any]) -> None:
+        """Test attached arrays equal the shared array."""
+        arr = DynamicArray.from_list(items)
+        with arr.to_shared() as handle:
+            self.assertEqual(DynamicArray.attach(handle), arr)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+from typing import List
+
+from hypothesis import given, strategies as st
+
+import streaming
+
+
+class TestStreaming(unittest.TestCase):
+    """Test line and record file streaming."""
+    def setUp(self) -> None:
+        """Create a scratch directory."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'data')
+
+    def tearDown(self) -> None:
+        """Remove the scratch directory."""
+        self.directory.cleanup()
+
+    def test_lines(self) -> None:
+        """Test writing and parsing lines."""
+        self.assertEqual(streaming.write_lines(self.path, [1.5, 2.0]), 2)
+        with open(self.path) as source:
+            self.assertEqual(source.read(), '1.5\n2.0\n')
+        self.assertEqual(list(streaming.read_lines(self.path, float)),
+                         [1.5, 2.0])
+        streaming.write_lines(self.path, ['a', 'b'], str.upper)
+        self.assertEqual(list(streaming.read_lines(self.path)), ['A', 'B'])
+
+    def test_last_line_without_newline(self) -> None:
+        """Test a final line without newline is still read."""
+        with open(self.path, 'w') as target:
+            target.write('x\n\ny')
+        self.assertEqual(list(streaming.read_lines(self.path)),
+                         ['x', '', 'y'])
+
+    def test_newline_rejected(self) -> None:
+        """Test elements that would split into two lines."""
+        with self.assertRaises(ValueError):
+            streaming.write_lines(self.path, ['a\nb'])
+        with self.assertRaises(ValueError):
+            streaming.write_lines(self.path, ['a\rb'])
+
+    def test_records(self) -> None:
+        """Test writing and reading pickle records."""
+        items = [1, 'two', None, (3, [4])]
+        self.assertEqual(streaming.write_records(self.path, items), 4)
+        self.assertEqual(list(streaming.read_records(self.path)), items)
+        streaming.write_records(self.path, [])
+        self.assertEqual(list(streaming.read_records(self.path)), [])
+
+
+class StreamingPropertyTest(unittest.TestCase):
+    """Property-based tests for streaming round trips."""
+    @given(st.lists(st.text().filter(lambda text: '\n' not in text and
+                                     '\r' not in text)))
+    def test_lines_round_trip(self, items: List[str]) -> None:
+        """Test lines read back exactly as written."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'data')
+            streaming.write_lines(path, items)
+            self.assertEqual(list(streaming.read_lines(path)), items)
+
+
+if __name__ == '__main__':
+    unittest.main()
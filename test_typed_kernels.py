@@ -0,0 +1,116 @@
+import functools
+import operator
+import unittest
+from array import array
+from typing import List
+from unittest import mock
+
+from hypothesis import given, strategies as st
+
+import typed_kernels
+from typed_kernels import (UNHANDLED, ScalarOp, filter_kernel, map_kernel,
+                           reduce_kernel, to_typed)
+
+
+class TestTypedKernels(unittest.TestCase):
+    """Test functionality of the typed_kernels module."""
+    def test_scalar_op(self) -> None:
+        """Test ScalarOp works as a plain callable."""
+        self.assertEqual(typed_kernels.add(2)(3), 5)
+        self.assertEqual(typed_kernels.sub(2)(3), 1)
+        self.assertEqual(typed_kernels.mul(2)(3), 6)
+        self.assertEqual(typed_kernels.truediv(2)(3), 1.5)
+        self.assertTrue(typed_kernels.gt(2)(3))
+        self.assertTrue(typed_kernels.ge(3)(3))
+        self.assertFalse(typed_kernels.lt(2)(3))
+        self.assertTrue(typed_kernels.le(3)(3))
+        self.assertTrue(typed_kernels.eq(3)(3))
+        self.assertFalse(typed_kernels.ne(3)(3))
+        self.assertEqual(repr(typed_kernels.add(1)), "ScalarOp('add', 1)")
+        with self.assertRaises(ValueError):
+            ScalarOp('pow', 2)
+
+    def test_to_typed(self) -> None:
+        """Test packing only accepts values that fit exactly."""
+        self.assertEqual(to_typed('d', [1.0, 2.0]), array('d', [1.0, 2.0]))
+        self.assertIsNone(to_typed('d', [1.0, 2]))
+        self.assertIsNone(to_typed('b', [1, 300]))
+        self.assertIsNone(to_typed('q', [True]))
+
+    def test_unrecognised(self) -> None:
+        """Test arbitrary callables are left to the generic path."""
+        data = array('d', [1.0, 2.0])
+        self.assertIsNone(map_kernel(data, lambda x: x))
+        self.assertIsNone(map_kernel(data, typed_kernels.gt(1)))
+        self.assertIsNone(filter_kernel(data, lambda x: True))
+        self.assertIsNone(filter_kernel(data, typed_kernels.add(1)))
+        self.assertIs(reduce_kernel(data, lambda a, x: a, 0), UNHANDLED)
+
+    def test_kernels_without_numpy(self) -> None:
+        """Test the stdlib kernels."""
+        with mock.patch.object(typed_kernels, 'numpy', None):
+            self._check_kernels()
+
+    @unittest.skipIf(typed_kernels.numpy is None, "NumPy not installed")
+    def test_kernels_with_numpy(self) -> None:
+        """Test the NumPy kernels."""
+        self._check_kernels()
+
+    def _check_kernels(self) -> None:
+        """Check kernel results on float and int buffers."""
+        floats = array('d', [1.5, -2.0, 3.0])
+        ints = array('i', [1, -2, 3])
+        self.assertEqual(list(map_kernel(floats, typed_kernels.mul(2))
+                              or []), [3.0, -4.0, 6.0])
+        self.assertEqual(list(map_kernel(ints, typed_kernels.add(1))
+                              or []), [2, -1, 4])
+        self.assertEqual(list(map_kernel(ints, typed_kernels.truediv(2))
+                              or []), [0.5, -1.0, 1.5])
+        with self.assertRaises(ZeroDivisionError):
+            map_kernel(floats, typed_kernels.truediv(0))
+        self.assertEqual(filter_kernel(floats, typed_kernels.gt(0)),
+                         array('d', [1.5, 3.0]))
+        self.assertEqual(filter_kernel(ints, typed_kernels.le(1)),
+                         array('i', [1, -2]))
+        self.assertEqual(reduce_kernel(floats, operator.add, 0.0), 2.5)
+        self.assertEqual(reduce_kernel(ints, operator.add, 10), 12)
+        tenths = array('d', [0.1] * 10)
+        for initial in (0.0, 0):
+            self.assertEqual(reduce_kernel(tenths, operator.add, initial),
+                             functools.reduce(operator.add, tenths, initial))
+        self.assertEqual(reduce_kernel(ints, min, 0), -2)
+        self.assertEqual(reduce_kernel(ints, max, 5), 5)
+        self.assertEqual(reduce_kernel(array('d'), max, 1.0), 1.0)
+        # Memoryviews of views are read in place
+        strided = memoryview(array('d', [1.5, 0.0, -2.0, 0.0, 3.0]))[::2]
+        self.assertEqual(list(map_kernel(strided, typed_kernels.mul(2))
+                              or []), [3.0, -4.0, 6.0])
+        self.assertEqual(filter_kernel(strided, typed_kernels.gt(0)),
+                         array('d', [1.5, 3.0]))
+        self.assertEqual(reduce_kernel(strided, operator.add, 0.0), 2.5)
+        self.assertEqual(filter_kernel(memoryview(ints)[::-1],
+                                       typed_kernels.le(1)),
+                         array('i', [-2, 1]))
+
+
+class TypedKernelsPropertyTest(unittest.TestCase):
+    """Property-based tests for typed kernels."""
+    @given(st.lists(st.floats(allow_nan=False, allow_infinity=False,
+                              width=32)),
+           st.integers(min_value=-100, max_value=100))
+    def test_match_generic(self, items: List[float], operand: int) -> None:
+        """Test kernels agree with applying the ScalarOp one by one."""
+        data = array('d', items)
+        for op in (typed_kernels.add(operand), typed_kernels.mul(operand)):
+            self.assertEqual(list(map_kernel(data, op) or []),
+                             [op(x) for x in items])
+        predicate = typed_kernels.ge(operand)
+        self.assertEqual(list(filter_kernel(data, predicate) or []),
+                         [x for x in items if predicate(x)])
+        self.assertEqual(reduce_kernel(data, min, 0.0), min([0.0] + items))
+        self.assertEqual(reduce_kernel(data, operator.add, 0.0),
+                         functools.reduce(operator.add, items, 0.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+from typing import Any, List, Tuple
+
+from hypothesis import given, strategies as st
+
+import versioned
+from dynamic_array import DynamicArray
+from versioned import VersionedArray
+
+
+class TestVersionedArray(unittest.TestCase):
+    """Test version history, sharing, diffs and retention."""
+    def test_commit_and_access(self) -> None:
+        """Test versions are kept and returned by id."""
+        history = VersionedArray(DynamicArray.from_list([1, 2, 3]))
+        second = history.commit(history.head().set(0, 'a'))
+        third = history.commit(DynamicArray.from_list([4]))
+        self.assertEqual((second, third), (1, 2))
+        self.assertEqual(history.versions(), [0, 1, 2])
+        self.assertEqual(history.version(0).to_list(), [1, 2, 3])
+        self.assertEqual(history.version(1).to_list(), ['a', 2, 3])
+        self.assertEqual(history.head().to_list(), [4])
+        self.assertEqual(history.head().backend(), 'trie')
+        with self.assertRaises(KeyError):
+            history.version(3)
+        with self.assertRaises(KeyError):
+            VersionedArray().head()
+
+    def test_sharing(self) -> None:
+        """Test unchanged leaves are shared between versions."""
+        items: List[Any] = list(range(5000))
+        history = VersionedArray(DynamicArray.from_list(items))
+        items[100] = 'x'
+        history.commit(DynamicArray.from_list(items))
+        history.commit(history.head().set_many({4000: 'y'}))
+        first, second, third = (versioned._vector(history.version(i))
+                                for i in range(3))
+        self.assertIs(second._root[1], first._root[1])
+        self.assertIsNot(second._root[0], first._root[0])
+        self.assertIs(third._root[0], second._root[0])
+        self.assertIs(third._tail, first._tail)
+
+    def test_diff(self) -> None:
+        """Test diffs list changed indices and length changes."""
+        items = list(range(3000))
+        history = VersionedArray(DynamicArray.from_list(items))
+        history.commit(history.head().set_many({5: 'a', 2999: 'b'}))
+        history.commit(history.head().insert_at(3000, [7, 8]))
+        history.commit(DynamicArray.from_list(items[:10]))
+        self.assertEqual(history.diff(0, 1),
+                         [('set', 5, 'a'), ('set', 2999, 'b')])
+        self.assertEqual(history.diff(1, 2), [('insert', 3000, [7, 8])])
+        self.assertEqual(history.diff(0, 3), [('delete', 10, 3000)])
+        self.assertEqual(history.diff(2, 2), [])
+        for old in range(4):
+            for new in range(4):
+                patched = history.version(old).apply_patch(
+                    history.diff(old, new))
+                self.assertEqual(patched, history.version(new))
+
+    def test_retention(self) -> None:
+        """Test pruning keeps the newest and pinned versions."""
+        history = VersionedArray(DynamicArray.from_list([0]), keep_last=2)
+        history.pin(0)
+        for value in range(1, 5):
+            history.commit(DynamicArray.from_list([value]))
+        self.assertEqual(history.versions(), [0, 3, 4])
+        history.unpin(0)
+        self.assertEqual(history.prune(1, keep=[3]), [0])
+        self.assertEqual(history.versions(), [3, 4])
+        with self.assertRaises(KeyError):
+            history.pin(0)
+        with self.assertRaises(ValueError):
+            history.prune(0)
+        with self.assertRaises(ValueError):
+            VersionedArray(keep_last=0)
+
+
+class VersionedPropertyTest(unittest.TestCase):
+    """Property-based tests for versioned arrays."""
+    @given(st.lists(st.integers(), max_size=2000),
+           st.lists(st.tuples(st.integers(0, 10 ** 6), st.integers()),
+                    max_size=20),
+           st.integers(0, 40))
+    def test_diff_round_trip(self, items: List[int],
+                             updates: List[Tuple[int, int]],
+                             extra: int) -> None:
+        """Test applying a diff reproduces the newer version."""
+        history = VersionedArray(DynamicArray.from_list(items))
+        edited = list(items) + list(range(extra))
+        for index, value in updates:
+            if edited:
+                edited[index % len(edited)] = value
+        history.commit(DynamicArray.from_list(edited))
+        old, new = history.version(0), history.version(1)
+        self.assertEqual(new.to_list(), edited)
+        self.assertEqual(old.apply_patch(history.diff(0, 1)), new)
+        self.assertEqual(new.apply_patch(history.diff(1, 0)), old)
+
+
+if __name__ == '__main__':
+    unittest.main()
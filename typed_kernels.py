@@ -0,0 +1,277 @@
+import functools
+import importlib
+import operator
+from array import array
+from itertools import chain, compress, repeat
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+DTYPES: Dict[str, str] = {
+    'i1': 'b', 'u1': 'B', 'i2': 'h', 'u2': 'H', 'i4': 'i', 'u4': 'I',
+    'i8': 'q', 'u8': 'Q', 'f4': 'f', 'f8': 'd',
+}
+
+ARITHMETIC = ('add', 'sub', 'mul', 'truediv')
+COMPARISONS = ('gt', 'ge', 'lt', 'le', 'eq', 'ne')
+
+# Largest integer every float64 represents exactly
+_EXACT_INT = 2 ** 53
+
+UNHANDLED = object()
+
+# Typed storage, or a memoryview of typed elements read in place
+Buffer = Union['array[Any]', memoryview]
+
+
+def _optional_import(name: str) -> Any:
+    """Import an optional dependency.
+    Args:
+        name: Module name
+    Returns:
+        Module, or None if it is not installed
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+numpy = _optional_import('numpy')
+
+
+class ScalarOp:
+    """Elementwise operation with a scalar operand.
+
+    Calling it applies the operation to one value, so it works as an
+    ordinary map function or filter predicate. Typed arrays recognise
+    it and run it over the whole buffer at once.
+
+    Attributes:
+        name: Name of the function in the operator module
+        operand: Right-hand scalar operand
+    """
+    __slots__ = ('name', 'operand', '_func')
+
+    def __init__(self, name: str, operand: Any):
+        """Initialize operation.
+        Args:
+            name: Name of the function in the operator module
+            operand: Right-hand scalar operand
+        Raises:
+            ValueError: If the operation is not supported
+        """
+        if name not in ARITHMETIC and name not in COMPARISONS:
+            raise ValueError("Unsupported operation: {}".format(name))
+        self.name = name
+        self.operand = operand
+        self._func: Callable[[Any, Any], Any] = getattr(operator, name)
+
+    def __call__(self, value: Any) -> Any:
+        """Apply operation to a single value.
+        Args:
+            value: Left-hand operand
+        Returns:
+            Operation result
+        """
+        return self._func(value, self.operand)
+
+    def __repr__(self) -> str:
+        """String representation.
+        Returns:
+            String in format ScalarOp('add', 1)
+        """
+        return 'ScalarOp({!r}, {!r})'.format(self.name, self.operand)
+
+
+def add(operand: Any) -> ScalarOp:
+    """Create x + operand operation."""
+    return ScalarOp('add', operand)
+
+
+def sub(operand: Any) -> ScalarOp:
+    """Create x - operand operation."""
+    return ScalarOp('sub', operand)
+
+
+def mul(operand: Any) -> ScalarOp:
+    """Create x * operand operation."""
+    return ScalarOp('mul', operand)
+
+
+def truediv(operand: Any) -> ScalarOp:
+    """Create x / operand operation."""
+    return ScalarOp('truediv', operand)
+
+
+def gt(operand: Any) -> ScalarOp:
+    """Create x > operand predicate."""
+    return ScalarOp('gt', operand)
+
+
+def ge(operand: Any) -> ScalarOp:
+    """Create x >= operand predicate."""
+    return ScalarOp('ge', operand)
+
+
+def lt(operand: Any) -> ScalarOp:
+    """Create x < operand predicate."""
+    return ScalarOp('lt', operand)
+
+
+def le(operand: Any) -> ScalarOp:
+    """Create x <= operand predicate."""
+    return ScalarOp('le', operand)
+
+
+def eq(operand: Any) -> ScalarOp:
+    """Create x == operand predicate."""
+    return ScalarOp('eq', operand)
+
+
+def ne(operand: Any) -> ScalarOp:
+    """Create x != operand predicate."""
+    return ScalarOp('ne', operand)
+
+
+def python_type(typecode: str) -> type:
+    """Get the Python type stored by an array typecode.
+    Args:
+        typecode: array module typecode
+    Returns:
+        float or int
+    """
+    return float if typecode in 'fd' else int
+
+
+def to_typed(typecode: str, items: List[Any]) -> Optional['array[Any]']:
+    """Pack items into a typed buffer if they all fit exactly.
+    Args:
+        typecode: array module typecode
+        items: Values to pack
+    Returns:
+        Typed buffer, or None if any value has another type or range
+    """
+    if not set(map(type, items)) <= {python_type(typecode)}:
+        return None
+    try:
+        return array(typecode, items)
+    except OverflowError:
+        return None
+
+
+def buffer_typecode(data: Buffer) -> str:
+    """Get the array module typecode of a typed buffer.
+    Args:
+        data: Typed storage or memoryview of typed elements
+    Returns:
+        Typecode
+    """
+    return data.typecode if isinstance(data, array) else data.format
+
+
+def _numpy_view(data: Buffer, op: ScalarOp) -> Any:
+    """View a float64 buffer as a NumPy array if op runs identically.
+    NumPy is only used where its float64 results match Python's
+    element by element.
+    Args:
+        data: Typed storage or memoryview of typed elements
+        op: Scalar operation
+    Returns:
+        NumPy array, or None if NumPy should not be used
+    """
+    if numpy is None or buffer_typecode(data) != 'd':
+        return None
+    operand = op.operand
+    if type(operand) is int:
+        if abs(operand) > _EXACT_INT:
+            return None
+    elif type(operand) is not float:
+        return None
+    if op.name == 'truediv' and operand == 0:
+        # Python raises ZeroDivisionError where NumPy returns inf
+        return None
+    # Reads strided memoryviews in place too
+    return numpy.asarray(memoryview(data))
+
+
+def _from_numpy(values: Any) -> 'array[Any]':
+    """Copy a float64 NumPy array into a typed buffer.
+    Args:
+        values: Contiguous float64 NumPy array
+    Returns:
+        Typed buffer with the same values
+    """
+    result = array('d')
+    result.frombytes(memoryview(values).cast('B'))
+    return result
+
+
+def map_kernel(data: Buffer, func: Callable[[Any], Any]
+               ) -> Optional[Iterable[Any]]:
+    """Run a recognised map function over a whole buffer.
+    Args:
+        data: Typed storage or memoryview of typed elements
+        func: Map function
+    Returns:
+        Mapped values, typed when their type is known in advance, or
+        None if func is not recognised
+    """
+    if not isinstance(func, ScalarOp) or func.name not in ARITHMETIC:
+        return None
+    view = _numpy_view(data, func)
+    if view is not None:
+        return _from_numpy(func(view))
+    values = list(map(func._func, data, repeat(func.operand)))
+    typecode = buffer_typecode(data)
+    element_type = python_type(typecode)
+    if (func.name != 'truediv' and
+            type(func.operand) in (element_type, int)):
+        # float op int/float stays float, int op int stays int
+        try:
+            return array(typecode, values)
+        except OverflowError:
+            pass
+    return values
+
+
+def filter_kernel(data: Buffer, predicate: Callable[[Any], Any]
+                  ) -> Optional['array[Any]']:
+    """Run a recognised comparison predicate over a whole buffer.
+    Args:
+        data: Typed storage or memoryview of typed elements
+        predicate: Filter predicate
+    Returns:
+        Typed buffer of kept values, or None if not recognised
+    """
+    if (not isinstance(predicate, ScalarOp) or
+            predicate.name not in COMPARISONS):
+        return None
+    view = _numpy_view(data, predicate)
+    if view is not None:
+        return _from_numpy(view[predicate(view)])
+    return array(buffer_typecode(data),
+                 compress(data, map(predicate._func, data,
+                                    repeat(predicate.operand))))
+
+
+def reduce_kernel(data: Buffer, func: Callable[[Any, Any], Any],
+                  initial: Any) -> Any:
+    """Run a recognised reduction over a whole buffer.
+    Recognises operator.add and the min and max builtins.
+    Args:
+        data: Typed storage or memoryview of typed elements
+        func: Reduction function
+        initial: Initial accumulator value
+    Returns:
+        Reduction result, or UNHANDLED if func is not recognised
+    """
+    if func is operator.add:
+        if buffer_typecode(data) not in 'fd' and type(initial) is int:
+            # Integer sums are exact in any order
+            return sum(data, initial)
+        # sum() compensates float rounding from Python 3.12 on, so
+        # fold explicitly to match a plain left fold everywhere
+        return functools.reduce(operator.add, data, initial)
+    if func is min or func is max:
+        # Same tie and NaN handling as folding min/max pairwise
+        return func(chain((initial,), data))
+    return UNHANDLED
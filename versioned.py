@@ -0,0 +1,189 @@
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from dynamic_array import (PATCH_DELETE, PATCH_INSERT, PATCH_SET,
+                           DynamicArray)
+from persistent_vector import PersistentVector
+
+
+class VersionedArray:
+    """History of DynamicArray versions sharing unchanged chunks.
+
+    Every committed version is stored as a trie. Arrays derived from
+    a trie version (set, set_many, ...) already share all untouched
+    nodes with it; other arrays are split into 32-element leaves and
+    every leaf equal to the head version's is reused, copying only
+    the paths to changed leaves. N small edits on a large array thus
+    cost about the base size plus O(N) leaves. Inserts and deletes
+    shift the leaves after them, so those leaves are not shared.
+
+    Version ids are consecutive integers starting at 0. Versioned
+    arrays are not thread-safe.
+
+    Attributes:
+        keep_last: Number of newest versions kept after each commit,
+            None keeps every version
+        _versions: Retained versions by id, oldest first
+        _pinned: Ids kept regardless of keep_last
+        _next_id: Id of the next commit
+    """
+    def __init__(self, initial: Optional[DynamicArray] = None,
+                 keep_last: Optional[int] = None):
+        """Initialize history.
+        Args:
+            initial: First version to commit, if any
+            keep_last: Number of newest versions to retain
+        Raises:
+            ValueError: If keep_last is not positive
+        """
+        if keep_last is not None and keep_last <= 0:
+            raise ValueError("keep_last must be positive")
+        self.keep_last = keep_last
+        self._versions: Dict[int, DynamicArray] = {}
+        self._pinned: Set[int] = set()
+        self._next_id = 0
+        if initial is not None:
+            self.commit(initial)
+
+    def commit(self, arr: DynamicArray) -> int:
+        """Store a new head version.
+        Args:
+            arr: Array to store
+        Returns:
+            Id of the new version
+        """
+        data = arr._data
+        if not isinstance(data, PersistentVector) or arr._is_view():
+            head = self._head()
+            data = PersistentVector.from_iterable(
+                arr._elements(), None if head is None else _vector(head))
+        version_id = self._next_id
+        self._next_id += 1
+        self._versions[version_id] = DynamicArray(
+            data, arr._length, arr._length, arr._growth_factor)
+        if self.keep_last is not None:
+            self.prune(self.keep_last)
+        return version_id
+
+    def version(self, version_id: int) -> DynamicArray:
+        """Get a version in O(1).
+        Args:
+            version_id: Id returned by commit
+        Returns:
+            Trie-backed array of the version
+        Raises:
+            KeyError: If the version does not exist or was pruned
+        """
+        try:
+            return self._versions[version_id]
+        except KeyError:
+            raise KeyError("Unknown version: {}".format(version_id)) from None
+
+    def head(self) -> DynamicArray:
+        """Get the newest version.
+        Edit it and commit the result to share the most nodes.
+        Returns:
+            Trie-backed array of the newest version
+        Raises:
+            KeyError: If nothing was committed
+        """
+        head = self._head()
+        if head is None:
+            raise KeyError("No version committed")
+        return head
+
+    def versions(self) -> List[int]:
+        """List retained version ids.
+        Returns:
+            Ids from oldest to newest
+        """
+        return list(self._versions)
+
+    def diff(self, old_id: int, new_id: int) -> List[Tuple[str, int, Any]]:
+        """Compute the edits turning one version into another.
+        Subtrees shared by both versions are skipped, so the cost is
+        proportional to the changed region.
+        Args:
+            old_id: Id of the version to start from
+            new_id: Id of the target version
+        Returns:
+            apply_patch operations: one set per changed index, then an
+            insert or delete for a change in length
+        Raises:
+            KeyError: If a version does not exist or was pruned
+        """
+        old = self.version(old_id)
+        new = self.version(new_id)
+        old_data = _vector(old)
+        new_data = _vector(new)
+        ops: List[Tuple[str, int, Any]] = [
+            (PATCH_SET, index, new_data[index])
+            for index in old_data.changed(new_data)]
+        if new._length > old._length:
+            ops.append((PATCH_INSERT, old._length,
+                        [new_data[index]
+                         for index in range(old._length, new._length)]))
+        elif new._length < old._length:
+            ops.append((PATCH_DELETE, new._length, old._length))
+        return ops
+
+    def pin(self, version_id: int) -> None:
+        """Keep a version regardless of keep_last.
+        Args:
+            version_id: Id of a retained version
+        Raises:
+            KeyError: If the version does not exist or was pruned
+        """
+        self.version(version_id)
+        self._pinned.add(version_id)
+
+    def unpin(self, version_id: int) -> None:
+        """Let keep_last prune a pinned version again.
+        Args:
+            version_id: Pinned id
+        """
+        self._pinned.discard(version_id)
+
+    def prune(self, keep_last: int,
+              keep: Iterable[int] = ()) -> List[int]:
+        """Drop old versions.
+        Nodes shared with retained versions stay alive; the rest are
+        freed once no array refers to them.
+        Args:
+            keep_last: Number of newest versions to retain, at least 1
+            keep: Further ids to retain, besides pinned ones
+        Returns:
+            Ids of the dropped versions
+        Raises:
+            ValueError: If keep_last is not positive
+        """
+        if keep_last <= 0:
+            raise ValueError("keep_last must be positive")
+        retained = set(keep)
+        retained.update(self._pinned)
+        retained.update(list(self._versions)[-keep_last:])
+        dropped = [version_id for version_id in self._versions
+                   if version_id not in retained]
+        for version_id in dropped:
+            del self._versions[version_id]
+        return dropped
+
+    def _head(self) -> Optional[DynamicArray]:
+        """Get the newest version, if any.
+        Returns:
+            Newest version or None
+        """
+        if not self._versions:
+            return None
+        return self._versions[next(reversed(self._versions))]
+
+
+def _vector(arr: DynamicArray) -> PersistentVector:
+    """Get the trie of a stored version.
+    Args:
+        arr: Version created by commit
+    Returns:
+        Its storage
+    """
+    data = arr._data
+    assert isinstance(data, PersistentVector)
+    return data